@@ -2,16 +2,16 @@
 
 import sys
 from pathlib import Path
-from fastapi import FastAPI, HTTPException, BackgroundTasks, Request
+from fastapi import FastAPI, HTTPException, Request, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, StreamingResponse
 from pydantic import BaseModel
 from typing import Dict, Any, Optional, List
-import re
+import os
 import json
-from datetime import datetime, timezone
-import asyncio
+import math
 from datetime import datetime
-import uuid
+import asyncio
 import time
 import logging
 
@@ -26,9 +26,18 @@ logger = logging.getLogger(__name__)
 # Add src directory to path
 sys.path.append(str(Path(__file__).parent / "src"))
 
-from src.crews import PropertyInsightsCrew, ReportGenerationCrew, ResponseRoutingCrew
+from src.crews import crew_factory
+from src.jobs import AdmissionRejected, JobWorker, admission, crew_executor, document_index, intent_classifier, job_events, job_queue, job_store, request_fingerprint, research_batches, semantic_cache
+from src.listings import TOTAL_MODES, InvalidCursor, listing_pager
+from src.runtime import cancellation
+from src.tools.call_cache import tool_call_cache
+from src.tools.file_index import file_index
+from src.tools.page_cache import page_cache
+from src.tools.search_cache import search_cache
+from src.tools.search_providers import search_providers
 from config import llm_config
-from config.database import connect_to_mongo, close_mongo_connection
+from config.http_client import async_http_client, http_client
+from config.database import connect_to_mongo, close_mongo_connection, get_listings_collection, mongo_settings
 from config.models import AnalysisJob, PropertyInsight, RealEstateReport, FileUpload, MarketListing, JobStatus, JobType
 
 app = FastAPI(
@@ -75,67 +84,51 @@ async def startup_event():
         logger.error(f"✗ Failed to connect to database: {e}")
         raise
 
+    job_store.start()
+    job_events.start()
+    cancellation.start()
+    try:
+        await semantic_cache.warm()
+    except Exception as e:
+        logger.error(f"Semantic cache warm-up failed | Error: {str(e)}")
+
+    # The API only enqueues; an embedded worker keeps single-process setups working.
+    # Disable it when running standalone workers (python worker.py).
+    if os.getenv("EMBEDDED_JOB_WORKER", "true").lower() == "true":
+        global embedded_worker, embedded_worker_task
+        embedded_worker = JobWorker()
+        embedded_worker_task = asyncio.create_task(embedded_worker.run())
+
 @app.on_event("shutdown")
 async def shutdown_event():
     """Close MongoDB connection on shutdown"""
+    if embedded_worker is not None:
+        embedded_worker.stop()
+        await embedded_worker_task
+    crew_executor.shutdown(wait=False)
+    http_client.close()
+    await job_store.stop()
     await close_mongo_connection()
     logger.info("Database connection closed")
 
-# In-memory storage for job tracking
-job_store: Dict[str, Dict[str, Any]] = {}
-
-
-def _normalize_json_result(raw: str) -> str:
-    """Attempt to return a clean JSON string from agent output.
-    - If raw is valid JSON, return compact dumps.
-    - Else, try to extract a ```json fenced block.
-    - Else, try to find the first JSON object via braces.
-    - Fallback to original string if parsing fails.
-    """
-    def _ensure_timestamp(obj: Dict[str, Any]) -> Dict[str, Any]:
-        # Ensure generated_at is a current ISO-8601 UTC timestamp
-        now_iso = datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
-        if not isinstance(obj, dict):
-            return obj
-        if "generated_at" not in obj or not isinstance(obj["generated_at"], str):
-            obj["generated_at"] = now_iso
-        return obj
-
-    try:
-        parsed = json.loads(raw)
-        parsed = _ensure_timestamp(parsed)
-        return json.dumps(parsed, separators=(",", ":"))
-    except Exception:
-        pass
-
-    # Look for fenced code block ```json ... ```
-    m = re.search(r"```json\s*([\s\S]*?)\s*```", raw)
-    if m:
-        block = m.group(1).strip()
-        try:
-            parsed = json.loads(block)
-            parsed = _ensure_timestamp(parsed)
-            return json.dumps(parsed, separators=(",", ":"))
-        except Exception:
-            pass
-
-    # Heuristic: find first { ... } matching block
-    brace_start = raw.find("{")
-    brace_end = raw.rfind("}")
-    if brace_start != -1 and brace_end != -1 and brace_end > brace_start:
-        candidate = raw[brace_start:brace_end + 1]
-        try:
-            parsed = json.loads(candidate)
-            parsed = _ensure_timestamp(parsed)
-            return json.dumps(parsed, separators=(",", ":"))
-        except Exception:
-            pass
-
-    return raw
+# Job worker running inside the API process (see EMBEDDED_JOB_WORKER)
+embedded_worker: Optional[JobWorker] = None
+embedded_worker_task: Optional[asyncio.Task] = None
 
 class ResearchRequest(BaseModel):
     topic: str
 
+class ResearchBatchRequest(BaseModel):
+    topics: List[str] = []
+    # MarketListing listing_id values or document ids; researched by address
+    listing_ids: List[str] = []
+
+class ResearchBatchResponse(BaseModel):
+    batch_id: str
+    created_at: str
+    total: int
+    jobs: int  # Distinct jobs after de-duplicating repeated topics
+
 class ProjectPlanningRequest(BaseModel):
     project_description: str
 
@@ -152,22 +145,96 @@ class FileContext(BaseModel):
 
 class ResearchWithFilesRequest(BaseModel):
     topic: str
-    files: List[FileContext]
+    files: List[FileContext] = []
+    # Files registered through POST /files
+    file_ids: List[str] = []
 
 class ProjectPlanningWithFilesRequest(BaseModel):
     project_description: str
+    files: List[FileContext] = []
+    # Files registered through POST /files
+    file_ids: List[str] = []
+
+class RegisterFilesRequest(BaseModel):
     files: List[FileContext]
 
+class RegisteredFile(BaseModel):
+    file_id: str
+    fileName: str
+    chunks: int
+
 class RespondWithFilesRequest(BaseModel):
     user_query: str
-    files: List[FileContext]
+    files: List[FileContext] = []
+    # Files registered through POST /files
+    file_ids: List[str] = []
 
 class JobResponse(BaseModel):
     job_id: str
-    status: str  # "pending", "running", "completed", "failed"
+    status: str  # "pending", "running", "completed", "failed", "cancelled", "timed_out"
     created_at: str
     result: Optional[str] = None
     error: Optional[str] = None
+    progress: Optional[str] = None
+    routed_by: Optional[str] = None  # /respond jobs: "classifier", "llm" or "router"
+
+def _job_response(job: Dict[str, Any]) -> JobResponse:
+    """Build a JobResponse from a job-store snapshot"""
+    return JobResponse(
+        job_id=job["job_id"],
+        status=job["status"],
+        created_at=job["created_at"].isoformat(),
+        result=job["result_text"],
+        error=job["error_message"],
+        progress=job["progress"],
+        routed_by=job["routed_by"],
+    )
+
+def _client_key(http_request: Request) -> str:
+    """Rate-limit identity: the caller's known API key, else its address"""
+    address = http_request.client.host if http_request.client else "unknown"
+    return admission.client_key(http_request.headers.get("X-API-Key"), address)
+
+@app.exception_handler(AdmissionRejected)
+async def admission_rejected_handler(request: Request, exc: AdmissionRejected):
+    retry_after = max(1, math.ceil(exc.retry_after))
+    logger.warning(f"Request rejected | Path: {request.url.path} | Reason: {exc.reason} | Retry-After: {retry_after}s")
+    return JSONResponse(status_code=429, content={"detail": exc.reason}, headers={"Retry-After": str(retry_after)})
+
+async def _submit_job(
+    http_request: Request,
+    job_type: JobType,
+    query: str,
+    input_parameters: Dict[str, Any],
+    files: Optional[List[FileContext]] = None,
+    file_ids: Optional[List[str]] = None,
+) -> JobResponse:
+    """Enqueue a crew job keyed by its request fingerprint.
+
+    Identical requests are answered from the result cache or share the job that
+    is already computing the answer. Callers are rate limited per client, and
+    new jobs are subject to queue admission control (429 with Retry-After).
+    """
+    client_key = _client_key(http_request)
+    admission.check_rate(client_key)
+    file_dicts = [file.dict() for file in files] if files is not None else None
+    if file_dicts is not None:
+        input_parameters = {**input_parameters, "files": file_dicts}
+    if file_ids:
+        missing = await document_index.missing(file_ids)
+        if missing:
+            raise HTTPException(status_code=404, detail=f"Files not found: {', '.join(missing)}")
+        input_parameters = {**input_parameters, "file_ids": file_ids}
+    job = await job_queue.enqueue(
+        job_type,
+        query,
+        input_parameters,
+        uploaded_files=[file.fileName for file in files or []] + (file_ids or []),
+        fingerprint=request_fingerprint(job_type, query, file_dicts, file_ids),
+        subscriber=client_key,
+        client_key=client_key,
+    )
+    return _job_response(job_store.snapshot(job))
 
 @app.get("/")
 async def root():
@@ -176,13 +243,20 @@ async def root():
         "version": "1.0.0",
         "endpoints": {
             "/research": "POST - Run research crew",
+            "/research/batch": "POST - Run research crew for many topics or listings",
+            "/research/batch/{batch_id}": "GET - Batch progress; DELETE - cancel its jobs",
+            "/research/batch/{batch_id}/download": "GET - All batch results as JSON lines",
             "/project-planning": "POST - Run project planning crew", 
             "/research-with-files": "POST - Run research crew with file context",
             "/project-planning-with-files": "POST - Run project planning crew with file context",
             "/respond": "POST - Classify and generate multi-agent response",
             "/respond-with-files": "POST - Classify and generate response with file context",
-            "/jobs/{job_id}": "GET - Get job status and results",
+            "/jobs/{job_id}": "GET - Get job status and results; DELETE - cancel or delete",
+            "/jobs/{job_id}/cancel": "POST - Cancel a pending or running job",
+            "/jobs/{job_id}/events": "GET - Stream job progress as server-sent events",
+            "/jobs/{job_id}/ws": "WebSocket - Stream job progress",
             "/jobs": "GET - List all jobs",
+            "/files": "POST - Store and index documents for reuse by *-with-files requests",
             "/listings": "GET - Get market listings",
             "/listings/search": "POST - Search market listings",
             "/config": "GET - Show LLM configuration"
@@ -193,144 +267,236 @@ async def root():
 async def get_config():
     return {
         "llm_config": llm_config.get_config_info(),
+        "executor": crew_executor.get_stats(),
+        "crew_factory": crew_factory.get_stats(),
+        "job_store": job_store.get_stats(),
+        "job_events": job_events.get_stats(),
+        "job_queue": job_queue.get_stats(),
+        "intent_classifier": intent_classifier.get_stats(),
+        "document_index": document_index.get_stats(),
+        "admission": admission.get_stats(),
+        "cancellation": cancellation.get_stats(),
+        "tool_call_cache": tool_call_cache.get_stats(),
+        "search_cache": search_cache.get_stats(),
+        "page_cache": page_cache.get_stats(),
+        "search_providers": search_providers.get_stats(),
+        "file_index": file_index.get_stats(),
+        "mongodb": mongo_settings.get_stats(),
+        "listing_pager": listing_pager.get_stats(),
+        "http_client": http_client.get_stats(),
+        "async_http_client": async_http_client.get_stats(),
         "status": "ready"
     }
 
 @app.post("/research", response_model=JobResponse)
-async def start_research(request: ResearchRequest, background_tasks: BackgroundTasks):
-    job_id = str(uuid.uuid4())
-    
-    # Create job record in MongoDB
-    job = AnalysisJob(
-        job_id=job_id,
-        job_type=JobType.PROPERTY_INSIGHTS,
-        status=JobStatus.PENDING,
-        user_query=request.topic,
-        input_parameters={"topic": request.topic}
+async def start_research(request: ResearchRequest, http_request: Request):
+    return await _submit_job(
+        http_request,
+        JobType.PROPERTY_INSIGHTS,
+        request.topic,
+        {"topic": request.topic}
     )
-    await job.save()
-    
-    # Start background task
-    background_tasks.add_task(run_research_job, job_id, request.topic)
-    
-    return JobResponse(
-        job_id=job.job_id,
-        status=job.status,
-        created_at=job.created_at.isoformat(),
-        result=job.result_text,
-        error=job.error_message
+
+@app.post("/research/batch", response_model=ResearchBatchResponse)
+async def start_research_batch(request: ResearchBatchRequest, http_request: Request):
+    client_key = _client_key(http_request)
+    items = [{"topic": topic.strip()} for topic in request.topics if topic.strip()]
+    requested = len(items) + len(request.listing_ids)
+    if not requested:
+        raise HTTPException(status_code=400, detail="Provide at least one topic or listing id")
+    if requested > research_batches.max_items:
+        raise HTTPException(status_code=400, detail=f"A batch may contain at most {research_batches.max_items} items")
+    # One rate-limit token per item, as if each were submitted on its own
+    admission.check_rate(client_key, cost=requested)
+    admission.check_batch(requested, *await job_queue.pending_batch_counts(client_key))
+    if request.listing_ids:
+        listing_items, missing = await research_batches.resolve_listings(request.listing_ids)
+        if missing:
+            raise HTTPException(status_code=404, detail=f"Listings not found: {', '.join(missing)}")
+        items.extend(listing_items)
+
+    batch = await research_batches.submit(items, client_key)
+    return ResearchBatchResponse(
+        batch_id=batch.batch_id,
+        created_at=batch.created_at.isoformat(),
+        total=len(batch.items),
+        jobs=len(research_batches.job_ids(batch)),
     )
 
-@app.post("/project-planning", response_model=JobResponse)
-async def start_project_planning(request: ProjectPlanningRequest, background_tasks: BackgroundTasks):
-    job_id = str(uuid.uuid4())
-    
-    # Create job record in MongoDB
-    job = AnalysisJob(
-        job_id=job_id,
-        job_type=JobType.REPORT_GENERATION,
-        status=JobStatus.PENDING,
-        user_query=request.project_description,
-        input_parameters={"project_description": request.project_description}
+async def _get_batch(batch_id: str):
+    batch = await research_batches.get(batch_id)
+    if batch is None:
+        raise HTTPException(status_code=404, detail="Batch not found")
+    return batch
+
+@app.get("/research/batch/{batch_id}")
+async def get_research_batch(batch_id: str):
+    return await research_batches.progress(await _get_batch(batch_id))
+
+@app.get("/research/batch/{batch_id}/download")
+async def download_research_batch(batch_id: str):
+    """Every item with its result, one JSON object per line."""
+    batch = await _get_batch(batch_id)
+
+    async def lines():
+        async for record in research_batches.results(batch):
+            yield json.dumps(record, default=str) + "\n"
+
+    return StreamingResponse(
+        lines(),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": f'attachment; filename="{batch_id}.jsonl"'},
     )
-    await job.save()
-    
-    # Start background task
-    background_tasks.add_task(run_project_planning_job, job_id, request.project_description)
-    
-    return JobResponse(
-        job_id=job.job_id,
-        status=job.status,
-        created_at=job.created_at.isoformat(),
-        result=job.result_text,
-        error=job.error_message
+
+@app.delete("/research/batch/{batch_id}")
+async def cancel_research_batch(batch_id: str):
+    """Withdraw the batch from its unfinished jobs, cancelling those no other batch waits on."""
+    batch = await _get_batch(batch_id)
+    cancelled = shared = 0
+    for job_id in research_batches.job_ids(batch):
+        waiting = await _cancel_job(job_id, research_batches.subscriber(batch_id))
+        if waiting == 0:
+            cancelled += 1
+        elif waiting:
+            shared += 1
+    message = f"Cancelled {cancelled} job(s) of batch {batch_id}"
+    if shared:
+        message += f"; {shared} job(s) shared with other batches keep running"
+    return {"message": message}
+
+@app.post("/project-planning", response_model=JobResponse)
+async def start_project_planning(request: ProjectPlanningRequest, http_request: Request):
+    return await _submit_job(
+        http_request,
+        JobType.REPORT_GENERATION,
+        request.project_description,
+        {"project_description": request.project_description}
     )
 
 @app.post("/respond", response_model=JobResponse)
-async def start_response(request: RespondRequest, background_tasks: BackgroundTasks):
-    job_id = str(uuid.uuid4())
-    
-    job_store[job_id] = {
-        "job_id": job_id,
-        "status": "pending",
-        "created_at": datetime.now().isoformat(),
-        "type": "respond",
-        "input": request.user_query,
-        "result": None,
-        "error": None
-    }
-    
-    background_tasks.add_task(run_response_job, job_id, request.user_query)
-    
-    return JobResponse(**job_store[job_id])
+async def start_response(request: RespondRequest, http_request: Request):
+    return await _submit_job(
+        http_request,
+        JobType.RESPONSE,
+        request.user_query,
+        {"user_query": request.user_query}
+    )
 
 @app.get("/jobs/{job_id}", response_model=JobResponse)
 async def get_job_status(job_id: str):
-    job = await AnalysisJob.find_one(AnalysisJob.job_id == job_id)
+    job = await job_store.get(job_id)
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
     
-    return JobResponse(
-        job_id=job.job_id,
-        status=job.status,
-        created_at=job.created_at.isoformat(),
-        result=job.result_text,
-        error=job.error_message
+    return _job_response(job)
+
+@app.get("/jobs/{job_id}/events")
+async def stream_job_events(job_id: str):
+    """Stream status transitions, per-task crew outputs and LLM tokens as SSE"""
+    if not await job_store.get(job_id):
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    async def event_source():
+        async for event in job_events.stream(job_id):
+            if event is None:
+                yield ": keep-alive\n\n"
+            else:
+                yield f"event: {event['event']}\ndata: {json.dumps(event, default=str)}\n\n"
+
+    return StreamingResponse(
+        event_source(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
     )
 
+@app.websocket("/jobs/{job_id}/ws")
+async def job_events_websocket(websocket: WebSocket, job_id: str):
+    """Same event stream as /jobs/{job_id}/events over a WebSocket"""
+    await websocket.accept()
+    if not await job_store.get(job_id):
+        await websocket.close(code=4404, reason="Job not found")
+        return
+
+    try:
+        async for event in job_events.stream(job_id):
+            if event is not None:
+                await websocket.send_text(json.dumps(event, default=str))
+        await websocket.close()
+    except WebSocketDisconnect:
+        logger.info(f"Job event subscriber disconnected | Job ID: {job_id}")
+
 @app.get("/jobs")
-async def list_jobs():
-    return {"jobs": list(job_store.values())}
+async def list_jobs(limit: int = 100):
+    jobs = await job_store.list_recent(limit)
+    return {"jobs": [_job_response(job) for job in jobs]}
+
+async def _cancel_job(job_id: str, subscriber: Optional[str] = None) -> Optional[int]:
+    """Withdraw ``subscriber`` from the job; subscribers still waiting (0: cancelled), None if finished"""
+    waiting = await job_queue.cancel(job_id, subscriber)
+    if waiting != 0:
+        return waiting
+    # Stops the crew right away when the job runs in this process; a worker in
+    # another process notices at its next lease renewal
+    cancellation.cancel(job_id)
+    job_events.publish(job_id, "status", {"status": JobStatus.CANCELLED.value, "error": "Cancelled by client"})
+    return 0
+
+def _withdrawn(job_id: str, waiting: int) -> Dict[str, str]:
+    if waiting == 0:
+        return {"message": f"Job {job_id} cancelled"}
+    return {"message": f"Stopped waiting on job {job_id}; it keeps running for {waiting} other request(s)"}
+
+@app.post("/jobs/{job_id}/cancel")
+async def cancel_job(job_id: str, http_request: Request):
+    waiting = await _cancel_job(job_id, _client_key(http_request))
+    if waiting is not None:
+        return _withdrawn(job_id, waiting)
+    if await job_store.get(job_id) is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    raise HTTPException(status_code=409, detail="Job already finished")
 
 @app.delete("/jobs/{job_id}")
-async def delete_job(job_id: str):
-    if job_id not in job_store:
+async def delete_job(job_id: str, http_request: Request):
+    """Cancel a pending or running job; delete a finished one."""
+    waiting = await _cancel_job(job_id, _client_key(http_request))
+    if waiting is not None:
+        return _withdrawn(job_id, waiting)
+    if not await job_store.delete(job_id):
         raise HTTPException(status_code=404, detail="Job not found")
     
-    del job_store[job_id]
     return {"message": f"Job {job_id} deleted"}
 
 @app.post("/research-with-files", response_model=JobResponse)
-async def start_research_with_files(request: ResearchWithFilesRequest, background_tasks: BackgroundTasks):
-    job_id = str(uuid.uuid4())
-    
-    # Create job record
-    job_store[job_id] = {
-        "job_id": job_id,
-        "status": "pending",
-        "created_at": datetime.now().isoformat(),
-        "type": "research-with-files",
-        "input": request.topic,
-        "files": [file.dict() for file in request.files],
-        "result": None,
-        "error": None
-    }
-    
-    # Start background task
-    background_tasks.add_task(run_research_with_files_job, job_id, request.topic, request.files)
-    
-    return JobResponse(**job_store[job_id])
+async def start_research_with_files(request: ResearchWithFilesRequest, http_request: Request):
+    return await _submit_job(
+        http_request,
+        JobType.RESEARCH_WITH_FILES,
+        request.topic,
+        {"topic": request.topic},
+        files=request.files,
+        file_ids=request.file_ids
+    )
 
 @app.post("/project-planning-with-files", response_model=JobResponse)
-async def start_project_planning_with_files(request: ProjectPlanningWithFilesRequest, background_tasks: BackgroundTasks):
-    job_id = str(uuid.uuid4())
-    
-    # Create job record
-    job_store[job_id] = {
-        "job_id": job_id,
-        "status": "pending",
-        "created_at": datetime.now().isoformat(),
-        "type": "project-planning-with-files",
-        "input": request.project_description,
-        "files": [file.dict() for file in request.files],
-        "result": None,
-        "error": None
-    }
-    
-    # Start background task
-    background_tasks.add_task(run_project_planning_with_files_job, job_id, request.project_description, request.files)
-    
-    return JobResponse(**job_store[job_id])
+async def start_project_planning_with_files(request: ProjectPlanningWithFilesRequest, http_request: Request):
+    return await _submit_job(
+        http_request,
+        JobType.PROJECT_PLANNING_WITH_FILES,
+        request.project_description,
+        {"project_description": request.project_description},
+        files=request.files,
+        file_ids=request.file_ids
+    )
+
+@app.post("/files", response_model=List[RegisteredFile])
+async def register_files(request: RegisterFilesRequest):
+    """Store documents once; later *-with-files requests pass their file_ids
+    instead of resending the text and get only the most relevant passages"""
+    uploads = [await document_index.register(file.dict()) for file in request.files]
+    return [
+        RegisteredFile(file_id=upload.file_id, fileName=upload.original_filename, chunks=upload.chunk_count)
+        for upload in uploads
+    ]
 
 # Helper function to clean NaN values from dictionaries
 def clean_nan_values(obj: Any) -> Any:
@@ -358,9 +524,22 @@ async def get_market_listings(
     property_type: Optional[str] = None,
     status: Optional[str] = None,
     limit: int = 100,
-    skip: int = 0
+    skip: int = 0,
+    cursor: Optional[str] = None,
+    total: Optional[str] = None
 ):
-    """Get market listings with optional filters"""
+    """Get market listings with optional filters
+
+    Offset paging (``skip``/``limit``) is kept for existing callers. Pass
+    ``cursor`` (empty for the first page, then each response's
+    ``next_cursor``) for keyset paging ordered by price, which stays fast on
+    deep pages. ``total`` selects how ``total_count`` is computed: ``exact``
+    (default for offset paging), ``cached`` (default for cursor paging),
+    ``approximate`` or ``none``.
+    """
+    total_mode = total or ("exact" if cursor is None else "cached")
+    if total_mode not in TOTAL_MODES:
+        raise HTTPException(status_code=400, detail=f"total must be one of: {', '.join(TOTAL_MODES)}")
     try:
         # Build filter query
         filters = {}
@@ -380,24 +559,37 @@ async def get_market_listings(
         if status:
             filters["status"] = status
         
-        # Query database
-        cursor = MarketListing.find(filters).skip(skip).limit(limit)
-        listings = await cursor.to_list()
+        # Query database (listing reads may be served by secondaries)
+        collection = get_listings_collection(MarketListing)
+        next_cursor = None
+        if cursor is not None:
+            limit = listing_pager.page_size(limit)
+            listings, next_cursor = await listing_pager.page(collection, filters, limit, cursor)
+        else:
+            listings = await collection.find(filters).skip(skip).limit(limit).to_list(length=limit)
         
         # Get total count
-        total_count = await MarketListing.find(filters).count()
+        total_count = await listing_pager.total(collection, filters, total_mode)
         
         # Convert listings to dicts and clean NaN values
-        listings_dicts = [clean_nan_values(listing.dict()) for listing in listings]
+        listings_dicts = [clean_nan_values(MarketListing.parse_obj(listing).dict()) for listing in listings]
         
-        return {
+        response = {
             "listings": listings_dicts,
             "total_count": total_count,
+            "total_count_mode": total_mode,
             "returned_count": len(listings),
-            "skip": skip,
             "limit": limit
         }
+        if cursor is not None:
+            response["next_cursor"] = next_cursor
+            response["has_more"] = next_cursor is not None
+        else:
+            response["skip"] = skip
+        return response
         
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error fetching listings: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -457,7 +649,8 @@ async def search_listings(request: ListingSearchRequest):
 async def get_listing_stats():
     """Get market listing statistics"""
     try:
-        total_listings = await MarketListing.count()
+        collection = get_listings_collection(MarketListing)
+        total_listings = await collection.count_documents({})
         
         # Aggregate statistics
         pipeline = [
@@ -474,7 +667,7 @@ async def get_listing_stats():
             {"$limit": 10}
         ]
         
-        city_stats = await MarketListing.aggregate(pipeline).to_list()
+        city_stats = await collection.aggregate(pipeline).to_list(length=None)
         
         # Property type distribution
         type_pipeline = [
@@ -487,7 +680,7 @@ async def get_listing_stats():
             {"$sort": {"count": -1}}
         ]
         
-        type_stats = await MarketListing.aggregate(type_pipeline).to_list()
+        type_stats = await collection.aggregate(type_pipeline).to_list(length=None)
         
         # Clean NaN values from stats
         city_stats_cleaned = clean_nan_values(city_stats)
@@ -504,257 +697,15 @@ async def get_listing_stats():
         logger.error(f"Error getting listing stats: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 @app.post("/respond-with-files", response_model=JobResponse)
-async def start_response_with_files(request: RespondWithFilesRequest, background_tasks: BackgroundTasks):
-    job_id = str(uuid.uuid4())
-    
-    job_store[job_id] = {
-        "job_id": job_id,
-        "status": "pending",
-        "created_at": datetime.now().isoformat(),
-        "type": "respond-with-files",
-        "input": request.user_query,
-        "files": [file.dict() for file in request.files],
-        "result": None,
-        "error": None
-    }
-    
-    background_tasks.add_task(run_response_with_files_job, job_id, request.user_query, request.files)
-    
-    return JobResponse(**job_store[job_id])
-
-async def run_research_job(job_id: str, topic: str):
-    start_time = time.time()
-    logger.info(f"Starting research job | Job ID: {job_id}")
-    
-    # Get job from MongoDB
-    job = await AnalysisJob.find_one(AnalysisJob.job_id == job_id)
-    if not job:
-        logger.error(f"Job {job_id} not found in database")
-        return
-    
-    try:
-        # Update status to running
-        job.status = JobStatus.RUNNING
-        job.started_at = datetime.utcnow()
-        await job.save()
-        logger.info(f"Research job status updated to running | Job ID: {job_id}")
-        
-        # Run the property insights crew
-        crew = PropertyInsightsCrew()
-        logger.info(f"Running property insights crew | Job ID: {job_id}")
-        result = crew.run_insights_analysis(topic)
-        
-        duration = time.time() - start_time
-        logger.info(f"Research crew completed | Job ID: {job_id} | Duration: {duration:.2f}s | Result length: {len(str(result))} chars")
-        
-        # Update with results
-        job.status = JobStatus.COMPLETED
-        job.result_text = str(result)
-        job.completed_at = datetime.utcnow()
-        job.processing_time_seconds = duration
-        await job.save()
-        
-    except Exception as e:
-        duration = time.time() - start_time
-        logger.error(f"Research job failed | Job ID: {job_id} | Duration: {duration:.2f}s | Error: {str(e)}")
-        job.status = JobStatus.FAILED
-        job.error_message = str(e)
-        job.completed_at = datetime.utcnow()
-        job.processing_time_seconds = duration
-        await job.save()
-
-async def run_project_planning_job(job_id: str, project_description: str):
-    start_time = time.time()
-    logger.info(f"Starting project planning job | Job ID: {job_id}")
-    
-    try:
-        # Update status to running
-        job_store[job_id]["status"] = "running"
-        logger.info(f"Project planning job status updated to running | Job ID: {job_id}")
-        
-        # Run the report generation crew
-        crew = ReportGenerationCrew()
-        logger.info(f"Running report generation crew | Job ID: {job_id}")
-        result = crew.run_report_generation(project_description)
-        
-        duration = time.time() - start_time
-        logger.info(f"Project planning crew completed | Job ID: {job_id} | Duration: {duration:.2f}s | Result length: {len(str(result))} chars")
-        
-        # Update with results
-        job_store[job_id]["status"] = "completed"
-        job_store[job_id]["result"] = str(result)
-        
-    except Exception as e:
-        duration = time.time() - start_time
-        logger.error(f"Project planning job failed | Job ID: {job_id} | Duration: {duration:.2f}s | Error: {str(e)}")
-        job_store[job_id]["status"] = "failed"
-        job_store[job_id]["error"] = str(e)
-
-async def run_response_job(job_id: str, user_query: str):
-    start_time = time.time()
-    logger.info(f"Starting response job | Job ID: {job_id}")
-    
-    try:
-        job_store[job_id]["status"] = "running"
-        logger.info(f"Response job status updated to running | Job ID: {job_id}")
-        
-        crew = ResponseRoutingCrew()
-        logger.info(f"Running response routing crew | Job ID: {job_id}")
-        result = crew.run_response_workflow(user_query)
-        
-        duration = time.time() - start_time
-        logger.info(f"Response routing completed | Job ID: {job_id} | Duration: {duration:.2f}s | Result length: {len(str(result))} chars")
-        
-        job_store[job_id]["status"] = "completed"
-        job_store[job_id]["result"] = _normalize_json_result(str(result))
-    except Exception as e:
-        duration = time.time() - start_time
-        logger.error(f"Response job failed | Job ID: {job_id} | Duration: {duration:.2f}s | Error: {str(e)}")
-        job_store[job_id]["status"] = "failed"
-        job_store[job_id]["error"] = str(e)
-
-async def run_response_with_files_job(job_id: str, user_query: str, files: List[FileContext]):
-    start_time = time.time()
-    logger.info(f"Starting response with files job | Job ID: {job_id} | File count: {len(files)}")
-    
-    try:
-        job_store[job_id]["status"] = "running"
-        logger.info(f"Response with files job status updated to running | Job ID: {job_id}")
-
-        file_context = "\n\n=== DOCUMENT CONTEXT ===\n"
-        total_content_length = 0
-        for i, file in enumerate(files):
-            logger.info(f"Processing file {i+1}/{len(files)}: {file.fileName} | Job ID: {job_id}")
-            file_context += f"\n--- File: {file.fileName} ---\n"
-            file_context += f"Content: {file.content}\n"
-            total_content_length += len(file.content)
-            if file.extractedText:
-                file_context += f"Extracted Text: {file.extractedText}\n"
-                total_content_length += len(file.extractedText)
-            if file.metrics:
-                file_context += f"Metrics: {file.metrics}\n"
-        file_context += "\n=== END DOCUMENT CONTEXT ===\n\n"
-        logger.info(f"File context prepared | Job ID: {job_id} | Total content length: {total_content_length} chars")
-        
-        enhanced_query = f"{user_query}\n\n{file_context}Please consider the uploaded documents in classification and generation."
-        logger.info(f"Enhanced query length: {len(enhanced_query)} chars | Job ID: {job_id}")
-        
-        crew = ResponseRoutingCrew()
-        logger.info(f"Running response routing crew with file context | Job ID: {job_id}")
-        result = crew.run_response_workflow(enhanced_query)
-        
-        duration = time.time() - start_time
-        logger.info(f"Response with files completed | Job ID: {job_id} | Duration: {duration:.2f}s | Result length: {len(str(result))} chars")
-        
-        job_store[job_id]["status"] = "completed"
-        job_store[job_id]["result"] = _normalize_json_result(str(result))
-    except Exception as e:
-        duration = time.time() - start_time
-        logger.error(f"Response with files job failed | Job ID: {job_id} | Duration: {duration:.2f}s | Error: {str(e)}")
-        job_store[job_id]["status"] = "failed"
-        job_store[job_id]["error"] = str(e)
-
-async def run_research_with_files_job(job_id: str, topic: str, files: List[FileContext]):
-    start_time = time.time()
-    logger.info(f"Starting research with files job | Job ID: {job_id} | File count: {len(files)}")
-    
-    try:
-        # Update status to running
-        job_store[job_id]["status"] = "running"
-        logger.info(f"Research with files job status updated to running | Job ID: {job_id}")
-        
-        # Prepare context from files
-        logger.info(f"Preparing file context | Job ID: {job_id}")
-        file_context = "\n\n=== DOCUMENT CONTEXT ===\n"
-        total_content_length = 0
-        
-        for i, file in enumerate(files):
-            logger.info(f"Processing file {i+1}/{len(files)}: {file.fileName} | Job ID: {job_id}")
-            file_context += f"\n--- File: {file.fileName} ---\n"
-            file_context += f"Content: {file.content}\n"
-            total_content_length += len(file.content)
-            
-            if file.extractedText:
-                file_context += f"Extracted Text: {file.extractedText}\n"
-                total_content_length += len(file.extractedText)
-            if file.metrics:
-                file_context += f"Metrics: {file.metrics}\n"
-                
-        file_context += "\n=== END DOCUMENT CONTEXT ===\n\n"
-        logger.info(f"File context prepared | Job ID: {job_id} | Total content length: {total_content_length} chars")
-        
-        # Combine topic with file context
-        enhanced_topic = f"{topic}\n\n{file_context}Please consider the uploaded documents in your research and analysis."
-        logger.info(f"Enhanced topic length: {len(enhanced_topic)} chars | Job ID: {job_id}")
-        
-        # Run the property insights crew with enhanced context
-        crew = PropertyInsightsCrew()
-        logger.info(f"Running property insights crew with file context | Job ID: {job_id}")
-        result = crew.run_insights_analysis(enhanced_topic)
-        
-        duration = time.time() - start_time
-        logger.info(f"Research with files crew completed | Job ID: {job_id} | Duration: {duration:.2f}s | Result length: {len(str(result))} chars")
-        
-        # Update with results
-        job_store[job_id]["status"] = "completed"
-        job_store[job_id]["result"] = str(result)
-        
-    except Exception as e:
-        duration = time.time() - start_time
-        logger.error(f"Research with files job failed | Job ID: {job_id} | Duration: {duration:.2f}s | Error: {str(e)}")
-        job_store[job_id]["status"] = "failed"
-        job_store[job_id]["error"] = str(e)
-
-async def run_project_planning_with_files_job(job_id: str, project_description: str, files: List[FileContext]):
-    start_time = time.time()
-    logger.info(f"Starting project planning with files job | Job ID: {job_id} | File count: {len(files)}")
-    
-    try:
-        # Update status to running
-        job_store[job_id]["status"] = "running"
-        logger.info(f"Project planning with files job status updated to running | Job ID: {job_id}")
-        
-        # Prepare context from files
-        logger.info(f"Preparing file context | Job ID: {job_id}")
-        file_context = "\n\n=== DOCUMENT CONTEXT ===\n"
-        total_content_length = 0
-        
-        for i, file in enumerate(files):
-            logger.info(f"Processing file {i+1}/{len(files)}: {file.fileName} | Job ID: {job_id}")
-            file_context += f"\n--- File: {file.fileName} ---\n"
-            file_context += f"Content: {file.content}\n"
-            total_content_length += len(file.content)
-            
-            if file.extractedText:
-                file_context += f"Extracted Text: {file.extractedText}\n"
-                total_content_length += len(file.extractedText)
-            if file.metrics:
-                file_context += f"Metrics: {file.metrics}\n"
-                
-        file_context += "\n=== END DOCUMENT CONTEXT ===\n\n"
-        logger.info(f"File context prepared | Job ID: {job_id} | Total content length: {total_content_length} chars")
-        
-        # Combine project description with file context
-        enhanced_description = f"{project_description}\n\n{file_context}Please consider the uploaded documents in your project planning and analysis."
-        logger.info(f"Enhanced description length: {len(enhanced_description)} chars | Job ID: {job_id}")
-        
-        # Run the report generation crew with enhanced context
-        crew = ReportGenerationCrew()
-        logger.info(f"Running report generation crew with file context | Job ID: {job_id}")
-        result = crew.run_report_generation(enhanced_description)
-        
-        duration = time.time() - start_time
-        logger.info(f"Project planning with files crew completed | Job ID: {job_id} | Duration: {duration:.2f}s | Result length: {len(str(result))} chars")
-        
-        # Update with results
-        job_store[job_id]["status"] = "completed"
-        job_store[job_id]["result"] = str(result)
-        
-    except Exception as e:
-        duration = time.time() - start_time
-        logger.error(f"Project planning with files job failed | Job ID: {job_id} | Duration: {duration:.2f}s | Error: {str(e)}")
-        job_store[job_id]["status"] = "failed"
-        job_store[job_id]["error"] = str(e)
+async def start_response_with_files(request: RespondWithFilesRequest, http_request: Request):
+    return await _submit_job(
+        http_request,
+        JobType.RESPONSE_WITH_FILES,
+        request.user_query,
+        {"user_query": request.user_query},
+        files=request.files,
+        file_ids=request.file_ids
+    )
 
 if __name__ == "__main__":
     import uvicorn
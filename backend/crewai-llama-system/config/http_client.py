@@ -0,0 +1,238 @@
+import asyncio
+import inspect
+import logging
+import os
+import random
+import threading
+import weakref
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Optional
+
+import httpx
+import requests
+from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+
+class HTTPClient:
+    """Process-wide pooled HTTP client for tools and health probes.
+
+    Connections are kept alive in per-host pools of ``pool_maxsize`` (blocking
+    when full, which caps concurrent connections per host). Requests failing to
+    connect are retried with exponential backoff plus jitter, as are
+    idempotent requests answered with 429/502/503/504 (honouring
+    ``Retry-After``). A request that may have reached the server is never
+    resent: read errors are not retried, and neither are POST responses, since
+    a paid search would run twice. Probes use a second pool without retries so
+    they fail fast. ``requests`` speaks HTTP/1.1 only; reuse of warm
+    connections is where the savings come from.
+    """
+
+    RETRY_STATUSES = (429, 502, 503, 504)
+    IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE", "TRACE"})
+
+    def __init__(self):
+        self.pool_hosts = int(os.getenv("HTTP_POOL_HOSTS", "32"))
+        self.pool_maxsize = int(os.getenv("HTTP_POOL_MAXSIZE", "10"))
+        self.pool_block = os.getenv("HTTP_POOL_BLOCK", "true").lower() == "true"
+        self.connect_timeout = float(os.getenv("HTTP_CONNECT_TIMEOUT_SECONDS", "5"))
+        self.read_timeout = float(os.getenv("HTTP_READ_TIMEOUT_SECONDS", "30"))
+        self.retries = int(os.getenv("HTTP_RETRIES", "2"))
+        self.backoff_factor = float(os.getenv("HTTP_RETRY_BACKOFF_SECONDS", "0.5"))
+        self.backoff_jitter = float(os.getenv("HTTP_RETRY_JITTER_SECONDS", "0.5"))
+        self.user_agent = os.getenv("HTTP_USER_AGENT", "Mozilla/5.0")
+        self._sessions: Dict[bool, requests.Session] = {}
+        self._lock = threading.Lock()
+        self._requests = 0
+        self._errors = 0
+
+    def _retry(self) -> Retry:
+        options: Dict[str, Any] = {
+            "total": self.retries,
+            "connect": self.retries,
+            "read": 0,
+            "status": self.retries,
+            "backoff_factor": self.backoff_factor,
+            "status_forcelist": self.RETRY_STATUSES,
+            # Connect errors are retried for any method; statuses only for these
+            "allowed_methods": self.IDEMPOTENT_METHODS,
+            "respect_retry_after_header": True,
+            "raise_on_status": False,
+        }
+        # backoff_jitter needs urllib3 2.x
+        if "backoff_jitter" in inspect.signature(Retry.__init__).parameters:
+            options["backoff_jitter"] = self.backoff_jitter
+        return Retry(**options)
+
+    def session(self, retry: bool = True) -> requests.Session:
+        session = self._sessions.get(retry)
+        if session is None:
+            with self._lock:
+                session = self._sessions.get(retry)
+                if session is None:
+                    session = requests.Session()
+                    adapter = HTTPAdapter(
+                        pool_connections=self.pool_hosts,
+                        pool_maxsize=self.pool_maxsize,
+                        pool_block=self.pool_block,
+                        max_retries=self._retry() if retry else 0,
+                    )
+                    session.mount("https://", adapter)
+                    session.mount("http://", adapter)
+                    session.headers["User-Agent"] = self.user_agent
+                    self._sessions[retry] = session
+        return session
+
+    def request(
+        self, method: str, url: str, timeout: Optional[float] = None, retry: bool = True, **kwargs: Any
+    ) -> requests.Response:
+        """Send a request; ``timeout`` is the read timeout (connect is capped by it too)."""
+        read_timeout = timeout if timeout is not None else self.read_timeout
+        self._requests += 1
+        try:
+            return self.session(retry).request(
+                method, url, timeout=(min(self.connect_timeout, read_timeout), read_timeout), **kwargs
+            )
+        except requests.RequestException:
+            self._errors += 1
+            raise
+
+    def get(self, url: str, **kwargs: Any) -> requests.Response:
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs: Any) -> requests.Response:
+        return self.request("POST", url, **kwargs)
+
+    def close(self):
+        with self._lock:
+            for session in self._sessions.values():
+                session.close()
+            self._sessions.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "pool_hosts": self.pool_hosts,
+            "pool_maxsize": self.pool_maxsize,
+            "retries": self.retries,
+            "requests": self._requests,
+            "errors": self._errors,
+        }
+
+
+class AsyncHTTPClient:
+    """``httpx`` counterpart of :class:`HTTPClient` for async tool implementations.
+
+    Uses the same pool size, timeouts, retry policy and user agent, and
+    negotiates HTTP/2 where the server offers it, so concurrent requests to one
+    host share a connection. httpx connections belong to an event loop, so one
+    client is kept per loop (crews run async tools on their own loops). Retries
+    are done here rather than in the transport so that 429/5xx answers back off
+    like the sync client.
+    """
+
+    def __init__(self, settings: HTTPClient):
+        self.settings = settings
+        self._clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = (
+            weakref.WeakKeyDictionary()
+        )
+        self._requests = 0
+        self._retried = 0
+        self._errors = 0
+
+    def client(self) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        client = self._clients.get(loop)
+        if client is None or client.is_closed:
+            settings = self.settings
+            client = httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=settings.pool_hosts * settings.pool_maxsize,
+                    max_keepalive_connections=settings.pool_hosts * settings.pool_maxsize,
+                ),
+                headers={"User-Agent": settings.user_agent},
+                follow_redirects=True,
+                http2=True,
+            )
+            self._clients[loop] = client
+        return client
+
+    def _delay(self, attempt: int, response: Optional[httpx.Response]) -> float:
+        retry_after = response.headers.get("Retry-After") if response is not None else None
+        if retry_after and retry_after.isdigit():
+            return float(retry_after)
+        return self.settings.backoff_factor * (2 ** attempt) + random.uniform(0, self.settings.backoff_jitter)
+
+    async def _send(
+        self, method: str, url: str, timeout: Optional[float], retry: bool, stream: bool, **kwargs: Any
+    ) -> httpx.Response:
+        settings = self.settings
+        read_timeout = timeout if timeout is not None else settings.read_timeout
+        client = self.client()
+        request = client.build_request(
+            method, url, timeout=httpx.Timeout(read_timeout, connect=min(settings.connect_timeout, read_timeout)), **kwargs
+        )
+        retries = settings.retries if retry else 0
+        idempotent = method.upper() in HTTPClient.IDEMPOTENT_METHODS
+        self._requests += 1
+        for attempt in range(retries + 1):
+            try:
+                response = await client.send(request, stream=stream)
+            except httpx.TransportError as e:
+                # Only a request that never reached the server is safe to resend
+                if attempt == retries or not isinstance(e, (httpx.ConnectError, httpx.ConnectTimeout)):
+                    self._errors += 1
+                    raise
+                response = None
+            else:
+                if not idempotent or response.status_code not in HTTPClient.RETRY_STATUSES or attempt == retries:
+                    return response
+                await response.aclose()
+            self._retried += 1
+            await asyncio.sleep(self._delay(attempt, response))
+        raise AssertionError("unreachable")
+
+    async def request(
+        self, method: str, url: str, timeout: Optional[float] = None, retry: bool = True, **kwargs: Any
+    ) -> httpx.Response:
+        """Send a request and read the body; ``timeout`` is the read timeout."""
+        return await self._send(method, url, timeout, retry, False, **kwargs)
+
+    async def get(self, url: str, **kwargs: Any) -> httpx.Response:
+        return await self.request("GET", url, **kwargs)
+
+    async def post(self, url: str, **kwargs: Any) -> httpx.Response:
+        return await self.request("POST", url, **kwargs)
+
+    @asynccontextmanager
+    async def stream(
+        self, method: str, url: str, timeout: Optional[float] = None, retry: bool = True, **kwargs: Any
+    ) -> AsyncIterator[httpx.Response]:
+        """Send a request without reading the body; the response is closed on exit."""
+        response = await self._send(method, url, timeout, retry, True, **kwargs)
+        try:
+            yield response
+        finally:
+            await response.aclose()
+
+    async def aclose(self):
+        """Close the running loop's client; clients of other loops go with their loops."""
+        client = self._clients.pop(asyncio.get_running_loop(), None)
+        if client is not None:
+            await client.aclose()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "clients": len(self._clients),
+            "requests": self._requests,
+            "retried": self._retried,
+            "errors": self._errors,
+        }
+
+
+http_client = HTTPClient()
+async_http_client = AsyncHTTPClient(http_client)
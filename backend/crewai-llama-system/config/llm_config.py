@@ -1,8 +1,9 @@
 import os
-import requests
 from crewai import LLM
 from dotenv import load_dotenv
 
+from .http_client import http_client
+
 # Ensure .env values take precedence over any pre-set environment variables
 load_dotenv(override=True)
 
@@ -13,25 +14,36 @@ class LLMConfig:
         self.debug = os.getenv("DEBUG", "false").lower() == "true"
         # Explicit control to allow or disable Gemini fallback when using local provider
         self.allow_gemini_fallback = os.getenv("ALLOW_GEMINI_FALLBACK", "false").lower() == "true"
+        # Stream completions so job subscribers receive tokens as they are generated
+        self.stream = os.getenv("LLM_STREAM", "false").lower() == "true"
         
-    def get_llm(self) -> LLM:
+    def get_llm(self, **llm_kwargs) -> LLM:
         if self.provider == "ollama":
-            return self._get_ollama_llm()
+            return self._get_ollama_llm(**llm_kwargs)
         elif self.provider == "vllm":
-            return self._get_vllm_llm()
+            return self._get_vllm_llm(**llm_kwargs)
         elif self.provider == "gemini":
-            return self._get_gemini_llm()
+            return self._get_gemini_llm(**llm_kwargs)
         elif self.provider == "local":
             # Strict local usage by default. Only fallback to Gemini if explicitly allowed.
             if self.allow_gemini_fallback and not self._local_endpoint_available():
-                gem_llm = self._maybe_get_gemini_fallback()
+                gem_llm = self._maybe_get_gemini_fallback(**llm_kwargs)
                 if gem_llm is not None:
                     return gem_llm
-            return self._get_local_llm()
+            return self._get_local_llm(**llm_kwargs)
         else:
             raise ValueError(f"Unsupported LLM provider: {self.provider}")
+
+    def get_structured_llm(self, schema) -> LLM:
+        """LLM whose output is constrained to the JSON schema of a Pydantic model.
+
+        ``response_format`` is translated per provider by LiteLLM: Ollama's
+        ``format`` schema, guided JSON decoding on vLLM/OpenAI-compatible servers
+        and Gemini's response schema.
+        """
+        return self.get_llm(response_format=schema)
     
-    def _get_ollama_llm(self) -> LLM:
+    def _get_ollama_llm(self, **llm_kwargs) -> LLM:
         base_url = os.getenv("OLLAMA_BASE_URL", "http://localhost:11434")
         model = os.getenv("OLLAMA_MODEL", "llama3.1:8b-instruct")
         
@@ -39,9 +51,11 @@ class LLMConfig:
             model=f"ollama/{model}",
             base_url=base_url,
             temperature=0.7,
+            stream=self.stream,
+            **llm_kwargs,
         )
     
-    def _get_vllm_llm(self) -> LLM:
+    def _get_vllm_llm(self, **llm_kwargs) -> LLM:
         base_url = os.getenv("VLLM_BASE_URL", "http://localhost:8000/v1")
         model = os.getenv("VLLM_MODEL", "meta-llama/Llama-3.1-8B-Instruct")
         
@@ -49,10 +63,12 @@ class LLMConfig:
             model=f"openai/{model}",
             base_url=base_url,
             temperature=0.7,
+            stream=self.stream,
             api_key="sk-no-key-required", # Required for local OpenAI-compatible servers
+            **llm_kwargs,
         )
     
-    def _get_gemini_llm(self) -> LLM:
+    def _get_gemini_llm(self, **llm_kwargs) -> LLM:
         api_key = os.getenv("GEMINI_API_KEY")
         
         if not api_key:
@@ -62,9 +78,11 @@ class LLMConfig:
             model="gemini-flash-latest",
             api_key=api_key,
             temperature=0.7,
+            stream=self.stream,
+            **llm_kwargs,
         )
     
-    def _get_local_llm(self) -> LLM:
+    def _get_local_llm(self, **llm_kwargs) -> LLM:
         base_url = os.getenv("LOCAL_BASE_URL", "http://localhost:8000/v1")
         model = os.getenv("LOCAL_MODEL", "local-model")
         api_key = os.getenv("OPENAI_API_KEY", "sk-no-key-required")
@@ -73,7 +91,9 @@ class LLMConfig:
             model=f"openai/{model}",
             base_url=base_url,
             temperature=0.7,
+            stream=self.stream,
             api_key=api_key,
+            **llm_kwargs,
         )
 
     def _local_endpoint_available(self) -> bool:
@@ -84,7 +104,7 @@ class LLMConfig:
         model = os.getenv("LOCAL_MODEL", "local-model")
         try:
             # Quick reachability check
-            resp = requests.get(f"{base_url}/models", timeout=3)
+            resp = http_client.get(f"{base_url}/models", timeout=3, retry=False)
             if resp.status_code != 200:
                 return False
 
@@ -104,12 +124,12 @@ class LLMConfig:
                 "max_tokens": 5,
                 "temperature": 0.0,
             }
-            comp = requests.post(f"{base_url}/chat/completions", json=data, headers=headers, timeout=3)
+            comp = http_client.post(f"{base_url}/chat/completions", json=data, headers=headers, timeout=3, retry=False)
             return comp.status_code == 200
         except Exception:
             return False
 
-    def _maybe_get_gemini_fallback(self) -> LLM | None:
+    def _maybe_get_gemini_fallback(self, **llm_kwargs) -> LLM | None:
         """Return a Gemini LLM if GEMINI_API_KEY is configured; otherwise None."""
         api_key = os.getenv("GEMINI_API_KEY")
         if not api_key:
@@ -118,8 +138,21 @@ class LLMConfig:
             model="gemini-flash-latest",
             api_key=api_key,
             temperature=0.7,
+            stream=self.stream,
+            **llm_kwargs,
         )
     
+    def get_model_name(self) -> str:
+        """Identifier of the configured model, without probing the endpoint."""
+        if self.provider == "gemini":
+            return "gemini-flash-latest"
+        defaults = {
+            "ollama": "llama3.1:8b-instruct",
+            "vllm": "meta-llama/Llama-3.1-8B-Instruct",
+            "local": "local-model",
+        }
+        return f"{self.provider}/{os.getenv(f'{self.provider.upper()}_MODEL', defaults.get(self.provider, ''))}"
+    
     def get_config_info(self) -> dict:
         if self.provider == "gemini":
             return {
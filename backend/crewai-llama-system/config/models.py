@@ -1,6 +1,7 @@
 #!/usr/bin/env python3
 
 from beanie import Document, Indexed
+from pymongo import ASCENDING, DESCENDING, IndexModel
 from pydantic import BaseModel, Field
 from typing import Optional, List, Dict, Any
 from datetime import datetime
@@ -11,12 +12,16 @@ class JobStatus(str, Enum):
     RUNNING = "running" 
     COMPLETED = "completed"
     FAILED = "failed"
+    CANCELLED = "cancelled"
+    TIMED_OUT = "timed_out"  # Wall-clock or token budget exhausted
 
 class JobType(str, Enum):
     PROPERTY_INSIGHTS = "property_insights"
     REPORT_GENERATION = "report_generation"
     RESEARCH_WITH_FILES = "research_with_files"
     PROJECT_PLANNING_WITH_FILES = "project_planning_with_files"
+    RESPONSE = "response"
+    RESPONSE_WITH_FILES = "response_with_files"
 
 class FileType(str, Enum):
     PDF = "pdf"
@@ -224,7 +229,8 @@ class MarketListing(Document):
         indexes = [
             "address",
             "city",
-            "listing_price",
+            # Keyset pagination order of GET /listings; also serves price ranges
+            IndexModel([("listing_price", ASCENDING), ("_id", ASCENDING)]),
             "status", 
             "list_date",
             "property_type",
@@ -254,18 +260,92 @@ class AnalysisJob(Document):
     property_insight_id: Optional[str] = None  # Reference to PropertyInsight
     report_id: Optional[str] = None  # Reference to RealEstateReport
     error_message: Optional[str] = None
+    progress: Optional[str] = None  # Latest human-readable progress note
+    task_outputs: List[Dict[str, Any]] = []  # Per-task crew outputs as they finish
     
     # Performance metrics
     processing_time_seconds: Optional[float] = None
     tokens_used: Optional[int] = None
     
+    # Response jobs: "classifier" (fast-path intent), "llm" (one-call LLM label)
+    # or "router" (router agent)
+    routed_by: Optional[str] = None
+    
+    # Request fingerprint used for result caching and de-duplication
+    fingerprint: Optional[str] = None
+    
+    # Research batch this job was submitted with (see src/jobs/batch.py)
+    batch_id: Optional[str] = None
+    
+    # Clients waiting on this job; identical requests collapse onto one job, which
+    # is only cancelled once every subscriber has cancelled (see JobQueue.cancel)
+    subscribers: List[str] = []
+    
+    # Client that submitted the job (rate-limit identity; see src/jobs/admission.py)
+    client_key: Optional[str] = None
+    
+    # Queue bookkeeping (see src/jobs/queue.py)
+    available_at: datetime = Field(default_factory=datetime.utcnow)
+    priority: int = 0  # Higher is claimed first (see src/jobs/admission.py)
+    attempts: int = 0
+    max_attempts: int = 3
+    lease_owner: Optional[str] = None  # Worker ID holding the job
+    lease_expires_at: Optional[datetime] = None
+    
     class Settings:
         name = "analysis_jobs"
         indexes = [
             "job_id",
             "status",
             "created_at",
-            "job_type"
+            "job_type",
+            # In-flight lookup for identical requests
+            IndexModel([("fingerprint", ASCENDING), ("status", ASCENDING)]),
+            # Claim query: highest-priority, oldest pending job that is due
+            IndexModel([("status", ASCENDING), ("priority", DESCENDING), ("available_at", ASCENDING)]),
+            # Lease recovery: running jobs whose worker stopped renewing
+            IndexModel([("status", ASCENDING), ("lease_expires_at", ASCENDING)]),
+            # Per-batch concurrency: running jobs of each batch. batch_id is stored as
+            # null on standalone jobs, so only jobs that belong to a batch are indexed.
+            IndexModel(
+                [("batch_id", ASCENDING), ("status", ASCENDING)],
+                name="batch_id_status_batched",
+                partialFilterExpression={"batch_id": {"$type": "string"}},
+            ),
+        ]
+
+class ResearchBatch(Document):
+    """A batch of research jobs submitted together"""
+    
+    batch_id: Indexed(str, unique=True)
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    client_key: Optional[str] = None
+    # One entry per requested topic: topic, listing_id (if any) and job_id
+    items: List[Dict[str, Any]] = []
+    
+    class Settings:
+        name = "research_batches"
+        indexes = [
+            "batch_id",
+            "created_at",
+        ]
+
+class CachedResult(Document):
+    """Completed crew results keyed by request fingerprint"""
+    
+    fingerprint: Indexed(str, unique=True)
+    job_type: JobType
+    query: Optional[str] = None
+    result_text: str
+    source_job_id: Optional[str] = None
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    expires_at: datetime
+    
+    class Settings:
+        name = "cached_results"
+        indexes = [
+            # Mongo removes entries once expires_at has passed
+            IndexModel([("expires_at", ASCENDING)], expireAfterSeconds=0),
         ]
 
 class FileUpload(Document):
@@ -297,13 +377,38 @@ class FileUpload(Document):
     key_entities: List[str] = []  # Extracted entities
     metadata: Dict[str, Any] = {}
     
+    # Retrieval index (see src/jobs/document_index.py)
+    content_hash: Optional[str] = None
+    chunk_count: int = 0
+    
     class Settings:
         name = "file_uploads"
         indexes = [
             "file_id",
             "uploaded_at",
             "job_id",
-            "processing_status"
+            "processing_status",
+            # One upload per document; rows registered without a hash are not indexed
+            IndexModel(
+                [("content_hash", ASCENDING)],
+                name="content_hash_unique",
+                unique=True,
+                partialFilterExpression={"content_hash": {"$type": "string"}},
+            ),
+        ]
+
+class DocumentChunk(Document):
+    """Passage of an uploaded file, retrieved by with-files jobs"""
+    
+    file_id: str
+    position: int
+    label: str  # "Content" or "Extracted Text"
+    text: str
+    
+    class Settings:
+        name = "document_chunks"
+        indexes = [
+            IndexModel([("file_id", ASCENDING), ("position", ASCENDING)], unique=True),
         ]
 
 # Additional utility schemas
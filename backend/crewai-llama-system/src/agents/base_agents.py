@@ -1,4 +1,5 @@
-from crewai import Agent
+from typing import Optional
+from crewai import Agent, LLM
 from config import default_llm
 
 
@@ -66,7 +67,7 @@ class BaseAgents:
         )
 
     @staticmethod
-    def create_unified_response_agent() -> Agent:
+    def create_unified_response_agent(llm: Optional[LLM] = None) -> Agent:
         return Agent(
             role="Unified Response Generator",
             goal="Generate polished, structured user-facing responses from router JSON for analytics, document, or chat",
@@ -75,7 +76,7 @@ class BaseAgents:
             - For document: compile listings/extractions with filters and sources
             - For chat: respond concisely with helpful information
             Outputs are structured JSON designed for frontend consumption, including sections/blocks and sources.""",
-            llm=default_llm,
+            llm=llm or default_llm,
             verbose=True,
             allow_delegation=False,
             max_iter=3,
@@ -1,5 +1,6 @@
+from .factory import CrewFactory, crew_factory
 from .property_insights_crew import PropertyInsightsCrew
 from .report_generation_crew import ReportGenerationCrew
 from .response_routing_crew import ResponseRoutingCrew
 
-__all__ = ["PropertyInsightsCrew", "ReportGenerationCrew", "ResponseRoutingCrew"]
+__all__ = ["CrewFactory", "crew_factory", "PropertyInsightsCrew", "ReportGenerationCrew", "ResponseRoutingCrew"]
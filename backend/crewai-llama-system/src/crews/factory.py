@@ -0,0 +1,109 @@
+import logging
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+from crewai import Crew
+
+from src.runtime import JobCancelled, step_checkpoint
+
+logger = logging.getLogger(__name__)
+
+
+class CrewFactory:
+    """Build each crew once per executor thread and reuse it for later jobs.
+
+    A ``Crew`` (with its agents and tasks) carries state while it runs, so a
+    built crew is never shared between threads; each crew-worker thread keeps
+    its own copy and runs jobs on it one at a time. Tool instances are shared
+    process-wide by ``CustomTools``. Task descriptions are re-interpolated from
+    their templates on every kickoff. Before each run the per-job
+    ``task_callback`` is set on every task (CrewAI only fills in an empty
+    ``task.callback``, so the crew's own field is not enough) and each agent's
+    retry count is cleared. Every crew gets a ``step_callback`` that checks the
+    running job's cancellation token after each agent step; a stopped job drops
+    its agents' ``max_retry_limit`` to zero, since CrewAI retries a task that
+    raised, and the next kickoff restores it.
+    """
+
+    def __init__(self):
+        self.enabled = os.getenv("CREW_REUSE_ENABLED", "true").lower() == "true"
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._builds = 0
+        self._reuses = 0
+        self._build_seconds = 0.0
+
+    def get(
+        self,
+        key: Hashable,
+        build: Callable[[], Crew],
+        task_callback: Optional[Callable[[Any], None]] = None,
+    ) -> Crew:
+        # Each crew is kept with its agents' configured retry limits
+        crews: Dict[Hashable, Tuple[Crew, List[int]]] = getattr(self._local, "crews", None)
+        if crews is None:
+            crews = self._local.crews = {}
+
+        entry = crews.get(key) if self.enabled else None
+        if entry is None:
+            start_time = time.perf_counter()
+            crew = build()
+            elapsed = time.perf_counter() - start_time
+            entry = (crew, [agent.max_retry_limit for agent in crew.agents])
+            with self._lock:
+                self._builds += 1
+                self._build_seconds += elapsed
+            logger.info(f"Crew built | Key: {key} | Construction time: {elapsed * 1000:.1f}ms")
+            if self.enabled:
+                crews[key] = entry
+        else:
+            with self._lock:
+                self._reuses += 1
+                average = self._build_seconds / self._builds if self._builds else 0.0
+            logger.info(f"Crew reused | Key: {key} | Construction time saved: ~{average * 1000:.1f}ms")
+
+        crew, retry_limits = entry
+        self._reset(crew, retry_limits, task_callback)
+        return crew
+
+    @staticmethod
+    def _reset(crew: Crew, retry_limits: List[int], task_callback: Optional[Callable[[Any], None]]):
+        """Clear what the previous job left on a reused crew."""
+        crew.task_callback = task_callback
+        crew.step_callback = _stop_retries_when_cancelled(crew)
+        for task in crew.tasks:
+            task.callback = task_callback
+        for agent, retry_limit in zip(crew.agents, retry_limits):
+            agent.step_callback = crew.step_callback
+            # Failed attempts count against max_retry_limit for the agent's lifetime
+            agent._times_executed = 0
+            agent.max_retry_limit = retry_limit
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Build counts and the construction time saved by reuse (this process only)."""
+        with self._lock:
+            average = self._build_seconds / self._builds if self._builds else 0.0
+            return {
+                "enabled": self.enabled,
+                "builds": self._builds,
+                "reuses": self._reuses,
+                "avg_construction_ms": round(average * 1000, 1),
+                "construction_ms_saved": round(average * self._reuses * 1000, 1),
+            }
+
+
+def _stop_retries_when_cancelled(crew: Crew) -> Callable[[Any], None]:
+    def step_callback(step: Any):
+        try:
+            step_checkpoint(step)
+        except JobCancelled:
+            for agent in crew.agents:
+                agent.max_retry_limit = 0
+            raise
+
+    return step_callback
+
+
+crew_factory = CrewFactory()
@@ -1,6 +1,10 @@
+from typing import Any, Callable, Optional
 from crewai import Task, Crew
 from src.agents import BaseAgents
 from src.tools import CustomTools
+from src.crews.factory import crew_factory
+from src.runtime import checkpoint
+from src.tools.research import parallel_researcher
 
 
 class PropertyInsightsCrew:
@@ -8,7 +12,7 @@ class PropertyInsightsCrew:
         self.agents = BaseAgents()
         self.tools = CustomTools()
         
-    def create_insights_crew(self) -> Crew:
+    def create_insights_crew(self, task_callback: Optional[Callable[[Any], None]] = None) -> Crew:
         insights_agent = self.agents.create_property_insights_agent()
         report_agent = self.agents.create_report_generation_agent()
         
@@ -35,6 +39,11 @@ class PropertyInsightsCrew:
             - Research Zillow, Realtor.com, and other real estate platforms
             - Look for recent sales, property tax records, and market reports
             - Gather economic data for the local area
+            - Research evidence below was searched and fetched in parallel before you started;
+              rely on it first and only call tools to fill specific gaps
+
+            Research evidence:
+            {evidence}
 
             Query: {topic}
             """,
@@ -66,9 +75,12 @@ class PropertyInsightsCrew:
             tasks=[insights_task, report_task],
             verbose=True,
             memory=False,
+            task_callback=task_callback,
         )
     
-    def run_insights_analysis(self, topic: str) -> str:
-        crew = self.create_insights_crew()
-        result = crew.kickoff(inputs={"topic": topic})
+    def run_insights_analysis(self, topic: str, task_callback: Optional[Callable[[Any], None]] = None) -> str:
+        evidence = parallel_researcher.gather(topic)
+        checkpoint()
+        crew = crew_factory.get("insights", self.create_insights_crew, task_callback)
+        result = crew.kickoff(inputs={"topic": topic, "evidence": evidence or "None gathered; use the tools."})
         return result
@@ -1,6 +1,8 @@
+from typing import Any, Callable, Optional
 from crewai import Task, Crew
 from src.agents import BaseAgents
 from src.tools import CustomTools
+from src.crews.factory import crew_factory
 
 
 class ReportGenerationCrew:
@@ -8,7 +10,7 @@ class ReportGenerationCrew:
         self.agents = BaseAgents()
         self.tools = CustomTools()
         
-    def create_report_crew(self) -> Crew:
+    def create_report_crew(self, task_callback: Optional[Callable[[Any], None]] = None) -> Crew:
         insights_agent = self.agents.create_property_insights_agent()
         report_agent = self.agents.create_report_generation_agent()
         
@@ -71,9 +73,10 @@ class ReportGenerationCrew:
             tasks=[market_analysis_task, answer_task],
             verbose=True,
             memory=False,
+            task_callback=task_callback,
         )
     
-    def run_report_generation(self, project_description: str) -> str:
-        crew = self.create_report_crew()
+    def run_report_generation(self, project_description: str, task_callback: Optional[Callable[[Any], None]] = None) -> str:
+        crew = crew_factory.get("report", self.create_report_crew, task_callback)
         result = crew.kickoff(inputs={"project_description": project_description})
         return result
\ No newline at end of file
@@ -1,6 +1,54 @@
-from crewai import Task, Crew
+import os
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Any, Callable, Optional
+import re
+from crewai import Task, Crew, LLM
+from crewai.tasks.task_output import TaskOutput
+from config import default_llm, llm_config
 from src.agents import BaseAgents
 from src.tools import CustomTools
+from src.crews.factory import crew_factory
+from src.crews.response_schema import StructuredResponse
+
+# Constrain the generator to the StructuredResponse schema via the provider's
+# JSON-schema decoding instead of asking for JSON in the prompt
+STRUCTURED_OUTPUT = os.getenv("STRUCTURED_OUTPUT", "true").lower() == "true"
+
+# Classify with one tool-free LLM call before the crew runs, so chat queries never
+# reach the tool-using router and the generator gets type-specific instructions
+RESPONSE_PIPELINE = os.getenv("RESPONSE_PIPELINE", "true").lower() == "true"
+
+RESPONSE_TYPE_GUIDANCE = {
+    "analytics": "For analytics: include insights, metrics, and chart-ready blocks.",
+    "document": "For document: return a results list with applied filters, and source references.",
+    "chat": "For chat: provide a concise helpful message.",
+}
+
+# Few-shot examples used inside the router prompt for classification; also the
+# seed training set for the fast-path intent classifier (src/jobs/intent.py)
+ROUTER_FEW_SHOTS = [
+    {"input": "Predict which properties might drop in value next quarter.", "output": "analytics"},
+    {"input": "Show me a graph of housing price trends in Austin, TX over the last 5 years.", "output": "analytics"},
+    {"input": "Show me apartments in downtown Dallas under $1,500.", "output": "document"},
+    {"input": "Find luxury homes for sale in Jakarta.", "output": "document"},
+    {"input": "Extract key clauses from this contract about termination.", "output": "document"},
+    {"input": "Hey CURA, can you help me find something?", "output": "chat"},
+    {"input": "What's the weather like today?", "output": "chat"},
+    {"input": "Thanks, that was helpful!", "output": "chat"},
+]
+
+
+@lru_cache(maxsize=1)
+def structured_llm() -> LLM:
+    return llm_config.get_structured_llm(StructuredResponse)
+
+
+def report_step(task_callback: Optional[Callable[[Any], None]], name: str, description: str, output: Any) -> Any:
+    """Hand a single-LLM-call step to ``task_callback`` as a crew would a finished task."""
+    if task_callback is not None:
+        task_callback(TaskOutput(name=name, description=description, raw=str(output), agent="Response pipeline"))
+    return output
 
 
 class ResponseRoutingCrew:
@@ -8,25 +56,28 @@ class ResponseRoutingCrew:
         self.agents = BaseAgents()
         self.tools = CustomTools()
 
-    def create_response_crew(self) -> Crew:
+    def create_response_crew(
+        self,
+        task_callback: Optional[Callable[[Any], None]] = None,
+        response_type: Optional[str] = None,
+    ) -> Crew:
         router_agent = self.agents.create_insight_router_agent()
-        generator_agent = self.agents.create_unified_response_agent()
-
-        # Assign tools to router; generator only needs file tools for optional formatting/reads
-        router_agent.tools = self.tools.get_web_tools() + self.tools.get_file_tools()
-        generator_agent.tools = self.tools.get_file_tools()
-
-        # Few-shot examples used inside the router prompt for classification
-        few_shots = [
-            {"input": "Predict which properties might drop in value next quarter.", "output": "analytics"},
-            {"input": "Show me a graph of housing price trends in Austin, TX over the last 5 years.", "output": "analytics"},
-            {"input": "Show me apartments in downtown Dallas under $1,500.", "output": "document"},
-            {"input": "Find luxury homes for sale in Jakarta.", "output": "document"},
-            {"input": "Extract key clauses from this contract about termination.", "output": "document"},
-            {"input": "Hey CURA, can you help me find something?", "output": "chat"},
-            {"input": "What's the weather like today?", "output": "chat"},
-            {"input": "Thanks, that was helpful!", "output": "chat"},
-        ]
+        generator_agent = self.agents.create_unified_response_agent(structured_llm() if STRUCTURED_OUTPUT else None)
+
+        # Assign tools to router (no web research for chat); generator only needs file tools
+        # for optional formatting/reads. A schema-constrained generator cannot emit tool
+        # calls, so it gets none.
+        web_tools = [] if response_type == "chat" else self.tools.get_web_tools()
+        router_agent.tools = web_tools + self.tools.get_file_tools()
+        generator_agent.tools = [] if STRUCTURED_OUTPUT else self.tools.get_file_tools()
+
+        if response_type:
+            # Already classified upstream; the router only gathers context
+            classification = f"""The response_type has already been determined: {response_type}.
+            Use it as-is in your output and spend your effort on context gathering."""
+        else:
+            classification = f"""Use the following few-shot guidance to map queries to response_type:
+            {ROUTER_FEW_SHOTS}"""
 
         router_task = Task(
             description=f"""
@@ -35,8 +86,7 @@ class ResponseRoutingCrew:
             - document
             - chat
 
-            Use the following few-shot guidance to map queries to response_type:
-            {few_shots}
+            {classification}
 
             Then prepare structured context via tool calls when helpful:
             - Use perplexity_search for comprehensive web research. Prefer queries like: site:zillow.com OR site:realtor.com plus user intent.
@@ -79,14 +129,13 @@ class ResponseRoutingCrew:
             expected_output="Strict JSON data contract for the Report Agent",
         )
 
-        generator_task = Task(
-            description="""
-            You are the Report Agent (Generator). Consume the router JSON and produce the final structured response.
-            Adapt output to the response_type:
-            - For analytics: include insights, metrics, and chart-ready blocks.
-            - For document: return a results list with applied filters, and source references.
-            - For chat: provide a concise helpful message.
-
+        if STRUCTURED_OUTPUT:
+            output_contract = """
+            Your output is constrained to the response schema: fill response_type, title, summary,
+            blocks (text, table or chart), sources and next_actions.
+            """
+        else:
+            output_contract = """
             OUTPUT STRICT JSON ONLY with this schema:
             {
               "response_type": "analytics" | "document" | "chat",
@@ -101,12 +150,27 @@ class ResponseRoutingCrew:
               "next_actions": ["..."],
               "generated_at": "ISO-8601 timestamp"
             }
+            """
 
+        if response_type in RESPONSE_TYPE_GUIDANCE:
+            guidance = f"""The response_type is {response_type}.
+            {RESPONSE_TYPE_GUIDANCE[response_type]}"""
+        else:
+            guidance = "Adapt output to the response_type:\n" + "\n".join(
+                f"            - {text}" for text in RESPONSE_TYPE_GUIDANCE.values()
+            )
+
+        generator_task = Task(
+            description=f"""
+            You are the Report Agent (Generator). Consume the router JSON and produce the final structured response.
+            {guidance}
+            {output_contract}
             Use the router JSON faithfully. Do not hallucinate sources.
             """,
             agent=generator_agent,
             expected_output="Strict JSON final response for frontend",
             context=[router_task],
+            output_pydantic=StructuredResponse if STRUCTURED_OUTPUT else None,
         )
 
         return Crew(
@@ -114,10 +178,68 @@ class ResponseRoutingCrew:
             tasks=[router_task, generator_task],
             verbose=True,
             memory=False,
+            task_callback=task_callback,
         )
 
-    def run_response_workflow(self, user_query: str) -> str:
-        crew = self.create_response_crew()
+    def run_response_workflow(
+        self,
+        user_query: str,
+        response_type: Optional[str] = None,
+        task_callback: Optional[Callable[[Any], None]] = None,
+    ) -> str:
+        crew = crew_factory.get(
+            ("response", response_type), lambda: self.create_response_crew(response_type=response_type), task_callback
+        )
         result = crew.kickoff(inputs={"user_query": user_query})
+        if STRUCTURED_OUTPUT and result.pydantic is not None:
+            return result.pydantic.json()
         return result
 
+    def classify_response_type(self, user_query: str, task_callback: Optional[Callable[[Any], None]] = None) -> str:
+        """Pick the response_type with a single tool-free LLM call (empty if unclear)."""
+        examples = "\n".join(f"Query: {shot['input']}\nType: {shot['output']}" for shot in ROUTER_FEW_SHOTS)
+        prompt = f"""
+        Classify the user query into exactly one response type: analytics, document or chat.
+        Answer with the single word only.
+
+        {examples}
+
+        Query: {user_query}
+        Type:"""
+        answer = str(default_llm.call([{"role": "user", "content": prompt}])).lower()
+        match = re.search(r"\b(analytics|document|chat)\b", answer)
+        label = match.group(1) if match else ""
+        return report_step(task_callback, "classify_response_type", "Classify the query's response type", label)
+
+    def run_chat_response(self, user_query: str, task_callback: Optional[Callable[[Any], None]] = None) -> str:
+        """Answer a conversational query with one LLM call instead of the router crew."""
+        if STRUCTURED_OUTPUT:
+            prompt = f"""
+            You are CURA, a friendly real estate assistant. Reply to the user's message concisely,
+            with response_type "chat" and your reply as the summary.
+
+            User message: {user_query}
+            """
+            answer = structured_llm().call([{"role": "user", "content": prompt}])
+            return report_step(task_callback, "chat_response", "Reply to a conversational query", answer)
+
+        generated_at = datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
+        prompt = f"""
+        You are CURA, a friendly real estate assistant. Reply to the user's message concisely.
+
+        OUTPUT STRICT JSON ONLY with this schema:
+        {{
+          "response_type": "chat",
+          "title": "Short title",
+          "summary": "Your reply to the user",
+          "blocks": [],
+          "sources": [],
+          "next_actions": ["optional follow-up suggestions"],
+          "generated_at": "{generated_at}"
+        }}
+
+        User message: {user_query}
+        """
+        answer = default_llm.call([{"role": "user", "content": prompt}])
+        return report_step(task_callback, "chat_response", "Reply to a conversational query", answer)
+
@@ -0,0 +1,38 @@
+from typing import Any, Dict, List, Literal, Optional, Union
+
+from pydantic import BaseModel, Field
+
+
+class TextBlock(BaseModel):
+    type: Literal["text"] = "text"
+    heading: str
+    body: str
+
+
+class TableBlock(BaseModel):
+    type: Literal["table"] = "table"
+    columns: List[str]
+    rows: List[List[str]]
+
+
+class ChartBlock(BaseModel):
+    type: Literal["chart"] = "chart"
+    chart_type: Literal["line", "bar", "table", "map"]
+    data: Dict[str, Any] = Field(default_factory=lambda: {"series": []})
+
+
+class Source(BaseModel):
+    title: str
+    url: str
+
+
+class StructuredResponse(BaseModel):
+    """Final response contract consumed by the frontend (the generator's output)."""
+
+    response_type: Literal["analytics", "document", "chat"]
+    title: str
+    summary: str
+    blocks: List[Union[TextBlock, TableBlock, ChartBlock]] = Field(default_factory=list)
+    sources: List[Source] = Field(default_factory=list)
+    next_actions: List[str] = Field(default_factory=list)
+    generated_at: Optional[str] = None
@@ -0,0 +1,25 @@
+from .admission import AdmissionController, AdmissionRejected, admission
+from .batch import ResearchBatches, research_batches
+from .document_index import DocumentIndex, document_index
+from .events import JobEventBus, job_events
+from .executor import CrewExecutor, crew_executor, run_crew
+from .intent import IntentClassifier, intent_classifier
+from .queue import JobQueue, job_queue
+from .result_cache import ResultCache, request_fingerprint, result_cache
+from .semantic_cache import SemanticCache, semantic_cache
+from .store import JobStateStore, job_store
+from .worker import JobWorker
+
+__all__ = [
+    "AdmissionController", "AdmissionRejected", "admission",
+    "ResearchBatches", "research_batches",
+    "DocumentIndex", "document_index",
+    "JobEventBus", "job_events",
+    "CrewExecutor", "crew_executor", "run_crew",
+    "IntentClassifier", "intent_classifier",
+    "JobQueue", "job_queue",
+    "ResultCache", "request_fingerprint", "result_cache",
+    "SemanticCache", "semantic_cache",
+    "JobStateStore", "job_store",
+    "JobWorker",
+]
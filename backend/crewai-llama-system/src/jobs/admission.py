@@ -0,0 +1,148 @@
+import hashlib
+import logging
+import os
+import time
+from typing import Any, Dict, Optional, Tuple
+
+from config.models import JobType
+
+logger = logging.getLogger(__name__)
+
+# Claim priority per lane: interactive responses are claimed ahead of research,
+# which is claimed ahead of long-form report generation
+LANE_PRIORITY = {"interactive": 10, "standard": 5, "batch": 0}
+
+JOB_LANES = {
+    JobType.RESPONSE: "interactive",
+    JobType.RESPONSE_WITH_FILES: "interactive",
+    JobType.PROPERTY_INSIGHTS: "standard",
+    JobType.RESEARCH_WITH_FILES: "standard",
+    JobType.REPORT_GENERATION: "batch",
+    JobType.PROJECT_PLANNING_WITH_FILES: "batch",
+}
+
+
+class AdmissionRejected(Exception):
+    """Request refused because a client or the queue is over its limit."""
+
+    def __init__(self, reason: str, retry_after: float):
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    """Per-client token buckets and per-lane limits on queued crew jobs.
+
+    Each client (a known API key from ``ADMISSION_API_KEYS``, else its address)
+    gets a bucket of
+    ``burst`` requests refilled at ``rate_per_minute``. New jobs are refused once
+    the number of pending jobs reaches the lane's share of ``max_queue_depth``,
+    so batch work backs off first and interactive requests keep headroom.
+    Buckets are per process; queue depth is read from Mongo and shared.
+
+    Research batches cost one token per item and may overdraw the bucket (a
+    batch is admitted once the bucket is full), so the client then waits until
+    it has paid the batch off. Their jobs are capped separately: at most
+    ``max_pending_batch_jobs`` pending in total and
+    ``max_pending_batch_jobs_per_client`` per client.
+    """
+
+    def __init__(self):
+        self.rate_per_minute = float(os.getenv("RATE_LIMIT_PER_MINUTE", "30"))
+        self.burst = float(os.getenv("RATE_LIMIT_BURST", "10"))
+        self.max_clients = int(os.getenv("RATE_LIMIT_MAX_CLIENTS", "10000"))
+        self.api_keys = {key.strip() for key in os.getenv("ADMISSION_API_KEYS", "").split(",") if key.strip()}
+        self.max_queue_depth = int(os.getenv("ADMISSION_MAX_QUEUE_DEPTH", "100"))
+        self.lane_share = {
+            "interactive": 1.0,
+            "standard": float(os.getenv("ADMISSION_STANDARD_QUEUE_SHARE", "0.8")),
+            "batch": float(os.getenv("ADMISSION_BATCH_QUEUE_SHARE", "0.5")),
+        }
+        self.queue_retry_after = float(os.getenv("ADMISSION_RETRY_AFTER_SECONDS", "10"))
+        self.max_pending_batch_jobs = int(os.getenv("ADMISSION_MAX_PENDING_BATCH_JOBS", "2000"))
+        self.max_pending_batch_jobs_per_client = int(os.getenv("ADMISSION_MAX_PENDING_BATCH_JOBS_PER_CLIENT", "500"))
+        self._buckets: Dict[str, Tuple[float, float]] = {}
+        self._rate_limited = 0
+        self._queue_rejected = 0
+
+    @staticmethod
+    def lane(job_type: JobType) -> str:
+        return JOB_LANES.get(job_type, "standard")
+
+    def priority(self, job_type: JobType) -> int:
+        return LANE_PRIORITY[self.lane(job_type)]
+
+    def client_key(self, api_key: Optional[str], address: str) -> str:
+        """Client identity for rate limits and job ownership.
+
+        Only configured API keys count: an unknown key would give its sender a
+        fresh bucket per request, so it is identified by address instead. Keys
+        are hashed because the identity is stored on jobs.
+        """
+        if api_key and api_key in self.api_keys:
+            return f"key:{hashlib.sha256(api_key.encode('utf-8')).hexdigest()[:16]}"
+        return f"ip:{address}"
+
+    def check_rate(self, client_key: str, cost: float = 1.0):
+        """Take ``cost`` tokens from the client's bucket or raise ``AdmissionRejected``.
+
+        A cost above ``burst`` needs a full bucket and leaves it in debt.
+        """
+        if self.rate_per_minute <= 0:
+            return
+        now = time.monotonic()
+        refill = self.rate_per_minute / 60.0
+        tokens, updated_at = self._buckets.pop(client_key, (self.burst, now))
+        tokens = min(self.burst, tokens + (now - updated_at) * refill)
+        needed = min(cost, self.burst)
+        if tokens < needed:
+            self._buckets[client_key] = (tokens, now)
+            self._rate_limited += 1
+            raise AdmissionRejected("Rate limit exceeded", (needed - tokens) / refill)
+
+        # Re-inserted at the end, so the dict stays ordered by last use
+        self._buckets[client_key] = (tokens - cost, now)
+        while len(self._buckets) > self.max_clients:
+            self._buckets.pop(next(iter(self._buckets)))
+
+    def queue_limit(self, job_type: JobType) -> int:
+        return int(self.max_queue_depth * self.lane_share[self.lane(job_type)])
+
+    def check_depth(self, job_type: JobType, pending: int):
+        """Refuse a new job when its lane's share of the queue is used up."""
+        limit = self.queue_limit(job_type)
+        if pending >= limit:
+            self._queue_rejected += 1
+            logger.warning(f"Queue saturated, rejecting {job_type.value} job | Pending: {pending} | Lane limit: {limit}")
+            raise AdmissionRejected("Job queue is full, retry later", self.queue_retry_after)
+
+    def check_batch(self, items: int, pending: int, pending_for_client: int):
+        """Refuse a batch of ``items`` jobs that would exceed the pending batch job caps."""
+        if pending_for_client + items > self.max_pending_batch_jobs_per_client:
+            reason = f"Too many pending batch jobs for this client (limit {self.max_pending_batch_jobs_per_client})"
+        elif pending + items > self.max_pending_batch_jobs:
+            reason = "Batch queue is full, retry later"
+        else:
+            return
+        self._queue_rejected += 1
+        logger.warning(
+            f"Rejecting research batch | Items: {items} | Pending: {pending} | Pending for client: {pending_for_client}"
+        )
+        raise AdmissionRejected(reason, self.queue_retry_after)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "rate_per_minute": self.rate_per_minute,
+            "burst": self.burst,
+            "tracked_clients": len(self._buckets),
+            "api_keys": len(self.api_keys),
+            "rate_limited": self._rate_limited,
+            "max_queue_depth": self.max_queue_depth,
+            "queue_rejected": self._queue_rejected,
+            "max_pending_batch_jobs": self.max_pending_batch_jobs,
+            "max_pending_batch_jobs_per_client": self.max_pending_batch_jobs_per_client,
+        }
+
+
+admission = AdmissionController()
@@ -0,0 +1,181 @@
+import asyncio
+import logging
+import os
+import uuid
+from collections import Counter
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from bson import ObjectId
+from bson.errors import InvalidId
+
+from config.models import AnalysisJob, JobType, MarketListing, ResearchBatch
+from src.jobs.queue import JobQueue, job_queue
+from src.jobs.result_cache import request_fingerprint
+from src.jobs.store import TERMINAL_STATUSES
+
+logger = logging.getLogger(__name__)
+
+
+def listing_topic(listing: Dict[str, Any]) -> str:
+    """Research topic for a market listing: its full address."""
+    address = f"{listing['address']}, {listing['city']}, {listing['state']}"
+    if listing.get("zip_code"):
+        address += f" {listing['zip_code']}"
+    return address
+
+
+class ResearchBatches:
+    """Submit many property research jobs at once and follow them as one unit.
+
+    Each topic becomes an ordinary ``property_insights`` job tagged with the
+    batch id, so repeated topics (within the batch or across batches) collapse
+    onto one job or are answered from the result cache. The batch subscribes to
+    its jobs as ``batch:<batch_id>``, so cancelling it only stops jobs no other
+    batch is waiting on; batch jobs never merge with interactive requests. The queue runs batch
+    jobs in the batch lane with a per-batch concurrency limit; identical tool
+    calls made by concurrently running jobs are shared by the tool call cache.
+    """
+
+    def __init__(self, queue: JobQueue = job_queue):
+        self.queue = queue
+        self.max_items = int(os.getenv("BATCH_MAX_ITEMS", "500"))
+        self.submit_concurrency = int(os.getenv("BATCH_SUBMIT_CONCURRENCY", "16"))
+        self.download_chunk_size = int(os.getenv("BATCH_DOWNLOAD_CHUNK_SIZE", "50"))
+
+    async def resolve_listings(self, listing_ids: List[str]) -> Tuple[List[Dict[str, Any]], List[str]]:
+        """Batch items for ``listing_ids`` (``listing_id`` or document id), plus the ids not found."""
+        object_ids = []
+        for listing_id in listing_ids:
+            try:
+                object_ids.append(ObjectId(listing_id))
+            except (InvalidId, TypeError):
+                pass
+        docs = await MarketListing.get_motor_collection().find(
+            {"$or": [{"listing_id": {"$in": listing_ids}}, {"_id": {"$in": object_ids}}]},
+            {"listing_id": 1, "address": 1, "city": 1, "state": 1, "zip_code": 1},
+        ).to_list(None)
+
+        by_id: Dict[str, Dict[str, Any]] = {}
+        for doc in docs:
+            by_id[str(doc["_id"])] = doc
+            if doc.get("listing_id"):
+                by_id[doc["listing_id"]] = doc
+        items = [
+            {"topic": listing_topic(by_id[listing_id]), "listing_id": listing_id}
+            for listing_id in listing_ids
+            if listing_id in by_id
+        ]
+        return items, [listing_id for listing_id in listing_ids if listing_id not in by_id]
+
+    @staticmethod
+    def subscriber(batch_id: str) -> str:
+        return f"batch:{batch_id}"
+
+    async def submit(self, items: List[Dict[str, Any]], client_key: Optional[str] = None) -> ResearchBatch:
+        """Enqueue one research job per item (``topic``, optional ``listing_id``).
+
+        If an enqueue or the batch insert fails, the batch withdraws from the
+        jobs it already enqueued (cancelling those nobody else waits on) and the
+        error is raised, so a failed submission leaves no untracked work behind.
+        """
+        batch_id = f"batch_{uuid.uuid4().hex}"
+        slots = asyncio.Semaphore(self.submit_concurrency)
+
+        async def enqueue(item: Dict[str, Any]):
+            topic = item["topic"]
+            async with slots:
+                job = await self.queue.enqueue(
+                    JobType.PROPERTY_INSIGHTS,
+                    topic,
+                    {"topic": topic},
+                    fingerprint=request_fingerprint(JobType.PROPERTY_INSIGHTS, topic),
+                    batch_id=batch_id,
+                    subscriber=self.subscriber(batch_id),
+                    client_key=client_key,
+                )
+            item["job_id"] = job.job_id
+
+        try:
+            # Every enqueue finishes before failing, so no job is left half-recorded
+            outcomes = await asyncio.gather(*(enqueue(item) for item in items), return_exceptions=True)
+            failures = [outcome for outcome in outcomes if isinstance(outcome, BaseException)]
+            if failures:
+                raise failures[0]
+            batch = ResearchBatch(batch_id=batch_id, client_key=client_key, items=items)
+            await batch.insert()
+        except BaseException:
+            await self._withdraw(batch_id, [item["job_id"] for item in items if "job_id" in item])
+            raise
+        logger.info(
+            f"Research batch submitted | Batch ID: {batch_id} | Items: {len(items)} | "
+            f"Jobs: {len({item['job_id'] for item in items})}"
+        )
+        return batch
+
+    async def _withdraw(self, batch_id: str, job_ids: List[str]):
+        subscriber = self.subscriber(batch_id)
+        for job_id in dict.fromkeys(job_ids):
+            try:
+                await self.queue.cancel(job_id, subscriber)
+            except Exception as e:
+                logger.error(f"Failed to withdraw batch from job | Batch ID: {batch_id} | Job ID: {job_id} | Error: {str(e)}")
+        logger.warning(f"Research batch submission failed; withdrew from its jobs | Batch ID: {batch_id} | Jobs: {len(job_ids)}")
+
+    async def get(self, batch_id: str) -> Optional[ResearchBatch]:
+        return await ResearchBatch.find_one(ResearchBatch.batch_id == batch_id)
+
+    @staticmethod
+    def job_ids(batch: ResearchBatch) -> List[str]:
+        return list(dict.fromkeys(item["job_id"] for item in batch.items))
+
+    async def _jobs(self, job_ids: List[str], projection: Dict[str, int]) -> Dict[str, Dict[str, Any]]:
+        docs = await AnalysisJob.get_motor_collection().find(
+            {"job_id": {"$in": job_ids}}, {"job_id": 1, **projection}
+        ).to_list(None)
+        return {doc["job_id"]: doc for doc in docs}
+
+    async def progress(self, batch: ResearchBatch) -> Dict[str, Any]:
+        """Per-status counts and per-item status of a batch."""
+        jobs = await self._jobs(self.job_ids(batch), {"status": 1, "progress": 1, "error_message": 1})
+        items = []
+        for item in batch.items:
+            job = jobs.get(item["job_id"], {})
+            items.append({
+                **item,
+                "status": job.get("status", "deleted"),
+                "progress": job.get("progress"),
+                "error": job.get("error_message"),
+            })
+        counts = Counter(item["status"] for item in items)
+        finished = sum(count for status, count in counts.items() if status in TERMINAL_STATUSES or status == "deleted")
+        return {
+            "batch_id": batch.batch_id,
+            "created_at": batch.created_at.isoformat(),
+            "total": len(items),
+            "counts": dict(counts),
+            "finished": finished,
+            "done": finished == len(items),
+            "items": items,
+        }
+
+    async def results(self, batch: ResearchBatch) -> AsyncIterator[Dict[str, Any]]:
+        """One record per item with its result, loading results a chunk at a time."""
+        for start in range(0, len(batch.items), self.download_chunk_size):
+            chunk = batch.items[start:start + self.download_chunk_size]
+            jobs = await self._jobs(
+                list({item["job_id"] for item in chunk}),
+                {"status": 1, "result_text": 1, "error_message": 1, "completed_at": 1},
+            )
+            for item in chunk:
+                job = jobs.get(item["job_id"], {})
+                completed_at = job.get("completed_at")
+                yield {
+                    **item,
+                    "status": job.get("status", "deleted"),
+                    "result": job.get("result_text"),
+                    "error": job.get("error_message"),
+                    "completed_at": completed_at.isoformat() if completed_at else None,
+                }
+
+
+research_batches = ResearchBatches()
@@ -0,0 +1,222 @@
+import json
+import logging
+import math
+import os
+import re
+from collections import Counter
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from src.jobs.result_cache import file_content_hash
+
+logger = logging.getLogger(__name__)
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+(?:[.,'][a-z0-9]+)*")
+_STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in is it its of on or that the this to was were will with "
+    "what which who how me my i you your please consider".split()
+)
+
+
+def tokenize(text: str) -> List[str]:
+    return [t for t in _TOKEN_RE.findall(text.lower()) if t not in _STOPWORDS]
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough LLM token count (about four characters per token for English text)."""
+    return len(text) // 4 + 1
+
+
+def chunk_text(text: str, chunk_chars: int, overlap_chars: int) -> List[str]:
+    """Split ``text`` into ~``chunk_chars`` pieces, preferring paragraph and sentence breaks."""
+    text = text.strip()
+    if len(text) <= chunk_chars:
+        return [text] if text else []
+
+    chunks = []
+    start = 0
+    while start < len(text):
+        end = min(start + chunk_chars, len(text))
+        if end < len(text):
+            window = text[start:end]
+            # Break at the last paragraph, then sentence, boundary in the back half
+            for separator in ("\n\n", "\n", ". "):
+                cut = window.rfind(separator, chunk_chars // 2)
+                if cut != -1:
+                    end = start + cut + len(separator)
+                    break
+        chunks.append(text[start:end].strip())
+        if end >= len(text):
+            break
+        overlap_start = max(end - overlap_chars, start + 1)
+        # Start the overlap on a word boundary
+        space = text.find(" ", overlap_start, end)
+        start = space + 1 if space != -1 else overlap_start
+    return [chunk for chunk in chunks if chunk]
+
+
+def bm25_scores(query_terms: Sequence[str], documents: Sequence[Sequence[str]], k1: float = 1.5, b: float = 0.75) -> List[float]:
+    """Okapi BM25 score of each tokenized document against ``query_terms``."""
+    if not documents:
+        return []
+    n = len(documents)
+    avg_len = sum(len(doc) for doc in documents) / n or 1.0
+    document_frequency = Counter(term for doc in documents for term in set(doc))
+    terms = set(query_terms)
+
+    scores = []
+    for doc in documents:
+        frequencies = Counter(doc)
+        score = 0.0
+        for term in terms:
+            tf = frequencies.get(term)
+            if not tf:
+                continue
+            df = document_frequency[term]
+            idf = math.log(1 + (n - df + 0.5) / (df + 0.5))
+            score += idf * tf * (k1 + 1) / (tf + k1 * (1 - b + b * len(doc) / avg_len))
+        scores.append(score)
+    return scores
+
+
+@dataclass
+class _Chunk:
+    file_index: int
+    position: int
+    label: str
+    text: str
+
+
+class DocumentContextBuilder:
+    """Build the DOCUMENT CONTEXT section of a with-files prompt under a token budget.
+
+    Identical uploads are included once. Each file's ``content`` and
+    ``extractedText`` are chunked; chunks are ranked by BM25 against the user
+    query and the best ones are kept until ``token_budget`` is spent, then
+    emitted grouped by file in document order. Small inputs fit whole.
+
+    Everything rendered counts against the budget: the section markers, each
+    file's header and metrics, and the chunk labels. At most ``max_files``
+    files are listed (those with the most relevant chunks); when the rest does
+    not fit, metrics are dropped, least relevant file first, before any chunk.
+
+    Passages already retrieved from the document index (files referenced by
+    id) compete for the same budget as inline uploads.
+    """
+
+    OPEN = "\n\n=== DOCUMENT CONTEXT ===\n"
+    CLOSE = "\n=== END DOCUMENT CONTEXT ===\n\n"
+
+    def __init__(self):
+        self.token_budget = int(os.getenv("DOC_CONTEXT_TOKEN_BUDGET", "6000"))
+        self.chunk_chars = int(os.getenv("DOC_CONTEXT_CHUNK_CHARS", "1600"))
+        self.overlap_chars = int(os.getenv("DOC_CONTEXT_CHUNK_OVERLAP_CHARS", "200"))
+        self.max_metrics_chars = int(os.getenv("DOC_CONTEXT_MAX_METRICS_CHARS", "1000"))
+        self.max_files = int(os.getenv("DOC_CONTEXT_MAX_FILES", "20"))
+
+    def _unique(self, files: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        seen = set()
+        unique = []
+        for file in files:
+            digest = file_content_hash(file)
+            if digest not in seen:
+                seen.add(digest)
+                unique.append(file)
+        return unique
+
+    def _metrics(self, metrics: Any) -> str:
+        text = json.dumps(metrics, default=str, separators=(",", ":"))
+        if len(text) > self.max_metrics_chars:
+            text = text[:self.max_metrics_chars] + "…"
+        return text
+
+    def _header(self, file_name: str, metrics: Any) -> str:
+        header = f"\n--- File: {file_name} ---\n"
+        if metrics:
+            header += f"Metrics: {self._metrics(metrics)}\n"
+        return header
+
+    @staticmethod
+    def _line(chunk: _Chunk) -> str:
+        return f"{chunk.label}: {chunk.text}\n"
+
+    def build(
+        self,
+        files: List[Dict[str, Any]],
+        query: str,
+        job_id: str,
+        retrieved: Optional[List[Dict[str, Any]]] = None,
+    ) -> str:
+        """Render ``files`` plus ``retrieved`` files (``fileName``, ``metrics`` and
+        ``passages``, a list of ``(label, text)`` in document order)."""
+        unique = self._unique(files)
+        if len(unique) < len(files):
+            logger.info(f"Skipped {len(files) - len(unique)} duplicate file(s) | Job ID: {job_id}")
+
+        # (fileName, metrics) per file, in order
+        sources: List[Tuple[str, Any]] = []
+        chunks: List[_Chunk] = []
+        for file_index, file in enumerate(unique):
+            sources.append((file["fileName"], file.get("metrics")))
+            for label, key in (("Content", "content"), ("Extracted Text", "extractedText")):
+                for text in chunk_text(file.get(key) or "", self.chunk_chars, self.overlap_chars):
+                    chunks.append(_Chunk(file_index, len(chunks), label, text))
+        for file in retrieved or ():
+            file_index = len(sources)
+            sources.append((file["fileName"], file.get("metrics")))
+            for label, text in file["passages"]:
+                chunks.append(_Chunk(file_index, len(chunks), label, text))
+        total_tokens = sum(estimate_tokens(self._line(chunk)) for chunk in chunks)
+
+        scores = bm25_scores(tokenize(query), [tokenize(chunk.text) for chunk in chunks])
+        # Ties (e.g. no query overlap) favour earlier chunks
+        ranked = [chunk for _, chunk in sorted(zip(scores, chunks), key=lambda pair: (-pair[0], pair[1].position))]
+        # Files in order of their best chunk; files without text come last
+        relevance = list(dict.fromkeys([chunk.file_index for chunk in ranked] + list(range(len(sources)))))
+
+        shown = sorted(relevance[:self.max_files])
+        omitted = len(sources) - len(shown)
+        footer = f"\n({omitted} more file(s) not shown)\n" if omitted else ""
+        if omitted:
+            ranked = [chunk for chunk in ranked if chunk.file_index in shown]
+            logger.info(f"Listing {len(shown)} of {len(sources)} files | Job ID: {job_id}")
+
+        headers = {index: self._header(*sources[index]) for index in shown}
+        fixed = sum(estimate_tokens(part) for part in (self.OPEN, self.CLOSE, footer) if part)
+        available = sum(estimate_tokens(self._line(chunk)) for chunk in ranked)
+        # Drop metrics, least relevant file first, until headers and chunks fit
+        for index in reversed([index for index in relevance if index in headers]):
+            if fixed + sum(estimate_tokens(h) for h in headers.values()) + available <= self.token_budget:
+                break
+            headers[index] = self._header(sources[index][0], None)
+        budget = self.token_budget - fixed - sum(estimate_tokens(h) for h in headers.values())
+
+        selected = []
+        for chunk in ranked:
+            cost = estimate_tokens(self._line(chunk))
+            if cost <= budget:
+                selected.append(chunk)
+                budget -= cost
+        selected.sort(key=lambda chunk: chunk.position)
+
+        by_file: Dict[int, List[_Chunk]] = {}
+        for chunk in selected:
+            by_file.setdefault(chunk.file_index, []).append(chunk)
+
+        parts = [self.OPEN]
+        for file_index in shown:
+            parts.append(headers[file_index])
+            for chunk in by_file.get(file_index, ()):
+                parts.append(self._line(chunk))
+        parts.append(footer)
+        parts.append(self.CLOSE)
+        context = "".join(parts)
+
+        logger.info(
+            f"File context prepared | Job ID: {job_id} | Files: {len(shown)}/{len(sources)} | "
+            f"Chunks: {len(selected)}/{len(chunks)} | Est. tokens: {estimate_tokens(context)} (of {total_tokens} available)"
+        )
+        return context
+
+
+document_context_builder = DocumentContextBuilder()
@@ -0,0 +1,186 @@
+import asyncio
+import logging
+import os
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from pymongo import ReplaceOne
+from pymongo.errors import DuplicateKeyError
+
+from config.models import DocumentChunk, FileType, FileUpload
+from src.jobs.document_context import DocumentContextBuilder, bm25_scores, chunk_text, document_context_builder, tokenize
+from src.jobs.result_cache import file_content_hash
+from src.jobs.semantic_cache import embed_query
+
+logger = logging.getLogger(__name__)
+
+
+def file_type_of(mime_type: str) -> FileType:
+    mime_type = (mime_type or "").lower()
+    if "pdf" in mime_type:
+        return FileType.PDF
+    if mime_type.startswith("image/"):
+        return FileType.IMAGE
+    if mime_type.startswith("text/"):
+        return FileType.TEXT
+    return FileType.DOCUMENT
+
+
+@dataclass
+class _IndexedFile:
+    file_id: str
+    file_name: str
+    metrics: Any
+    passages: List[Tuple[str, str]]
+    terms: List[List[str]]
+    vectors: Optional[np.ndarray] = None
+
+
+class DocumentIndex:
+    """Retrieval over uploaded documents stored once in ``file_uploads``.
+
+    Files are content-addressed: registering the same document again returns the
+    existing ``file_id``. Their chunks live in ``document_chunks``; a job that
+    references files by id loads them (through a small LRU of tokenized files)
+    and keeps only the top-k passages by BM25, optionally blended with cosine
+    similarity of hashed n-gram embeddings.
+    """
+
+    def __init__(self, builder: DocumentContextBuilder = document_context_builder):
+        self.builder = builder
+        self.top_k = int(os.getenv("DOC_INDEX_TOP_K", "12"))
+        self.use_embeddings = os.getenv("DOC_INDEX_EMBEDDINGS", "false").lower() == "true"
+        self.embedding_weight = float(os.getenv("DOC_INDEX_EMBEDDING_WEIGHT", "0.5"))
+        self.max_cached_files = int(os.getenv("DOC_INDEX_CACHE_FILES", "64"))
+        self.dim = int(os.getenv("SEMANTIC_CACHE_DIM", "512"))
+        self._files: "OrderedDict[str, _IndexedFile]" = OrderedDict()
+
+    async def register(self, file: Dict[str, Any]) -> FileUpload:
+        """Persist and chunk a serialized ``FileContext`` unless it is already stored."""
+        content_hash = file_content_hash(file)
+        passages = [
+            (label, text)
+            for label, key in (("Content", "content"), ("Extracted Text", "extractedText"))
+            for text in chunk_text(file.get(key) or "", self.builder.chunk_chars, self.builder.overlap_chars)
+        ]
+
+        upload = FileUpload(
+            file_id=f"file_{content_hash[:24]}",
+            original_filename=file["fileName"],
+            file_type=file_type_of(file.get("fileType")),
+            file_size_bytes=len((file.get("content") or "").encode("utf-8")) + len((file.get("extractedText") or "").encode("utf-8")),
+            extracted_text=file.get("extractedText"),
+            processing_status="pending",
+            metadata={"metrics": file.get("metrics"), "clauses": file.get("clauses")},
+            content_hash=content_hash,
+            chunk_count=len(passages),
+        )
+        collection = FileUpload.get_motor_collection()
+        try:
+            # Upsert on the unique content_hash so concurrent uploads of one document register it once
+            existing = await collection.find_one_and_update(
+                {"content_hash": content_hash},
+                {"$setOnInsert": upload.dict(exclude={"id", "revision_id"})},
+                upsert=True,
+            )
+        except DuplicateKeyError:
+            existing = await collection.find_one({"content_hash": content_hash})
+        if existing is not None:
+            upload = FileUpload.parse_obj(existing)
+            if upload.processing_status == "processed":
+                return upload
+
+        # Also finishes a registration that stopped before its chunks were stored
+        await self._store_chunks(upload, passages)
+        logger.info(f"File indexed | File ID: {upload.file_id} | Name: {upload.original_filename} | Chunks: {len(passages)}")
+        return upload
+
+    async def _store_chunks(self, upload: FileUpload, passages: List[Tuple[str, str]]):
+        """Write the chunks by (file_id, position); concurrent registrations write the same rows."""
+        chunks = DocumentChunk.get_motor_collection()
+        if passages:
+            await chunks.bulk_write([
+                ReplaceOne(
+                    {"file_id": upload.file_id, "position": position},
+                    {"file_id": upload.file_id, "position": position, "label": label, "text": text},
+                    upsert=True,
+                )
+                for position, (label, text) in enumerate(passages)
+            ], ordered=False)
+        await chunks.delete_many({"file_id": upload.file_id, "position": {"$gte": len(passages)}})
+        upload.processing_status = "processed"
+        await FileUpload.get_motor_collection().update_one(
+            {"file_id": upload.file_id}, {"$set": {"processing_status": "processed"}}
+        )
+
+    async def missing(self, file_ids: List[str]) -> List[str]:
+        found = set(await FileUpload.get_motor_collection().distinct(
+            "file_id", {"file_id": {"$in": file_ids}, "processing_status": "processed"}
+        ))
+        return [file_id for file_id in file_ids if file_id not in found]
+
+    async def _load(self, file_id: str) -> Optional[_IndexedFile]:
+        indexed = self._files.get(file_id)
+        if indexed is not None:
+            self._files.move_to_end(file_id)
+            return indexed
+
+        upload = await FileUpload.find_one(FileUpload.file_id == file_id, FileUpload.processing_status == "processed")
+        if upload is None:
+            return None
+        chunks = await DocumentChunk.find(DocumentChunk.file_id == file_id).sort("position").to_list()
+        indexed = _IndexedFile(
+            file_id=file_id,
+            file_name=upload.original_filename,
+            metrics=upload.metadata.get("metrics"),
+            passages=[(chunk.label, chunk.text) for chunk in chunks],
+            terms=[],
+        )
+        await asyncio.get_running_loop().run_in_executor(None, self._analyze, indexed)
+
+        self._files[file_id] = indexed
+        while len(self._files) > self.max_cached_files:
+            self._files.popitem(last=False)
+        return indexed
+
+    def _analyze(self, indexed: _IndexedFile):
+        """Tokenize (and optionally embed) a file's passages; CPU-bound."""
+        indexed.terms = [tokenize(text) for _, text in indexed.passages]
+        if self.use_embeddings and indexed.passages:
+            indexed.vectors = np.stack([embed_query(text, self.dim) for _, text in indexed.passages])
+
+    def _rank(self, files: List[_IndexedFile], query: str) -> List[Dict[str, Any]]:
+        entries = [(f, i) for f in files for i in range(len(f.passages))]
+        if not entries:
+            return []
+        scores = np.array(bm25_scores(tokenize(query), [f.terms[i] for f, i in entries]))
+        if scores.max() > 0:
+            scores = scores / scores.max()
+        if self.use_embeddings:
+            query_vector = embed_query(query, self.dim)
+            scores = scores + self.embedding_weight * np.array([f.vectors[i] @ query_vector for f, i in entries])
+
+        top = sorted(np.argsort(-scores, kind="stable")[:self.top_k])
+        selected: Dict[str, Dict[str, Any]] = {}
+        for index in top:
+            f, i = entries[index]
+            file = selected.setdefault(f.file_id, {"fileName": f.file_name, "metrics": f.metrics, "passages": []})
+            file["passages"].append(f.passages[i])
+        return list(selected.values())
+
+    async def retrieve(self, file_ids: List[str], query: str) -> List[Dict[str, Any]]:
+        """Top-k passages across ``file_ids`` grouped per file, for ``DocumentContextBuilder``."""
+        files = [f for f in await asyncio.gather(*(self._load(file_id) for file_id in file_ids)) if f is not None]
+        return await asyncio.get_running_loop().run_in_executor(None, self._rank, files, query)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "cached_files": len(self._files),
+            "top_k": self.top_k,
+            "embeddings": self.use_embeddings,
+        }
+
+
+document_index = DocumentIndex()
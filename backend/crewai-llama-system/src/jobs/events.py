@@ -0,0 +1,214 @@
+import asyncio
+import logging
+import os
+import threading
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, AsyncIterator, Callable, Deque, Dict, List, Optional, Set
+
+from src.jobs.store import TERMINAL_STATUSES, JobStateStore, job_store
+
+logger = logging.getLogger(__name__)
+
+# Job whose crew is running on the current executor thread; lets the global LLM
+# stream listener attribute token chunks to a job.
+_job_context = threading.local()
+
+
+@contextmanager
+def job_context(job_id: str):
+    previous = getattr(_job_context, "job_id", None)
+    _job_context.job_id = job_id
+    try:
+        yield
+    finally:
+        _job_context.job_id = previous
+
+
+class JobEventBus:
+    """In-process pub/sub of job lifecycle events for SSE/WebSocket subscribers.
+
+    Events may be published from crew executor threads; they are handed to the event
+    loop with ``call_soon_threadsafe``. Progress notes and task outputs are also
+    written (write-behind) to the job store, so subscribers in other processes can
+    follow the job from Mongo. Token chunks are only delivered in-process.
+    """
+
+    def __init__(self, store: JobStateStore = job_store):
+        self.store = store
+        self.history_size = int(os.getenv("JOB_EVENT_HISTORY_SIZE", "50"))
+        self.max_tracked_jobs = int(os.getenv("JOB_EVENT_MAX_TRACKED_JOBS", "1000"))
+        self.stream_poll_interval = float(os.getenv("JOB_STREAM_POLL_SECONDS", "2"))
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._subscribers: Dict[str, Set[asyncio.Queue]] = {}
+        self._history: "OrderedDict[str, Deque[Dict[str, Any]]]" = OrderedDict()
+        self._task_outputs: Dict[str, list] = {}
+        self._stream_listener: Optional[Callable[[Any, Any], None]] = None
+
+    def start(self):
+        """Bind to the running loop and hook LLM token streaming when available."""
+        self._loop = asyncio.get_running_loop()
+        self._register_stream_listener()
+
+    def _register_stream_listener(self):
+        if self._stream_listener is not None:
+            return
+        try:
+            from crewai.events import LLMStreamChunkEvent, crewai_event_bus
+        except ImportError as e:
+            logger.warning(f"LLM stream events unavailable; token streaming disabled | Error: {e}")
+            return
+
+        @crewai_event_bus.on(LLMStreamChunkEvent)
+        def _on_stream_chunk(source, event):
+            job_id = getattr(_job_context, "job_id", None)
+            if job_id:
+                self.publish(job_id, "token", {"chunk": event.chunk})
+
+        self._stream_listener = _on_stream_chunk
+
+    def publish(self, job_id: str, event_type: str, data: Dict[str, Any]):
+        """Publish an event; safe to call from any thread."""
+        if self._loop is None:
+            # Running inside a process-pool child: nobody is listening here
+            return
+        event = self._event(job_id, event_type, data)
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is self._loop:
+            self._dispatch(event)
+        else:
+            self._loop.call_soon_threadsafe(self._dispatch, event)
+
+    @staticmethod
+    def _event(job_id: str, event_type: str, data: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "event": event_type,
+            "job_id": job_id,
+            "data": data,
+            "timestamp": datetime.utcnow().isoformat(),
+        }
+
+    def _dispatch(self, event: Dict[str, Any]):
+        job_id = event["job_id"]
+        event_type = event["event"]
+
+        if event_type == "progress":
+            self.store.update(job_id, {"progress": event["data"]["message"]})
+        elif event_type == "task_output":
+            outputs = self._task_outputs.setdefault(job_id, [])
+            outputs.append(event["data"])
+            self.store.update(job_id, {"task_outputs": list(outputs)})
+        elif event_type == "status" and event["data"].get("status") in TERMINAL_STATUSES:
+            self._task_outputs.pop(job_id, None)
+
+        if event_type != "token":
+            history = self._history.get(job_id)
+            if history is None:
+                history = self._history[job_id] = deque(maxlen=self.history_size)
+                while len(self._history) > self.max_tracked_jobs:
+                    self._history.popitem(last=False)
+            history.append(event)
+
+        for queue in self._subscribers.get(job_id, ()):
+            queue.put_nowait(event)
+
+    def subscribe(self, job_id: str) -> asyncio.Queue:
+        """Return a queue pre-filled with recent events for ``job_id``."""
+        queue: asyncio.Queue = asyncio.Queue()
+        for event in self._history.get(job_id, ()):
+            queue.put_nowait(event)
+        self._subscribers.setdefault(job_id, set()).add(queue)
+        return queue
+
+    def unsubscribe(self, job_id: str, queue: asyncio.Queue):
+        subscribers = self._subscribers.get(job_id)
+        if subscribers is not None:
+            subscribers.discard(queue)
+            if not subscribers:
+                del self._subscribers[job_id]
+
+    def _snapshot_events(self, previous: Optional[Dict[str, Any]], current: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Translate the difference between two job-store snapshots into events."""
+        job_id = current["job_id"]
+        events = []
+        if previous is None or current["progress"] != previous["progress"]:
+            if current["progress"]:
+                events.append(self._event(job_id, "progress", {"message": current["progress"]}))
+        seen = len(previous["task_outputs"] or []) if previous else 0
+        for output in (current["task_outputs"] or [])[seen:]:
+            events.append(self._event(job_id, "task_output", output))
+        if previous is None or current["status"] != previous["status"]:
+            data = {"status": current["status"]}
+            if current["status"] in TERMINAL_STATUSES:
+                data["result"] = current["result_text"]
+                data["error"] = current["error_message"]
+            events.append(self._event(job_id, "status", data))
+        return events
+
+    async def stream(self, job_id: str) -> AsyncIterator[Optional[Dict[str, Any]]]:
+        """Yield events for ``job_id`` until it reaches a terminal status.
+
+        Starts with the job's current state. If the job runs in this process its
+        events arrive through the bus; otherwise the (cached) job store is re-read
+        every ``stream_poll_interval`` seconds and changes are turned into events.
+        ``None`` is yielded while idle so transports can send keep-alives.
+        """
+        queue = self.subscribe(job_id)
+        try:
+            last = await self.store.get(job_id)
+            if last is None:
+                return
+            # Cached snapshots are updated in place; keep a private copy to diff against
+            last = dict(last)
+            for event in self._snapshot_events(None, last):
+                yield event
+            if last["status"] in TERMINAL_STATUSES:
+                return
+
+            local = False
+            while True:
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=self.stream_poll_interval)
+                except asyncio.TimeoutError:
+                    if not local:
+                        snapshot = await self.store.get(job_id)
+                        if snapshot is None:
+                            return
+                        for event in self._snapshot_events(last, snapshot):
+                            yield event
+                        last = dict(snapshot)
+                        if snapshot["status"] in TERMINAL_STATUSES:
+                            return
+                    yield None
+                    continue
+
+                # Events from the bus supersede store polling for this job
+                local = True
+                yield event
+                if event["event"] == "status" and event["data"].get("status") in TERMINAL_STATUSES:
+                    return
+        finally:
+            self.unsubscribe(job_id, queue)
+
+    def task_callback(self, job_id: str) -> Callable[[Any], None]:
+        """Build a CrewAI ``task_callback`` that publishes each finished task's output."""
+        def _on_task_output(output):
+            self.publish(job_id, "task_output", {
+                "agent": str(getattr(output, "agent", "") or ""),
+                "name": getattr(output, "name", None),
+                "output": str(getattr(output, "raw", output)),
+            })
+        return _on_task_output
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "tracked_jobs": len(self._history),
+            "subscribers": sum(len(s) for s in self._subscribers.values()),
+        }
+
+
+job_events = JobEventBus()
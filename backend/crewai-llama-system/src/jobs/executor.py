@@ -0,0 +1,106 @@
+import asyncio
+import logging
+import multiprocessing
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def run_crew(crew_name: str, method_name: str, *args: Any, job_id: Optional[str] = None) -> str:
+    """Build the named crew and run one of its workflows synchronously.
+
+    Lives at module level so a process pool can pickle it by reference; the crew
+    itself is constructed inside the worker because agents and LLM clients are not
+    picklable. With ``job_id``, task outputs and LLM tokens are published as job
+    events and the job's cancellation token is checked at each agent step and tool
+    call (in thread mode; a process-pool child has no subscribers or tokens).
+    """
+    import src.crews as crews
+    from src.jobs.events import job_context, job_events
+    from src.runtime import cancellation, cancellation_scope
+
+    run = getattr(getattr(crews, crew_name)(), method_name)
+    if job_id is None:
+        return str(run(*args))
+    token = cancellation.get(job_id)
+    with job_context(job_id), cancellation_scope(token):
+        if token is not None:
+            # Stopped while waiting for a free executor slot
+            token.check()
+        return str(run(*args, task_callback=job_events.task_callback(job_id)))
+
+
+class CrewExecutor:
+    """Run blocking crew kickoffs on a bounded worker pool, off the event loop."""
+
+    def __init__(self):
+        self.mode = os.getenv("CREW_EXECUTOR_MODE", "thread").lower()
+        self.max_workers = max(1, int(os.getenv("CREW_MAX_WORKERS", "4")))
+        self._pool: Optional[Executor] = None
+        self._active = 0
+        self._submitted = 0
+        self._completed = 0
+        self._failed = 0
+
+    def _get_pool(self) -> Executor:
+        if self._pool is None:
+            if self.mode == "process":
+                # spawn avoids forking a process that already holds event-loop and
+                # Mongo client threads
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            elif self.mode == "thread":
+                self._pool = ThreadPoolExecutor(
+                    max_workers=self.max_workers,
+                    thread_name_prefix="crew-worker",
+                )
+            else:
+                raise ValueError(f"Unsupported crew executor mode: {self.mode}")
+            logger.info(f"Crew executor started | Mode: {self.mode} | Workers: {self.max_workers}")
+        return self._pool
+
+    async def run(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """Run ``fn`` on the pool and await its result without blocking the loop."""
+        loop = asyncio.get_running_loop()
+        pool = self._get_pool()
+        self._submitted += 1
+        future = loop.run_in_executor(pool, partial(fn, *args, **kwargs))
+        self._active += 1
+        try:
+            result = await future
+            self._completed += 1
+            return result
+        except Exception:
+            self._failed += 1
+            raise
+        finally:
+            self._active -= 1
+
+    async def run_crew(self, crew_name: str, method_name: str, *args: Any, job_id: Optional[str] = None) -> str:
+        """Run ``crew_name().method_name(*args)`` on the pool."""
+        return await self.run(run_crew, crew_name, method_name, *args, job_id=job_id)
+
+    def shutdown(self, wait: bool = True):
+        if self._pool is not None:
+            self._pool.shutdown(wait=wait, cancel_futures=True)
+            self._pool = None
+            logger.info("Crew executor shut down")
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "mode": self.mode,
+            "max_workers": self.max_workers,
+            "in_flight": self._active,
+            "queued": max(0, self._active - self.max_workers),
+            "submitted": self._submitted,
+            "completed": self._completed,
+            "failed": self._failed,
+        }
+
+
+crew_executor = CrewExecutor()
@@ -0,0 +1,198 @@
+import asyncio
+import json
+import logging
+import re
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, List
+
+from config.models import AnalysisJob, JobType
+from src.crews.response_routing_crew import RESPONSE_PIPELINE
+from src.jobs.document_context import document_context_builder
+from src.jobs.document_index import document_index
+from src.jobs.executor import crew_executor
+from src.jobs.events import job_events
+from src.jobs.intent import intent_classifier, response_type_of
+from src.jobs.store import job_store
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_json_result(raw: str) -> str:
+    """Attempt to return a clean JSON string from agent output.
+    Structured-output responses parse on the first step; the salvage steps
+    only matter with STRUCTURED_OUTPUT disabled.
+    - If raw is valid JSON, return compact dumps.
+    - Else, try to extract a ```json fenced block.
+    - Else, try to find the first JSON object via braces.
+    - Fallback to original string if parsing fails.
+    """
+    def _ensure_timestamp(obj: Dict[str, Any]) -> Dict[str, Any]:
+        # Ensure generated_at is a current ISO-8601 UTC timestamp
+        now_iso = datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
+        if not isinstance(obj, dict):
+            return obj
+        if "generated_at" not in obj or not isinstance(obj["generated_at"], str):
+            obj["generated_at"] = now_iso
+        return obj
+
+    try:
+        parsed = json.loads(raw)
+        parsed = _ensure_timestamp(parsed)
+        return json.dumps(parsed, separators=(",", ":"))
+    except Exception:
+        pass
+
+    # Look for fenced code block ```json ... ```
+    m = re.search(r"```json\s*([\s\S]*?)\s*```", raw)
+    if m:
+        block = m.group(1).strip()
+        try:
+            parsed = json.loads(block)
+            parsed = _ensure_timestamp(parsed)
+            return json.dumps(parsed, separators=(",", ":"))
+        except Exception:
+            pass
+
+    # Heuristic: find first { ... } matching block
+    brace_start = raw.find("{")
+    brace_end = raw.rfind("}")
+    if brace_start != -1 and brace_end != -1 and brace_end > brace_start:
+        candidate = raw[brace_start:brace_end + 1]
+        try:
+            parsed = json.loads(candidate)
+            parsed = _ensure_timestamp(parsed)
+            return json.dumps(parsed, separators=(",", ":"))
+        except Exception:
+            pass
+
+    return raw
+
+
+async def build_file_context(params: Dict[str, Any], query: str, job_id: str) -> str:
+    """Render inline file contexts (serialized ``FileContext`` dicts) and passages
+    retrieved from indexed files (``file_ids``) for a prompt."""
+    files = params.get("files") or []
+    file_ids = params.get("file_ids") or []
+    retrieved = await document_index.retrieve(file_ids, query) if file_ids else None
+    # Chunking and ranking large uploads is CPU-bound; keep it off the event loop
+    file_context = await asyncio.get_running_loop().run_in_executor(
+        None, document_context_builder.build, files, query, job_id, retrieved
+    )
+    job_events.publish(job_id, "progress", {"message": f"Prepared context from {len(files) + len(file_ids)} file(s)"})
+    return file_context
+
+
+async def run_research_job(job: AnalysisJob) -> str:
+    logger.info(f"Running property insights crew | Job ID: {job.job_id}")
+    job_events.publish(job.job_id, "progress", {"message": "Running property insights crew"})
+    return await crew_executor.run_crew(
+        "PropertyInsightsCrew", "run_insights_analysis", job.input_parameters["topic"], job_id=job.job_id
+    )
+
+
+async def run_project_planning_job(job: AnalysisJob) -> str:
+    logger.info(f"Running report generation crew | Job ID: {job.job_id}")
+    job_events.publish(job.job_id, "progress", {"message": "Running report generation crew"})
+    return await crew_executor.run_crew(
+        "ReportGenerationCrew", "run_report_generation", job.input_parameters["project_description"], job_id=job.job_id
+    )
+
+
+async def _route_response(job: AnalysisJob, query: str, allow_chat: bool) -> str:
+    """Run the response workflow, classifying the query as cheaply as possible first.
+
+    The local intent classifier answers when confident. Otherwise, with the
+    response pipeline enabled, one tool-free LLM call labels the query, but only
+    when that can replace the router crew: for chat-answerable jobs whose best
+    guess is ``chat`` (or when the classifier is off). Its label trains the
+    classifier. The ``response_type`` is published as a ``route`` event as soon
+    as it is known. ``chat`` is answered with a single LLM call; other types go
+    to the router crew, which then only gathers context for the generator.
+    Without a label the full router crew classifies as before.
+    """
+    user_query = job.input_parameters["user_query"]
+    response_type = intent_classifier.classify(user_query)
+    routed_by = "classifier" if response_type else "router"
+
+    if (
+        response_type is None
+        and RESPONSE_PIPELINE
+        and allow_chat
+        and intent_classifier.best_guess(user_query) in (None, "chat")
+    ):
+        response_type = await crew_executor.run_crew(
+            "ResponseRoutingCrew", "classify_response_type", user_query, job_id=job.job_id
+        ) or None
+        if response_type:
+            routed_by = "llm"
+            intent_classifier.observe(user_query, response_type)
+
+    job_store.update(job.job_id, {"routed_by": routed_by})
+    if response_type:
+        job_events.publish(job.job_id, "route", {"response_type": response_type, "routed_by": routed_by})
+
+    if response_type == "chat" and allow_chat:
+        logger.info(f"Answering chat query directly | Job ID: {job.job_id} | Routed by: {routed_by}")
+        job_events.publish(job.job_id, "progress", {"message": "Answering conversational query"})
+        result = await crew_executor.run_crew("ResponseRoutingCrew", "run_chat_response", query, job_id=job.job_id)
+        return normalize_json_result(result)
+
+    logger.info(f"Running response routing crew | Job ID: {job.job_id} | Pre-classified: {response_type}")
+    job_events.publish(job.job_id, "progress", {"message": "Running response routing crew"})
+    result = normalize_json_result(await crew_executor.run_crew(
+        "ResponseRoutingCrew", "run_response_workflow", query, response_type, job_id=job.job_id
+    ))
+    if response_type is None:
+        intent_classifier.observe(user_query, response_type_of(result))
+    return result
+
+
+async def run_response_job(job: AnalysisJob) -> str:
+    return await _route_response(job, job.input_parameters["user_query"], allow_chat=True)
+
+
+async def run_research_with_files_job(job: AnalysisJob) -> str:
+    params = job.input_parameters
+    file_context = await build_file_context(params, params["topic"], job.job_id)
+
+    # Combine topic with file context
+    enhanced_topic = f"{params['topic']}\n\n{file_context}Please consider the uploaded documents in your research and analysis."
+    logger.info(f"Enhanced topic length: {len(enhanced_topic)} chars | Job ID: {job.job_id}")
+
+    logger.info(f"Running property insights crew with file context | Job ID: {job.job_id}")
+    job_events.publish(job.job_id, "progress", {"message": "Running property insights crew"})
+    return await crew_executor.run_crew("PropertyInsightsCrew", "run_insights_analysis", enhanced_topic, job_id=job.job_id)
+
+
+async def run_project_planning_with_files_job(job: AnalysisJob) -> str:
+    params = job.input_parameters
+    file_context = await build_file_context(params, params["project_description"], job.job_id)
+
+    # Combine project description with file context
+    enhanced_description = f"{params['project_description']}\n\n{file_context}Please consider the uploaded documents in your project planning and analysis."
+    logger.info(f"Enhanced description length: {len(enhanced_description)} chars | Job ID: {job.job_id}")
+
+    logger.info(f"Running report generation crew with file context | Job ID: {job.job_id}")
+    job_events.publish(job.job_id, "progress", {"message": "Running report generation crew"})
+    return await crew_executor.run_crew("ReportGenerationCrew", "run_report_generation", enhanced_description, job_id=job.job_id)
+
+
+async def run_response_with_files_job(job: AnalysisJob) -> str:
+    params = job.input_parameters
+    file_context = await build_file_context(params, params["user_query"], job.job_id)
+
+    enhanced_query = f"{params['user_query']}\n\n{file_context}Please consider the uploaded documents in classification and generation."
+    logger.info(f"Enhanced query length: {len(enhanced_query)} chars | Job ID: {job.job_id}")
+
+    # Attached documents always go through the crew, even for chat-like queries
+    return await _route_response(job, enhanced_query, allow_chat=False)
+
+
+JOB_HANDLERS: Dict[JobType, Callable[[AnalysisJob], Awaitable[str]]] = {
+    JobType.PROPERTY_INSIGHTS: run_research_job,
+    JobType.REPORT_GENERATION: run_project_planning_job,
+    JobType.RESPONSE: run_response_job,
+    JobType.RESEARCH_WITH_FILES: run_research_with_files_job,
+    JobType.PROJECT_PLANNING_WITH_FILES: run_project_planning_with_files_job,
+    JobType.RESPONSE_WITH_FILES: run_response_with_files_job,
+}
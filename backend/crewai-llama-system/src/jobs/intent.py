@@ -0,0 +1,227 @@
+import asyncio
+import json
+import logging
+import os
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from config.models import AnalysisJob, JobStatus, JobType
+from src.crews.response_routing_crew import ROUTER_FEW_SHOTS
+from src.jobs.semantic_cache import embed_query
+
+logger = logging.getLogger(__name__)
+
+RESPONSE_TYPES = ("analytics", "document", "chat")
+
+# Labelled queries trained on alongside the router's few-shot examples. With
+# the eight few-shots alone, confidences stayed between 0.36 and 0.80, so the
+# fast path hardly ever fired before enough traffic had been labelled.
+SEED_EXAMPLES = [
+    # analytics: trends, forecasts, comparisons, charts
+    ("What is the average price per square foot by neighborhood?", "analytics"),
+    ("Plot median rent over the past ten years.", "analytics"),
+    ("Compare home price growth between two cities.", "analytics"),
+    ("Forecast property values for next year.", "analytics"),
+    ("Which zip codes had the biggest price increase last year?", "analytics"),
+    ("Show a chart of days on market by month.", "analytics"),
+    ("What is the trend in vacancy rates for office space?", "analytics"),
+    ("Calculate the average cap rate for multifamily buildings.", "analytics"),
+    ("How have mortgage rates affected home sales volume?", "analytics"),
+    ("Give me statistics on rental yields across the metro area.", "analytics"),
+    ("Analyze the correlation between school ratings and home prices.", "analytics"),
+    ("Predict rent growth for the next three years.", "analytics"),
+    ("Visualize the distribution of listing prices.", "analytics"),
+    ("What percentage of listings sold above asking price?", "analytics"),
+    ("Break down sales by property type and quarter.", "analytics"),
+    ("Is the housing market cooling compared to last year?", "analytics"),
+    ("Rank neighborhoods by appreciation rate.", "analytics"),
+    ("Estimate the return on investment for a rental property.", "analytics"),
+    # document: finding listings, searching data, reading uploaded files
+    ("Find three bedroom houses with a pool.", "document"),
+    ("List condos for rent near the university.", "document"),
+    ("Show me office space available for lease downtown.", "document"),
+    ("Search for townhomes with a garage under 400k.", "document"),
+    ("Summarize the inspection report I uploaded.", "document"),
+    ("What does the lease say about pets?", "document"),
+    ("Find listings with at least two bathrooms.", "document"),
+    ("Look up the property details for this address.", "document"),
+    ("Which apartments allow dogs and have parking?", "document"),
+    ("Pull the rent roll from the attached spreadsheet.", "document"),
+    ("Find retail properties for sale near the highway.", "document"),
+    ("Show me new construction homes in the suburbs.", "document"),
+    ("What is the square footage listed in this document?", "document"),
+    ("Find warehouses for lease with loading docks.", "document"),
+    ("Show me listings that were recently reduced in price.", "document"),
+    ("Review this purchase agreement and list the contingencies.", "document"),
+    ("Get me the contact details for the listing agent.", "document"),
+    ("Find studio apartments available next month.", "document"),
+    # chat: greetings, thanks, small talk, questions about the assistant
+    ("Hello!", "chat"),
+    ("Hi there, how are you?", "chat"),
+    ("Good morning CURA.", "chat"),
+    ("Thank you so much.", "chat"),
+    ("Who are you?", "chat"),
+    ("What can you do?", "chat"),
+    ("Tell me a joke.", "chat"),
+    ("Nice, thanks for the help.", "chat"),
+    ("Goodbye, talk to you later.", "chat"),
+    ("How does this assistant work?", "chat"),
+    ("Can you help me?", "chat"),
+    ("That's great, appreciate it!", "chat"),
+    ("Are you a bot?", "chat"),
+    ("Sorry, I meant something else.", "chat"),
+    ("Okay cool.", "chat"),
+    ("What's your name?", "chat"),
+    ("Hey, quick question.", "chat"),
+    ("Have a nice day!", "chat"),
+]
+
+# Routing decisions whose labels are trusted for training: the router agent's and
+# the one-call LLM classifier's (see src/jobs/handlers.py). The classifier's own
+# predictions are not, which would only reinforce its mistakes.
+TRAINING_ROUTED_BY = ("router", "llm")
+
+
+def response_type_of(result_text: Optional[str]) -> Optional[str]:
+    """``response_type`` of a finished response job, if its result is valid JSON."""
+    try:
+        response_type = json.loads(result_text or "").get("response_type")
+    except (ValueError, AttributeError):
+        return None
+    return response_type if response_type in RESPONSE_TYPES else None
+
+
+class IntentClassifier:
+    """Local classifier that picks a ``response_type`` ahead of the router agent.
+
+    Softmax regression over the same hashed n-gram vectors as the semantic
+    cache, trained with a few hundred numpy gradient steps on the router's
+    few-shot examples, ``SEED_EXAMPLES`` and the labels of past responses routed
+    by the router crew or the LLM classifier (``warm`` loads them at startup,
+    ``observe`` adds new ones). Predictions take well under a millisecond;
+    callers fall back to the router crew when the confidence is below
+    ``threshold``. The seeds make common greetings and listing searches
+    confident from the start; most queries still defer to the LLM until
+    traffic has been labelled.
+    """
+
+    def __init__(self):
+        self.enabled = os.getenv("INTENT_CLASSIFIER_ENABLED", "true").lower() == "true"
+        self.threshold = float(os.getenv("INTENT_CONFIDENCE_THRESHOLD", "0.8"))
+        self.retrain_every = int(os.getenv("INTENT_RETRAIN_EVERY", "50"))
+        self.max_examples = int(os.getenv("INTENT_MAX_TRAINING_EXAMPLES", "5000"))
+        self.dim = int(os.getenv("SEMANTIC_CACHE_DIM", "512"))
+        # (feature vector, label index); vectors are computed once per example
+        seeds = [(shot["input"], shot["output"]) for shot in ROUTER_FEW_SHOTS] + SEED_EXAMPLES
+        self._examples: List[Tuple[np.ndarray, int]] = [self._example(text, label) for text, label in seeds]
+        self._seeds = len(seeds)
+        self._weights: Optional[np.ndarray] = None
+        self._unseen = 0
+        self._lock = threading.Lock()
+        self._predictions: Dict[str, int] = {label: 0 for label in RESPONSE_TYPES}
+        self._fallbacks = 0
+
+    def _example(self, text: str, label: str) -> Tuple[np.ndarray, int]:
+        return self._features(text), RESPONSE_TYPES.index(label)
+
+    def train(self, epochs: int = 600, learning_rate: float = 2.0, l2: float = 1e-4):
+        """Fit the weights; CPU-bound, so callers on the event loop use a thread."""
+        with self._lock:
+            examples = list(self._examples)
+        features = np.stack([vector for vector, _ in examples])
+        labels = np.array([label for _, label in examples])
+        targets = np.eye(len(RESPONSE_TYPES), dtype=np.float32)[labels]
+
+        weights = np.zeros((features.shape[1], len(RESPONSE_TYPES)), dtype=np.float32)
+        for _ in range(epochs):
+            probs = self._softmax(features @ weights)
+            gradient = features.T @ (probs - targets) / len(examples) + l2 * weights
+            weights -= learning_rate * gradient
+        self._weights = weights
+        logger.info(f"Intent classifier trained | Examples: {len(examples)}")
+
+    def _features(self, text: str) -> np.ndarray:
+        # Trailing bias term
+        return np.append(embed_query(text, self.dim), np.float32(1.0))
+
+    @staticmethod
+    def _softmax(logits: np.ndarray) -> np.ndarray:
+        logits = logits - logits.max(axis=-1, keepdims=True)
+        exp = np.exp(logits)
+        return exp / exp.sum(axis=-1, keepdims=True)
+
+    def predict(self, query: str) -> Tuple[str, float]:
+        if self._weights is None:
+            self.train()
+        probs = self._softmax(self._features(query) @ self._weights)
+        best = int(np.argmax(probs))
+        return RESPONSE_TYPES[best], float(probs[best])
+
+    def classify(self, query: str) -> Optional[str]:
+        """Confident ``response_type`` for ``query``, or None to defer to the router."""
+        if not self.enabled:
+            return None
+        label, confidence = self.predict(query)
+        if confidence < self.threshold:
+            self._fallbacks += 1
+            logger.info(f"Intent unclear, deferring to router | Best guess: {label} ({confidence:.2f})")
+            return None
+        self._predictions[label] += 1
+        logger.info(f"Intent classified | Type: {label} | Confidence: {confidence:.2f}")
+        return label
+
+    def best_guess(self, query: str) -> Optional[str]:
+        """Most likely ``response_type`` however unsure, or None when the classifier is off."""
+        if not self.enabled:
+            return None
+        return self.predict(query)[0]
+
+    def observe(self, query: str, response_type: Optional[str]):
+        """Learn from a query the router crew or LLM classified; retrains periodically."""
+        if not self.enabled or response_type not in RESPONSE_TYPES:
+            return
+        example = self._example(query, response_type)
+        with self._lock:
+            self._examples.append(example)
+            # Keep the seeds, drop the oldest logged traffic
+            if len(self._examples) > self.max_examples:
+                del self._examples[self._seeds:self._seeds + len(self._examples) - self.max_examples]
+            self._unseen += 1
+            retrain = self._unseen >= self.retrain_every
+            if retrain:
+                self._unseen = 0
+        if retrain:
+            threading.Thread(target=self.train, name="intent-train", daemon=True).start()
+
+    async def warm(self):
+        """Add labels from past response jobs routed by the router crew or the LLM, then train."""
+        if not self.enabled:
+            return
+        cursor = AnalysisJob.get_motor_collection().find(
+            {
+                "job_type": JobType.RESPONSE.value,
+                "status": JobStatus.COMPLETED.value,
+                "routed_by": {"$in": list(TRAINING_ROUTED_BY)},
+            },
+            {"user_query": 1, "result_text": 1},
+        ).sort("created_at", -1).limit(self.max_examples)
+        for doc in reversed(await cursor.to_list(length=self.max_examples)):
+            response_type = response_type_of(doc.get("result_text"))
+            if response_type:
+                self._examples.append(self._example(doc["user_query"], response_type))
+        await asyncio.get_running_loop().run_in_executor(None, self.train)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "threshold": self.threshold,
+            "seed_examples": self._seeds,
+            "training_examples": len(self._examples),
+            "predictions": dict(self._predictions),
+            "router_fallbacks": self._fallbacks,
+        }
+
+
+intent_classifier = IntentClassifier()
@@ -0,0 +1,386 @@
+import asyncio
+import logging
+import os
+import random
+import time
+import uuid
+import weakref
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from pymongo import ReturnDocument
+
+from config.models import AnalysisJob, JobStatus, JobType
+from src.jobs.admission import LANE_PRIORITY, AdmissionController, admission
+from src.jobs.result_cache import ResultCache, result_cache
+from src.jobs.semantic_cache import SemanticCache, semantic_cache
+from src.jobs.store import JobStateStore, job_store
+
+logger = logging.getLogger(__name__)
+
+
+class JobQueue:
+    """Durable crew job queue backed by the ``analysis_jobs`` collection.
+
+    The API enqueues ``PENDING`` jobs; workers claim them atomically with
+    ``find_one_and_update`` and hold a lease they must keep renewing. A job whose
+    lease expires (worker crashed or was restarted) becomes claimable again until
+    it runs out of attempts.
+
+    Jobs submitted with a request fingerprint are answered from the result cache
+    when possible, and otherwise collapse onto an identical job that is still
+    pending or running instead of starting a second crew run. Failing both, a
+    near-duplicate of a previously answered query can reuse that answer.
+
+    Every request that ends up on a job is recorded as one of its
+    ``subscribers`` (by client key), and a cancellation only withdraws the
+    caller's subscription: the job itself stops once nobody is left waiting.
+
+    Only jobs that will actually run are subject to admission control: each lane
+    may fill its share of the pending queue, and is claimed in priority order.
+    Jobs of a research batch are admitted per batch instead (see
+    ``pending_batch_counts``); they run in the batch lane, at most
+    ``batch_concurrency`` per batch at a time.
+    """
+
+    def __init__(
+        self,
+        store: JobStateStore = job_store,
+        cache: ResultCache = result_cache,
+        semantic: SemanticCache = semantic_cache,
+        admission: AdmissionController = admission,
+    ):
+        self.store = store
+        self.cache = cache
+        self.semantic = semantic
+        self.admission = admission
+        self.lease_seconds = int(os.getenv("JOB_LEASE_SECONDS", "120"))
+        self.max_attempts = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+        self.retry_backoff_seconds = float(os.getenv("JOB_RETRY_BACKOFF_SECONDS", "15"))
+        # Serializes lookup-then-insert per fingerprint within this process
+        self._fingerprint_locks: "weakref.WeakValueDictionary[str, asyncio.Lock]" = weakref.WeakValueDictionary()
+        self._cached_jobs = 0
+        self._collapsed_jobs = 0
+        self.depth_cache_seconds = float(os.getenv("ADMISSION_DEPTH_CACHE_SECONDS", "1"))
+        self._pending: Optional[int] = None
+        self._pending_expires_at = 0.0
+        self.batch_concurrency = int(os.getenv("BATCH_MAX_CONCURRENCY", "4"))
+
+    @staticmethod
+    def _collection():
+        return AnalysisJob.get_motor_collection()
+
+    async def pending_count(self) -> int:
+        """Pending non-batch jobs across all processes, re-counted at most every ``depth_cache_seconds``."""
+        if self._pending is None or time.monotonic() >= self._pending_expires_at:
+            self._pending = await self._collection().count_documents(
+                {"status": JobStatus.PENDING.value, "batch_id": None}
+            )
+            self._pending_expires_at = time.monotonic() + self.depth_cache_seconds
+        return self._pending
+
+    async def pending_batch_counts(self, client_key: Optional[str]) -> Tuple[int, int]:
+        """Pending research batch jobs in total and of ``client_key``."""
+        query = {"batch_id": {"$type": "string"}, "status": JobStatus.PENDING.value}
+        total = await self._collection().count_documents(query)
+        mine = await self._collection().count_documents({**query, "client_key": client_key}) if client_key else 0
+        return total, mine
+
+    async def enqueue(
+        self,
+        job_type: JobType,
+        user_query: str,
+        input_parameters: Dict[str, Any],
+        uploaded_files: Optional[List[str]] = None,
+        fingerprint: Optional[str] = None,
+        batch_id: Optional[str] = None,
+        subscriber: Optional[str] = None,
+        client_key: Optional[str] = None,
+    ) -> AnalysisJob:
+        if fingerprint is None:
+            return await self._insert(
+                job_type, user_query, input_parameters, uploaded_files, batch_id=batch_id, subscriber=subscriber,
+                client_key=client_key,
+            )
+
+        lock = self._fingerprint_locks.get(fingerprint)
+        if lock is None:
+            lock = self._fingerprint_locks[fingerprint] = asyncio.Lock()
+        async with lock:
+            cached = await self.cache.get(fingerprint)
+            if cached is not None:
+                self._cached_jobs += 1
+                return await self._insert(
+                    job_type, user_query, input_parameters, uploaded_files, fingerprint, cached, batch_id
+                )
+
+            in_flight = {
+                "fingerprint": fingerprint,
+                "status": {"$in": [JobStatus.PENDING.value, JobStatus.RUNNING.value]},
+                # Batch jobs run in their own lane and are cancelled per batch, so
+                # they only merge with other batch jobs
+                "batch_id": {"$type": "string"} if batch_id else None,
+            }
+            if subscriber is None:
+                doc = await self._collection().find_one(in_flight)
+            else:
+                doc = await self._collection().find_one_and_update(
+                    in_flight, {"$addToSet": {"subscribers": subscriber}}, return_document=ReturnDocument.AFTER
+                )
+            if doc is not None:
+                job = AnalysisJob.parse_obj(doc)
+                self._collapsed_jobs += 1
+                logger.info(f"Request collapsed onto in-flight job | Job ID: {job.job_id} | Type: {job_type.value}")
+                return job
+
+            cached = self.semantic.get(job_type, user_query)
+            if cached is not None:
+                self._cached_jobs += 1
+                return await self._insert(
+                    job_type, user_query, input_parameters, uploaded_files, fingerprint, cached, batch_id
+                )
+
+            return await self._insert(
+                job_type, user_query, input_parameters, uploaded_files, fingerprint, batch_id=batch_id,
+                subscriber=subscriber, client_key=client_key,
+            )
+
+    async def _insert(
+        self,
+        job_type: JobType,
+        user_query: str,
+        input_parameters: Dict[str, Any],
+        uploaded_files: Optional[List[str]],
+        fingerprint: Optional[str] = None,
+        cached_result: Optional[str] = None,
+        batch_id: Optional[str] = None,
+        subscriber: Optional[str] = None,
+        client_key: Optional[str] = None,
+    ) -> AnalysisJob:
+        job = AnalysisJob(
+            job_id=str(uuid.uuid4()),
+            job_type=job_type,
+            status=JobStatus.PENDING,
+            user_query=user_query,
+            input_parameters=input_parameters,
+            uploaded_files=uploaded_files or [],
+            max_attempts=self.max_attempts,
+            fingerprint=fingerprint,
+            batch_id=batch_id,
+            subscribers=[subscriber] if subscriber and cached_result is None else [],
+            client_key=client_key,
+            priority=LANE_PRIORITY["batch"] if batch_id else self.admission.priority(job_type),
+        )
+        if cached_result is None:
+            # Batch jobs are admitted per batch (see AdmissionController.check_batch)
+            if batch_id is None:
+                self.admission.check_depth(job_type, await self.pending_count())
+                self._pending += 1
+        else:
+            # Recorded as an already finished job so polling and listing work unchanged
+            job.status = JobStatus.COMPLETED
+            job.result_text = cached_result
+            job.completed_at = job.created_at
+            job.processing_time_seconds = 0.0
+        await job.insert()
+        self.store.remember(job)
+        source = " from result cache" if cached_result is not None else ""
+        logger.info(f"Job enqueued{source} | Job ID: {job.job_id} | Type: {job_type.value}")
+        return job
+
+    async def _saturated_batches(self) -> List[str]:
+        """Batches already running ``batch_concurrency`` jobs."""
+        if self.batch_concurrency <= 0:
+            return []
+        pipeline = [
+            {"$match": {"batch_id": {"$ne": None}, "status": JobStatus.RUNNING.value}},
+            {"$group": {"_id": "$batch_id", "running": {"$sum": 1}}},
+            {"$match": {"running": {"$gte": self.batch_concurrency}}},
+        ]
+        return [doc["_id"] async for doc in self._collection().aggregate(pipeline)]
+
+    async def claim(self, worker_id: str) -> Optional[AnalysisJob]:
+        """Atomically take the highest-priority due job (or one with an expired lease)."""
+        now = datetime.utcnow()
+        query: Dict[str, Any] = {
+            "$or": [
+                {"status": JobStatus.PENDING.value, "available_at": {"$lte": now}},
+                {"status": JobStatus.RUNNING.value, "lease_expires_at": {"$lt": now}},
+            ],
+            "$expr": {"$lt": ["$attempts", "$max_attempts"]},
+        }
+        saturated = await self._saturated_batches()
+        if saturated:
+            # Soft limit: concurrent claims may briefly run one or two extra
+            query["batch_id"] = {"$nin": saturated}
+        doc = await self._collection().find_one_and_update(
+            query,
+            {
+                "$set": {
+                    "status": JobStatus.RUNNING.value,
+                    "started_at": now,
+                    "lease_owner": worker_id,
+                    "lease_expires_at": now + timedelta(seconds=self.lease_seconds),
+                },
+                "$inc": {"attempts": 1},
+            },
+            sort=[("priority", -1), ("available_at", 1)],
+            return_document=ReturnDocument.AFTER,
+        )
+        if doc is None:
+            return None
+        job = AnalysisJob.parse_obj(doc)
+        self.store.remember(job)
+        logger.info(f"Job claimed | Job ID: {job.job_id} | Worker: {worker_id} | Attempt: {job.attempts}/{job.max_attempts}")
+        return job
+
+    async def renew_lease(self, job_id: str, worker_id: str) -> bool:
+        result = await self._collection().update_one(
+            {"job_id": job_id, "lease_owner": worker_id, "status": JobStatus.RUNNING.value},
+            {"$set": {"lease_expires_at": datetime.utcnow() + timedelta(seconds=self.lease_seconds)}},
+        )
+        return result.modified_count == 1
+
+    async def complete(self, job_id: str, worker_id: str, result_text: str, processing_time: float) -> bool:
+        """Record a result; ignored if this worker no longer holds the lease."""
+        fields = {
+            "status": JobStatus.COMPLETED.value,
+            "result_text": result_text,
+            "error_message": None,
+            "completed_at": datetime.utcnow(),
+            "processing_time_seconds": processing_time,
+        }
+        result = await self._collection().update_one(
+            {"job_id": job_id, "lease_owner": worker_id, "status": JobStatus.RUNNING.value},
+            {"$set": {**fields, "lease_owner": None, "lease_expires_at": None}},
+        )
+        if result.modified_count != 1:
+            return False
+        self.store.update(job_id, fields, write_behind=False)
+        return True
+
+    async def cache_result(self, job: AnalysisJob, result_text: str):
+        """Make a completed job's result available to later identical requests."""
+        if job.fingerprint:
+            await self.cache.put(job.fingerprint, job.job_type, result_text, job.job_id, query=job.user_query)
+            self.semantic.add(job.job_type, job.user_query, result_text)
+
+    async def fail(self, job: AnalysisJob, worker_id: str, error: str, processing_time: float) -> JobStatus:
+        """Requeue with backoff while attempts remain, otherwise mark the job failed."""
+        now = datetime.utcnow()
+        if job.attempts < job.max_attempts:
+            # Exponential backoff with jitter so failed jobs do not retry in lockstep
+            delay = self.retry_backoff_seconds * (2 ** (job.attempts - 1)) * random.uniform(0.5, 1.5)
+            status = JobStatus.PENDING
+            update = {"status": status.value, "available_at": now + timedelta(seconds=delay)}
+        else:
+            status = JobStatus.FAILED
+            update = {"status": status.value, "completed_at": now}
+
+        update.update({
+            "error_message": error,
+            "processing_time_seconds": processing_time,
+            "lease_owner": None,
+            "lease_expires_at": None,
+        })
+        result = await self._collection().update_one(
+            {"job_id": job.job_id, "lease_owner": worker_id, "status": JobStatus.RUNNING.value}, {"$set": update}
+        )
+        if result.modified_count == 1:
+            self.store.update(job.job_id, update, write_behind=False)
+        return status
+
+    async def cancel(self, job_id: str, subscriber: Optional[str] = None) -> Optional[int]:
+        """Withdraw ``subscriber`` from a pending or running job, cancelling it if nobody else waits.
+
+        Returns how many subscribers are still waiting (0 once the job is
+        cancelled), or None when the job is unknown or already finished.
+
+        A pending job is simply never claimed. The worker running a job notices on
+        its next lease renewal (the lease is only renewed while ``RUNNING``) and
+        stops the crew at its next checkpoint.
+        """
+        active = {"job_id": job_id, "status": {"$in": [JobStatus.PENDING.value, JobStatus.RUNNING.value]}}
+        if subscriber is not None:
+            doc = await self._collection().find_one_and_update(
+                active,
+                {"$pull": {"subscribers": subscriber}},
+                projection={"subscribers": 1},
+                return_document=ReturnDocument.AFTER,
+            )
+            if doc is None:
+                return None
+            waiting = len(doc.get("subscribers") or [])
+            if waiting:
+                logger.info(f"Subscriber withdrew from job | Job ID: {job_id} | Still waiting: {waiting}")
+                return waiting
+
+        fields = {
+            "status": JobStatus.CANCELLED.value,
+            "error_message": "Cancelled by client",
+            "completed_at": datetime.utcnow(),
+        }
+        # A request collapsing onto the job in the meantime keeps it alive
+        result = await self._collection().update_one(
+            {**active, "subscribers": {"$in": [None, []]}}, {"$set": fields}
+        )
+        if result.modified_count != 1:
+            doc = await self._collection().find_one(active, {"subscribers": 1})
+            return None if doc is None else len(doc.get("subscribers") or [])
+        self.store.update(job_id, fields, write_behind=False)
+        logger.info(f"Job cancelled | Job ID: {job_id}")
+        return 0
+
+    async def stop(
+        self, job_id: str, worker_id: str, status: JobStatus, error: str, processing_time: float, tokens_used: int
+    ) -> bool:
+        """Record a job this worker stopped early (timed out or cancelled); never retried."""
+        fields = {
+            "status": status.value,
+            "error_message": error,
+            "completed_at": datetime.utcnow(),
+            "processing_time_seconds": processing_time,
+            "tokens_used": tokens_used,
+        }
+        result = await self._collection().update_one(
+            {"job_id": job_id, "lease_owner": worker_id, "status": JobStatus.RUNNING.value},
+            {"$set": {**fields, "lease_owner": None, "lease_expires_at": None}},
+        )
+        if result.modified_count != 1:
+            return False
+        self.store.update(job_id, fields, write_behind=False)
+        return True
+
+    async def fail_exhausted_leases(self) -> int:
+        """Fail running jobs whose lease expired after their final attempt."""
+        now = datetime.utcnow()
+        result = await self._collection().update_many(
+            {
+                "status": JobStatus.RUNNING.value,
+                "lease_expires_at": {"$lt": now},
+                "$expr": {"$gte": ["$attempts", "$max_attempts"]},
+            },
+            {
+                "$set": {
+                    "status": JobStatus.FAILED.value,
+                    "error_message": "Worker lease expired on final attempt",
+                    "completed_at": now,
+                    "lease_owner": None,
+                    "lease_expires_at": None,
+                }
+            },
+        )
+        if result.modified_count:
+            logger.warning(f"Failed {result.modified_count} job(s) with exhausted leases")
+        return result.modified_count
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "served_from_cache": self._cached_jobs,
+            "collapsed_duplicates": self._collapsed_jobs,
+            "result_cache": self.cache.get_stats(),
+            "semantic_cache": self.semantic.get_stats(),
+        }
+
+
+job_queue = JobQueue()
@@ -0,0 +1,148 @@
+import hashlib
+import json
+import logging
+import os
+import re
+import time
+import unicodedata
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from config import llm_config
+from config.models import CachedResult, JobType
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_query(text: str) -> str:
+    """Case-fold, unify unicode forms, collapse whitespace and drop edge punctuation."""
+    text = unicodedata.normalize("NFKC", text).casefold()
+    text = re.sub(r"\s+", " ", text)
+    return text.strip(" \t\n.!?;:,")
+
+
+def file_content_hash(file: Dict[str, Any]) -> str:
+    """Hash the parts of a serialized ``FileContext`` that reach the prompt."""
+    digest = hashlib.sha256()
+    for part in (file.get("content") or "", file.get("extractedText") or ""):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    digest.update(json.dumps(file.get("metrics") or {}, sort_keys=True, default=str).encode("utf-8"))
+    return digest.hexdigest()
+
+
+def request_fingerprint(
+    job_type: JobType,
+    query: str,
+    files: Optional[List[Dict[str, Any]]] = None,
+    file_ids: Optional[List[str]] = None,
+) -> str:
+    """Fingerprint of everything that determines a crew's answer."""
+    payload = {
+        "job_type": job_type.value,
+        "query": normalize_query(query),
+        "files": sorted(file_content_hash(f) for f in files or []),
+        "model": llm_config.get_model_name(),
+    }
+    if file_ids:
+        # Indexed file ids are content-addressed
+        payload["file_ids"] = sorted(set(file_ids))
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+class ResultCache:
+    """Completed crew results keyed by request fingerprint.
+
+    A bounded in-memory LRU with TTL sits in front of the optional
+    ``cached_results`` collection, which lets results computed by one worker
+    process be served by every API process. Mongo expires entries via a TTL index.
+    """
+
+    def __init__(self):
+        self.enabled = os.getenv("RESULT_CACHE_ENABLED", "true").lower() == "true"
+        self.ttl_seconds = float(os.getenv("RESULT_CACHE_TTL_SECONDS", "21600"))
+        self.max_entries = int(os.getenv("RESULT_CACHE_MAX_ENTRIES", "1000"))
+        self.persist = os.getenv("RESULT_CACHE_PERSIST", "true").lower() == "true"
+        self._entries: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+
+    def _remember(self, fingerprint: str, result_text: str, ttl: float):
+        self._entries[fingerprint] = (time.monotonic() + ttl, result_text)
+        self._entries.move_to_end(fingerprint)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def get(self, fingerprint: str) -> Optional[str]:
+        if not self.enabled:
+            return None
+
+        entry = self._entries.get(fingerprint)
+        if entry is not None:
+            expires_at, result_text = entry
+            if expires_at >= time.monotonic():
+                self._entries.move_to_end(fingerprint)
+                self._hits += 1
+                return result_text
+            del self._entries[fingerprint]
+
+        if self.persist:
+            try:
+                cached = await CachedResult.find_one(CachedResult.fingerprint == fingerprint)
+            except Exception as e:
+                logger.error(f"Result cache lookup failed | Error: {str(e)}")
+                cached = None
+            now = datetime.utcnow()
+            if cached is not None and cached.expires_at > now:
+                self._remember(fingerprint, cached.result_text, (cached.expires_at - now).total_seconds())
+                self._hits += 1
+                return cached.result_text
+
+        self._misses += 1
+        return None
+
+    async def put(
+        self,
+        fingerprint: str,
+        job_type: JobType,
+        result_text: str,
+        source_job_id: Optional[str] = None,
+        query: Optional[str] = None,
+    ):
+        if not self.enabled:
+            return
+        self._remember(fingerprint, result_text, self.ttl_seconds)
+        if not self.persist:
+            return
+        now = datetime.utcnow()
+        try:
+            await CachedResult.get_motor_collection().update_one(
+                {"fingerprint": fingerprint},
+                {"$set": {
+                    "job_type": job_type.value,
+                    "query": query,
+                    "result_text": result_text,
+                    "source_job_id": source_job_id,
+                    "created_at": now,
+                    "expires_at": now + timedelta(seconds=self.ttl_seconds),
+                }},
+                upsert=True,
+            )
+        except Exception as e:
+            logger.error(f"Result cache write failed | Error: {str(e)}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        lookups = self._hits + self._misses
+        return {
+            "enabled": self.enabled,
+            "persist": self.persist,
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self._hits,
+            "misses": self._misses,
+            "hit_rate": round(self._hits / lookups, 3) if lookups else None,
+        }
+
+
+result_cache = ResultCache()
@@ -0,0 +1,214 @@
+import hashlib
+import logging
+import os
+import re
+import threading
+import time
+import unicodedata
+from datetime import datetime
+from typing import Any, Dict, FrozenSet, List, Optional, Tuple
+
+import numpy as np
+
+from config.models import CachedResult, JobType
+from src.jobs.result_cache import normalize_query
+
+logger = logging.getLogger(__name__)
+
+# Only plain routed responses are reused across phrasings; file-backed and
+# long-form research jobs depend on more than the wording of the question.
+SEMANTIC_JOB_TYPES = {JobType.RESPONSE}
+
+_NUMBER = re.compile(r"\$?\d[\d,]*(?:\.\d+)?\s*[km]?\b", flags=re.IGNORECASE)
+_NUMBER_WORDS = {
+    "one": "1", "two": "2", "three": "3", "four": "4", "five": "5",
+    "six": "6", "seven": "7", "eight": "8", "nine": "9", "ten": "10",
+}
+_LOCATION_PREPOSITIONS = {"in", "near", "around", "at", "from", "within", "outside"}
+_STOPWORDS = {
+    "a", "an", "the", "this", "that", "my", "our", "and", "or", "of", "for", "to", "with", "under",
+    "over", "below", "above", "between", "less", "more", "than", "about", "is", "are", "was", "be",
+    "me", "i", "it", "its", "what", "which", "how", "area", "city", "last", "next", "past",
+}
+_WORD = re.compile(r"[^\W\d_][\w'-]*")
+
+
+def _number(token: str) -> str:
+    token = token.lower().replace("$", "").replace(",", "").strip()
+    scale = {"k": 1_000, "m": 1_000_000}.get(token[-1], 1)
+    value = float(token.rstrip("km").strip()) * scale
+    return f"{value:g}" if value != int(value) else str(int(value))
+
+
+def query_entities(text: str) -> FrozenSet[str]:
+    """Numbers and place names in a query, which must match exactly for a semantic hit.
+
+    Embeddings rate "3 bedroom homes in Austin under $1,500" and "4 bedroom
+    homes in Houston under $2,500" as near-identical, so these are compared
+    separately. Numbers are normalized ("$1,500", "1.5k" and "1500" agree;
+    "three" is "3"). Places are capitalized words other than the first of a
+    sentence, state codes, and the words right after "in"/"near"/... Extraction
+    errs towards too many entities: a spurious one only costs a cache miss.
+    """
+    text = unicodedata.normalize("NFKC", text)
+    entities = {f"n:{_number(match.group())}" for match in _NUMBER.finditer(text)}
+    for sentence in re.split(r"[.!?\n]+", text):
+        words = _WORD.findall(sentence)
+        for i, word in enumerate(words):
+            lower = word.casefold()
+            if lower in _NUMBER_WORDS:
+                entities.add(f"n:{_NUMBER_WORDS[lower]}")
+            elif i and (word[0].isupper() or (len(word) == 2 and word.isupper())) and lower not in _STOPWORDS:
+                entities.add(f"p:{lower}")
+        for i, word in enumerate(words):
+            if word.casefold() not in _LOCATION_PREPOSITIONS:
+                continue
+            following = words[i + 1:i + 5]
+            while following and following[0].casefold() in _STOPWORDS:
+                following.pop(0)
+            for name in following[:3]:
+                if name.casefold() in _STOPWORDS or name.casefold() in _LOCATION_PREPOSITIONS:
+                    break
+                entities.add(f"p:{name.casefold()}")
+    return frozenset(entities)
+
+
+def embed_query(text: str, dim: int) -> np.ndarray:
+    """Hashed bag of word unigrams/bigrams and character trigrams, L2-normalized.
+
+    Cheap, CPU-only and deterministic across processes, which is what a shared
+    index needs; paraphrases that share most words and stems score high.
+    """
+    words = normalize_query(text).split()
+    features: List[str] = [f"w:{w}" for w in words]
+    features += [f"b:{a} {b}" for a, b in zip(words, words[1:])]
+    for word in words:
+        padded = f" {word} "
+        features += [f"c:{padded[i:i + 3]}" for i in range(len(padded) - 2)]
+
+    vector = np.zeros(dim, dtype=np.float32)
+    for feature in features:
+        digest = hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest()
+        value = int.from_bytes(digest, "little")
+        # The top bit picks a sign so hash collisions tend to cancel out
+        vector[value % dim] += 1.0 if value >> 63 else -1.0
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+class SemanticCache:
+    """Near-duplicate lookup over past query texts and their results.
+
+    Vectors live in one float32 matrix (grown by doubling, then used as a ring
+    buffer once ``max_entries`` is reached), so a top-k query is a single
+    matrix-vector product plus ``argpartition`` even with tens of thousands of
+    entries. Entries expire with the exact-match result cache; the index is
+    rebuilt from ``cached_results`` on startup and fed as jobs complete.
+
+    A match is only reused when its ``query_entities`` (numbers, places) are
+    the same as the new query's, since n-gram similarity alone cannot tell
+    Austin from Houston or $1,500 from $2,500.
+    """
+
+    def __init__(self):
+        self.enabled = os.getenv("SEMANTIC_CACHE_ENABLED", "true").lower() == "true"
+        self.threshold = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.95"))
+        self.max_entries = int(os.getenv("SEMANTIC_CACHE_MAX_ENTRIES", "50000"))
+        self.dim = int(os.getenv("SEMANTIC_CACHE_DIM", "512"))
+        self.ttl_seconds = float(os.getenv("RESULT_CACHE_TTL_SECONDS", "21600"))
+        self._vectors = np.zeros((min(1024, self.max_entries), self.dim), dtype=np.float32)
+        # (job_type, query, result_text, monotonic expiry, entities) per matrix row
+        self._entries: List[Tuple[JobType, str, str, float, FrozenSet[str]]] = []
+        self._size = 0
+        self._next = 0
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._entity_mismatches = 0
+
+    def add(self, job_type: JobType, query: str, result_text: str, ttl: Optional[float] = None):
+        if not self.enabled or job_type not in SEMANTIC_JOB_TYPES:
+            return
+        expires = time.monotonic() + (self.ttl_seconds if ttl is None else ttl)
+        entry = (job_type, query, result_text, expires, query_entities(query))
+        vector = embed_query(query, self.dim)
+        with self._lock:
+            if self._next == len(self._vectors) and self._size < self.max_entries:
+                grown = np.zeros((min(2 * len(self._vectors), self.max_entries), self.dim), dtype=np.float32)
+                grown[:self._size] = self._vectors[:self._size]
+                self._vectors = grown
+            self._vectors[self._next] = vector
+            if self._next < len(self._entries):
+                self._entries[self._next] = entry
+            else:
+                self._entries.append(entry)
+            self._next = (self._next + 1) % self.max_entries
+            self._size = min(self._size + 1, self.max_entries)
+
+    def search(self, job_type: JobType, query: str, k: int = 5) -> List[Tuple[float, str, str, FrozenSet[str]]]:
+        """Top-``k`` live ``(similarity, query, result_text, entities)`` matches of the same job type."""
+        if self._size == 0:
+            return []
+        vector = embed_query(query, self.dim)
+        now = time.monotonic()
+        with self._lock:
+            scores = self._vectors[:self._size] @ vector
+            k = min(k, self._size)
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.argsort(-scores[top])]
+            matches = []
+            for i in top:
+                entry = self._entries[i]
+                if entry[0] == job_type and entry[3] > now:
+                    matches.append((float(scores[i]), entry[1], entry[2], entry[4]))
+        return matches
+
+    def get(self, job_type: JobType, query: str) -> Optional[str]:
+        """Result of the most similar past query with the same entities, if it clears the threshold."""
+        if not self.enabled or job_type not in SEMANTIC_JOB_TYPES:
+            return None
+        entities = query_entities(query)
+        for score, matched_query, result_text, matched_entities in self.search(job_type, query):
+            if score < self.threshold:
+                break
+            if matched_entities != entities:
+                self._entity_mismatches += 1
+                continue
+            self._hits += 1
+            logger.info(f"Semantic cache hit | Similarity: {score:.3f} | Matched query: {matched_query[:80]}")
+            return result_text
+        self._misses += 1
+        return None
+
+    async def warm(self):
+        """Load unexpired cached results so a restarted process keeps its index."""
+        if not self.enabled:
+            return
+        now = datetime.utcnow()
+        job_types = [job_type.value for job_type in SEMANTIC_JOB_TYPES]
+        cursor = CachedResult.get_motor_collection().find(
+            {"job_type": {"$in": job_types}, "query": {"$ne": None}, "expires_at": {"$gt": now}},
+            {"job_type": 1, "query": 1, "result_text": 1, "expires_at": 1},
+        ).sort("created_at", -1).limit(self.max_entries)
+        docs = await cursor.to_list(length=self.max_entries)
+        # Oldest first, so the newest entries are the last to be overwritten
+        for doc in reversed(docs):
+            ttl = (doc["expires_at"] - now).total_seconds()
+            self.add(JobType(doc["job_type"]), doc["query"], doc["result_text"], ttl=ttl)
+        logger.info(f"Semantic cache warmed | Entries: {self._size}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        lookups = self._hits + self._misses
+        return {
+            "enabled": self.enabled,
+            "threshold": self.threshold,
+            "entries": self._size,
+            "max_entries": self.max_entries,
+            "hits": self._hits,
+            "misses": self._misses,
+            "entity_mismatches": self._entity_mismatches,
+            "hit_rate": round(self._hits / lookups, 3) if lookups else None,
+        }
+
+
+semantic_cache = SemanticCache()
@@ -0,0 +1,192 @@
+import asyncio
+import logging
+import os
+import time
+from collections import OrderedDict
+from enum import Enum
+from typing import Any, Dict, List, Optional, Tuple
+
+from pymongo import DESCENDING, UpdateOne
+
+from config.models import AnalysisJob, JobStatus
+
+logger = logging.getLogger(__name__)
+
+# Fields needed to answer job polls; input_parameters (which may carry whole
+# documents) is never loaded into the cache.
+SNAPSHOT_FIELDS = (
+    "job_id",
+    "job_type",
+    "status",
+    "created_at",
+    "started_at",
+    "completed_at",
+    "result_text",
+    "error_message",
+    "progress",
+    "task_outputs",
+    "attempts",
+    "routed_by",
+)
+SNAPSHOT_PROJECTION = {field: 1 for field in SNAPSHOT_FIELDS}
+
+TERMINAL_STATUSES = {
+    JobStatus.COMPLETED.value,
+    JobStatus.FAILED.value,
+    JobStatus.CANCELLED.value,
+    JobStatus.TIMED_OUT.value,
+}
+
+
+class JobStateStore:
+    """Single read/write path for job state, backed by ``analysis_jobs``.
+
+    Reads go through a bounded LRU cache. Finished jobs never change, so they are
+    cached for a long TTL; active jobs use a short TTL so updates made by workers in
+    other processes show up quickly. Concurrent misses for the same job share one
+    query. Non-critical updates (progress notes) are buffered and flushed in
+    batches; status transitions are written by the queue and only mirrored here.
+    """
+
+    def __init__(self):
+        self.max_entries = int(os.getenv("JOB_CACHE_MAX_ENTRIES", "2000"))
+        self.active_ttl = float(os.getenv("JOB_CACHE_ACTIVE_TTL_SECONDS", "2"))
+        self.terminal_ttl = float(os.getenv("JOB_CACHE_TERMINAL_TTL_SECONDS", "600"))
+        self.flush_interval = float(os.getenv("JOB_WRITE_BEHIND_INTERVAL_SECONDS", "1"))
+        self._cache: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._loading: Dict[str, asyncio.Task] = {}
+        self._pending: Dict[str, Dict[str, Any]] = {}
+        self._flush_task: Optional[asyncio.Task] = None
+        self._hits = 0
+        self._misses = 0
+        self._flushed_updates = 0
+
+    @staticmethod
+    def _collection():
+        return AnalysisJob.get_motor_collection()
+
+    @staticmethod
+    def _snapshot(source: Dict[str, Any]) -> Dict[str, Any]:
+        snapshot = {}
+        for field in SNAPSHOT_FIELDS:
+            value = source.get(field)
+            snapshot[field] = value.value if isinstance(value, Enum) else value
+        return snapshot
+
+    def _remember(self, snapshot: Dict[str, Any]):
+        ttl = self.terminal_ttl if snapshot["status"] in TERMINAL_STATUSES else self.active_ttl
+        job_id = snapshot["job_id"]
+        self._cache[job_id] = (time.monotonic() + ttl, snapshot)
+        self._cache.move_to_end(job_id)
+        while len(self._cache) > self.max_entries:
+            self._cache.popitem(last=False)
+
+    def _cached(self, job_id: str) -> Optional[Dict[str, Any]]:
+        entry = self._cache.get(job_id)
+        if entry is None:
+            return None
+        expires_at, snapshot = entry
+        if expires_at < time.monotonic():
+            del self._cache[job_id]
+            return None
+        self._cache.move_to_end(job_id)
+        return snapshot
+
+    async def _load(self, job_id: str) -> Optional[Dict[str, Any]]:
+        doc = await self._collection().find_one({"job_id": job_id}, SNAPSHOT_PROJECTION)
+        if doc is None:
+            return None
+        snapshot = self._snapshot(doc)
+        # Buffered writes not yet flushed are newer than what Mongo returned
+        snapshot.update(self._pending.get(job_id, {}))
+        self._remember(snapshot)
+        return snapshot
+
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        snapshot = self._cached(job_id)
+        if snapshot is not None:
+            self._hits += 1
+            return snapshot
+
+        self._misses += 1
+        task = self._loading.get(job_id)
+        if task is None:
+            task = asyncio.create_task(self._load(job_id))
+            self._loading[job_id] = task
+            task.add_done_callback(lambda _: self._loading.pop(job_id, None))
+        return await asyncio.shield(task)
+
+    def snapshot(self, job: AnalysisJob) -> Dict[str, Any]:
+        return self._snapshot(job.dict(include=set(SNAPSHOT_FIELDS)))
+
+    def remember(self, job: AnalysisJob):
+        """Prime the cache with a job that was just written to Mongo."""
+        self._remember(self.snapshot(job))
+
+    def update(self, job_id: str, fields: Dict[str, Any], write_behind: bool = True):
+        """Apply ``fields`` to the cached snapshot.
+
+        With ``write_behind`` the fields are also queued for the next batched flush;
+        without it the caller has already persisted them.
+        """
+        fields = {k: v.value if isinstance(v, Enum) else v for k, v in fields.items()}
+        snapshot = self._cached(job_id)
+        if snapshot is not None:
+            snapshot.update(fields)
+            self._remember(snapshot)
+        if write_behind:
+            self._pending.setdefault(job_id, {}).update(fields)
+
+    async def flush(self):
+        if not self._pending:
+            return
+        batch, self._pending = self._pending, {}
+        operations = [UpdateOne({"job_id": job_id}, {"$set": fields}) for job_id, fields in batch.items()]
+        try:
+            await self._collection().bulk_write(operations, ordered=False)
+            self._flushed_updates += len(operations)
+        except Exception as e:
+            logger.error(f"Job state flush failed, will retry | Updates: {len(operations)} | Error: {str(e)}")
+            for job_id, fields in batch.items():
+                # Keep anything written since the batch was taken
+                self._pending[job_id] = {**fields, **self._pending.get(job_id, {})}
+
+    async def _flush_loop(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+
+    def start(self):
+        if self._flush_task is None:
+            self._flush_task = asyncio.create_task(self._flush_loop())
+
+    async def stop(self):
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            self._flush_task = None
+        await self.flush()
+
+    async def list_recent(self, limit: int = 100) -> List[Dict[str, Any]]:
+        cursor = self._collection().find({}, SNAPSHOT_PROJECTION).sort("created_at", DESCENDING).limit(limit)
+        return [self._snapshot(doc) for doc in await cursor.to_list(length=limit)]
+
+    async def delete(self, job_id: str) -> bool:
+        result = await self._collection().delete_one({"job_id": job_id})
+        self._cache.pop(job_id, None)
+        self._pending.pop(job_id, None)
+        return result.deleted_count == 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        lookups = self._hits + self._misses
+        return {
+            "cached_jobs": len(self._cache),
+            "max_entries": self.max_entries,
+            "hits": self._hits,
+            "misses": self._misses,
+            "hit_rate": round(self._hits / lookups, 3) if lookups else None,
+            "pending_writes": len(self._pending),
+            "flushed_updates": self._flushed_updates,
+        }
+
+
+job_store = JobStateStore()
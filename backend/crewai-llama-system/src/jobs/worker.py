@@ -0,0 +1,157 @@
+import asyncio
+import logging
+import os
+import socket
+import time
+import uuid
+from typing import Optional, Set
+
+from config.models import AnalysisJob, JobStatus
+from src.jobs.events import job_events
+from src.jobs.executor import crew_executor
+from src.jobs.handlers import JOB_HANDLERS
+from src.jobs.intent import intent_classifier
+from src.jobs.queue import JobQueue, job_queue
+from src.runtime.cancellation import CANCELLED, CancellationToken, JobCancelled, cancellation
+
+logger = logging.getLogger(__name__)
+
+
+class JobWorker:
+    """Claim queued jobs and run them, holding at most ``concurrency`` at a time.
+
+    Several workers (in the API process, or standalone via ``worker.py``) can
+    consume the same queue; claims are atomic so each job runs once per attempt.
+
+    Each running job has a cancellation token carrying its wall-clock and token
+    budgets. The worker stops waiting for a job as soon as the token trips (budget
+    spent, or the job was cancelled / lost its lease, which the heartbeat checks
+    every ``JOB_CANCEL_POLL_SECONDS``); the crew thread itself aborts at its next
+    agent step or tool call.
+    """
+
+    def __init__(self, queue: JobQueue = job_queue, concurrency: Optional[int] = None):
+        self.queue = queue
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+        self.concurrency = concurrency or crew_executor.max_workers
+        self.poll_interval = float(os.getenv("JOB_POLL_INTERVAL_SECONDS", "2"))
+        self.cancel_poll_interval = float(os.getenv("JOB_CANCEL_POLL_SECONDS", "5"))
+        self._stopping = asyncio.Event()
+        self._tasks: Set[asyncio.Task] = set()
+
+    def stop(self):
+        self._stopping.set()
+
+    async def run(self):
+        logger.info(f"Job worker started | Worker: {self.worker_id} | Concurrency: {self.concurrency}")
+        try:
+            await intent_classifier.warm()
+        except Exception as e:
+            logger.error(f"Intent classifier warm-up failed | Error: {str(e)}")
+        slots = asyncio.Semaphore(self.concurrency)
+
+        while not self._stopping.is_set():
+            await slots.acquire()
+            try:
+                job = await self.queue.claim(self.worker_id)
+            except Exception as e:
+                logger.error(f"Job claim failed | Worker: {self.worker_id} | Error: {str(e)}")
+                job = None
+
+            if job is None:
+                slots.release()
+                await self._idle()
+                continue
+
+            task = asyncio.create_task(self._process(job))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+            task.add_done_callback(lambda _: slots.release())
+
+        if self._tasks:
+            logger.info(f"Job worker draining {len(self._tasks)} in-flight job(s)")
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+        logger.info(f"Job worker stopped | Worker: {self.worker_id}")
+
+    async def _idle(self):
+        try:
+            await self.queue.fail_exhausted_leases()
+        except Exception as e:
+            logger.error(f"Lease sweep failed | Worker: {self.worker_id} | Error: {str(e)}")
+        try:
+            await asyncio.wait_for(self._stopping.wait(), timeout=self.poll_interval)
+        except asyncio.TimeoutError:
+            pass
+
+    async def _heartbeat(self, job_id: str, token: CancellationToken):
+        interval = max(1.0, min(self.queue.lease_seconds / 3, self.cancel_poll_interval))
+        loop = asyncio.get_running_loop()
+        renewed_at = loop.time()
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                held = await self.queue.renew_lease(job_id, self.worker_id)
+            except Exception as e:
+                if loop.time() - renewed_at < self.queue.lease_seconds:
+                    logger.error(f"Lease renewal failed, retrying | Job ID: {job_id} | Worker: {self.worker_id} | Error: {str(e)}")
+                    continue
+                # Another worker may claim the job now; stop rather than run it twice
+                logger.error(f"Lease expired while renewals failed | Job ID: {job_id} | Worker: {self.worker_id} | Error: {str(e)}")
+                token.cancel(CANCELLED, "Job lease expired while it could not be renewed")
+                return
+            if not held:
+                # Cancelled by the client, or reclaimed by another worker: either
+                # way this run's result would be discarded
+                logger.warning(f"Lost lease | Job ID: {job_id} | Worker: {self.worker_id}")
+                token.cancel(CANCELLED, "Job was cancelled or its lease was lost")
+                return
+            renewed_at = loop.time()
+
+    @staticmethod
+    async def _wait(handler: asyncio.Task, token: CancellationToken):
+        """Await the handler, raising ``JobCancelled`` as soon as the token trips."""
+        while True:
+            done, _ = await asyncio.wait({handler}, timeout=1.0)
+            if done:
+                return handler.result()
+            if token.cancelled:
+                raise JobCancelled(token.reason, token.message)
+
+    async def _process(self, job: AnalysisJob):
+        start_time = time.time()
+        job_type = job.job_type.value
+        logger.info(f"Starting {job_type} job | Job ID: {job.job_id}")
+        job_events.publish(job.job_id, "status", {"status": JobStatus.RUNNING.value, "attempt": job.attempts})
+        token = cancellation.register(job.job_id)
+        heartbeat = asyncio.create_task(self._heartbeat(job.job_id, token))
+        handler = asyncio.create_task(JOB_HANDLERS[job.job_type](job))
+
+        try:
+            result = await self._wait(handler, token)
+            duration = time.time() - start_time
+            logger.info(f"{job_type} job completed | Job ID: {job.job_id} | Duration: {duration:.2f}s | Result length: {len(str(result))} chars")
+            if await self.queue.complete(job.job_id, self.worker_id, str(result), duration):
+                await self.queue.cache_result(job, str(result))
+                job_events.publish(job.job_id, "status", {"status": JobStatus.COMPLETED.value, "result": str(result)})
+            else:
+                logger.warning(f"Discarding result, lease no longer held | Job ID: {job.job_id}")
+        except JobCancelled as e:
+            duration = time.time() - start_time
+            status = JobStatus.CANCELLED if e.reason == CANCELLED else JobStatus.TIMED_OUT
+            if await self.queue.stop(job.job_id, self.worker_id, status, str(e), duration, token.tokens_used):
+                job_events.publish(job.job_id, "status", {"status": status.value, "error": str(e)})
+            logger.warning(
+                f"{job_type} job stopped | Job ID: {job.job_id} | Reason: {e.reason} | "
+                f"Duration: {duration:.2f}s | Est. tokens: {token.tokens_used}"
+            )
+        except Exception as e:
+            duration = time.time() - start_time
+            status = await self.queue.fail(job, self.worker_id, str(e), duration)
+            job_events.publish(job.job_id, "status", {"status": status.value, "error": str(e)})
+            retrying = " (will retry)" if status == JobStatus.PENDING else ""
+            logger.error(f"{job_type} job failed{retrying} | Job ID: {job.job_id} | Duration: {duration:.2f}s | Error: {str(e)}")
+        finally:
+            heartbeat.cancel()
+            # The crew thread keeps its executor slot until its next checkpoint
+            handler.cancel()
+            cancellation.release(job.job_id)
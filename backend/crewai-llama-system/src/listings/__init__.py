@@ -0,0 +1,3 @@
+from .pagination import TOTAL_MODES, InvalidCursor, ListingPager, listing_pager
+
+__all__ = ["TOTAL_MODES", "InvalidCursor", "ListingPager", "listing_pager"]
@@ -0,0 +1,147 @@
+import base64
+import hashlib
+import json
+import logging
+import math
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from bson import ObjectId
+from bson.errors import InvalidId
+from pymongo import ASCENDING
+from motor.motor_asyncio import AsyncIOMotorCollection
+
+logger = logging.getLogger(__name__)
+
+# Keyset order; backed by the (listing_price, _id) index on market_listings
+SORT = [("listing_price", ASCENDING), ("_id", ASCENDING)]
+
+TOTAL_MODES = ("exact", "cached", "approximate", "none")
+
+
+class InvalidCursor(ValueError):
+    """The cursor is malformed or was issued for different filters."""
+
+
+def _filters_key(filters: Dict[str, Any]) -> str:
+    return hashlib.sha256(json.dumps(filters, sort_keys=True, default=str).encode("utf-8")).hexdigest()[:16]
+
+
+class ListingPager:
+    """Keyset (cursor) pagination and total counts for market listings.
+
+    Pages are ordered by ``(listing_price, _id)`` and each page starts after
+    the last key of the previous one, so page N costs the same index range scan
+    as page 1 instead of skipping N pages of documents. The cursor is an opaque
+    base64 token holding that key and a hash of the filters it was issued for.
+
+    Listing prices may be null or NaN, which Mongo sorts before all numbers
+    (null first); the "after this price" condition follows that order.
+
+    Totals can be exact (``count_documents`` per request), cached per filter
+    set for ``count_ttl_seconds``, approximate (collection metadata when
+    unfiltered, cached otherwise) or skipped.
+    """
+
+    def __init__(self):
+        self.max_page_size = int(os.getenv("LISTINGS_MAX_PAGE_SIZE", "500"))
+        self.count_ttl_seconds = float(os.getenv("LISTINGS_COUNT_CACHE_TTL_SECONDS", "60"))
+        self.count_cache_size = int(os.getenv("LISTINGS_COUNT_CACHE_SIZE", "1024"))
+        self._counts: "OrderedDict[str, Tuple[float, int]]" = OrderedDict()
+        self._count_hits = 0
+        self._count_misses = 0
+
+    @staticmethod
+    def encode_cursor(filters: Dict[str, Any], price: Optional[float], listing_id: ObjectId) -> str:
+        if isinstance(price, float) and math.isnan(price):
+            encoded_price: Any = "nan"
+        else:
+            encoded_price = price
+        payload = json.dumps({"p": encoded_price, "i": str(listing_id), "f": _filters_key(filters)}, separators=(",", ":"))
+        return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+    @staticmethod
+    def decode_cursor(filters: Dict[str, Any], cursor: str) -> Tuple[Optional[float], ObjectId]:
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+            price = payload["p"]
+            listing_id = ObjectId(payload["i"])
+            filters_key = payload["f"]
+        except (ValueError, KeyError, TypeError, InvalidId) as e:
+            raise InvalidCursor(f"Malformed cursor: {str(e)}")
+        if filters_key != _filters_key(filters):
+            raise InvalidCursor("Cursor was issued for different filters")
+        if price == "nan":
+            price = float("nan")
+        elif price is not None and not isinstance(price, (int, float)):
+            raise InvalidCursor("Malformed cursor: bad price")
+        return price, listing_id
+
+    @staticmethod
+    def _after(price: Optional[float], listing_id: ObjectId) -> Dict[str, Any]:
+        """Documents sorting after ``(price, listing_id)`` in ``SORT`` order."""
+        if price is None:
+            # null (or missing) sorts first; anything non-null comes after it
+            greater: Dict[str, Any] = {"listing_price": {"$ne": None}}
+        elif isinstance(price, float) and math.isnan(price):
+            # NaN sorts after null and before every number
+            greater = {"listing_price": {"$gte": float("-inf")}}
+        else:
+            greater = {"listing_price": {"$gt": price}}
+        return {"$or": [{"listing_price": price, "_id": {"$gt": listing_id}}, greater]}
+
+    def page_size(self, limit: int) -> int:
+        """The page size ``page`` actually uses for a requested ``limit``."""
+        return max(1, min(limit, self.max_page_size))
+
+    async def page(
+        self, collection: AsyncIOMotorCollection, filters: Dict[str, Any], limit: int, cursor: Optional[str]
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """One page of raw listing documents and the cursor of the next page (None on the last)."""
+        limit = self.page_size(limit)
+        query = filters
+        if cursor:
+            price, listing_id = self.decode_cursor(filters, cursor)
+            query = {"$and": [filters, self._after(price, listing_id)]} if filters else self._after(price, listing_id)
+        # One extra document tells whether another page follows
+        docs = await collection.find(query).sort(SORT).limit(limit + 1).to_list(length=limit + 1)
+        if len(docs) <= limit:
+            return docs, None
+        docs = docs[:limit]
+        last = docs[-1]
+        return docs, self.encode_cursor(filters, last.get("listing_price"), last["_id"])
+
+    async def total(self, collection: AsyncIOMotorCollection, filters: Dict[str, Any], mode: str) -> Optional[int]:
+        if mode == "none":
+            return None
+        if mode == "exact":
+            return await collection.count_documents(filters)
+        if mode == "approximate" and not filters:
+            return await collection.estimated_document_count()
+
+        key = _filters_key(filters)
+        entry = self._counts.get(key)
+        if entry is not None and entry[0] > time.monotonic():
+            self._counts.move_to_end(key)
+            self._count_hits += 1
+            return entry[1]
+        self._count_misses += 1
+        count = await collection.count_documents(filters)
+        self._counts[key] = (time.monotonic() + self.count_ttl_seconds, count)
+        self._counts.move_to_end(key)
+        while len(self._counts) > self.count_cache_size:
+            self._counts.popitem(last=False)
+        return count
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "max_page_size": self.max_page_size,
+            "count_cache_entries": len(self._counts),
+            "count_cache_hits": self._count_hits,
+            "count_cache_misses": self._count_misses,
+        }
+
+
+listing_pager = ListingPager()
@@ -0,0 +1,18 @@
+from .cancellation import (
+    CancellationRegistry,
+    CancellationToken,
+    JobCancelled,
+    cancellation,
+    cancellation_scope,
+    checkpoint,
+    current_token,
+    request_timeout,
+    run_in_thread,
+    step_checkpoint,
+)
+
+__all__ = [
+    "CancellationRegistry", "CancellationToken", "JobCancelled", "cancellation",
+    "cancellation_scope", "checkpoint", "current_token", "request_timeout", "run_in_thread",
+    "step_checkpoint",
+]
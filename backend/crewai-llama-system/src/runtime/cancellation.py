@@ -0,0 +1,226 @@
+import asyncio
+import contextvars
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Why a job stopped early; "cancelled" comes from the client, the others from its budgets
+CANCELLED = "cancelled"
+TIMED_OUT = "timed_out"
+TOKEN_BUDGET = "token_budget"
+
+# A context variable rather than a thread-local: CrewAI runs event handlers on its
+# own executor with a copy of the emitting thread's context
+_scope: contextvars.ContextVar[Optional["CancellationToken"]] = contextvars.ContextVar("cancellation_scope", default=None)
+
+
+class JobCancelled(Exception):
+    """Raised at a checkpoint inside a crew run once its job has been stopped."""
+
+    def __init__(self, reason: str, message: Optional[str] = None):
+        super().__init__(message or f"Job stopped: {reason}")
+        self.reason = reason
+
+
+class CancellationToken:
+    """Cancellation flag plus wall-clock and LLM token budget of one job.
+
+    The worker cancels it; the crew thread polls it at checkpoints (agent steps,
+    tool calls) and tools size their HTTP timeouts from ``remaining()``.
+    """
+
+    def __init__(self, job_id: str, timeout_seconds: float = 0, max_tokens: int = 0):
+        self.job_id = job_id
+        self.deadline = time.monotonic() + timeout_seconds if timeout_seconds > 0 else None
+        self.max_tokens = max_tokens
+        self.tokens_used = 0
+        self.reason: Optional[str] = None
+        self.message: Optional[str] = None
+        self._lock = threading.Lock()
+
+    def cancel(self, reason: str, message: Optional[str] = None):
+        with self._lock:
+            if self.reason is None:
+                self.reason = reason
+                self.message = message
+                logger.info(f"Job stop requested | Job ID: {self.job_id} | Reason: {reason}")
+
+    @property
+    def cancelled(self) -> bool:
+        if self.reason is None and self.deadline is not None and time.monotonic() >= self.deadline:
+            self.cancel(TIMED_OUT, "Job exceeded its wall-clock budget")
+        return self.reason is not None
+
+    def remaining(self) -> Optional[float]:
+        """Seconds left before the deadline, or ``None`` without one."""
+        if self.deadline is None:
+            return None
+        return max(0.0, self.deadline - time.monotonic())
+
+    def add_tokens(self, count: int):
+        with self._lock:
+            self.tokens_used += count
+            over = self.max_tokens > 0 and self.tokens_used > self.max_tokens
+        if over:
+            self.cancel(TOKEN_BUDGET, f"Job exceeded its token budget ({self.max_tokens} tokens)")
+
+    def check(self):
+        """Raise ``JobCancelled`` if the job has been stopped."""
+        if self.cancelled:
+            raise JobCancelled(self.reason, self.message)
+
+
+class CancellationRegistry:
+    """Tokens of the jobs running in this process, keyed by job id.
+
+    A token only reaches crews run in the same process: in process-pool mode the
+    child cannot be interrupted and its result is discarded when it returns.
+    """
+
+    def __init__(self):
+        self.timeout_seconds = float(os.getenv("JOB_TIMEOUT_SECONDS", "900"))
+        self.max_tokens = int(os.getenv("JOB_MAX_LLM_TOKENS", "0"))
+        self._tokens: Dict[str, CancellationToken] = {}
+        self._lock = threading.Lock()
+        self._stopped: Dict[str, int] = {CANCELLED: 0, TIMED_OUT: 0, TOKEN_BUDGET: 0}
+        self._usage_listener: Optional[Callable[[Any, Any], None]] = None
+        self._charged_tokens = 0
+
+    @property
+    def charges_llm_usage(self) -> bool:
+        return self._usage_listener is not None
+
+    def start(self):
+        """Charge the usage each LLM call reports to the running job's token budget."""
+        if self._usage_listener is not None:
+            return
+        try:
+            from crewai.events import LLMCallCompletedEvent, crewai_event_bus
+        except ImportError as e:
+            logger.warning(f"LLM call events unavailable; token budgets use step estimates | Error: {e}")
+            return
+
+        @crewai_event_bus.on(LLMCallCompletedEvent)
+        def _on_llm_call_completed(source, event):
+            token = current_token()
+            if token is not None:
+                tokens = llm_call_tokens(event)
+                token.add_tokens(tokens)
+                with self._lock:
+                    self._charged_tokens += tokens
+
+        self._usage_listener = _on_llm_call_completed
+
+    def register(self, job_id: str) -> CancellationToken:
+        token = CancellationToken(job_id, self.timeout_seconds, self.max_tokens)
+        with self._lock:
+            self._tokens[job_id] = token
+        return token
+
+    def get(self, job_id: Optional[str]) -> Optional[CancellationToken]:
+        with self._lock:
+            return self._tokens.get(job_id) if job_id else None
+
+    def release(self, job_id: str):
+        with self._lock:
+            token = self._tokens.pop(job_id, None)
+            if token is not None and token.reason is not None:
+                self._stopped[token.reason] += 1
+
+    def cancel(self, job_id: str, reason: str = CANCELLED, message: Optional[str] = None) -> bool:
+        token = self.get(job_id)
+        if token is None:
+            return False
+        token.cancel(reason, message)
+        return True
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "timeout_seconds": self.timeout_seconds,
+                "max_llm_tokens": self.max_tokens,
+                "running": len(self._tokens),
+                "charges_llm_usage": self._usage_listener is not None,
+                "llm_tokens_charged": self._charged_tokens,
+                "stopped": dict(self._stopped),
+            }
+
+
+@contextmanager
+def cancellation_scope(token: Optional[CancellationToken]):
+    """Make ``token`` the current thread's token for checkpoints and tool timeouts."""
+    reset = _scope.set(token)
+    try:
+        yield
+    finally:
+        _scope.reset(reset)
+
+
+def current_token() -> Optional[CancellationToken]:
+    return _scope.get()
+
+
+async def run_in_thread(fn: Callable[..., Any], *args: Any) -> Any:
+    """Run blocking ``fn`` on the default executor under the current thread's token."""
+    token = current_token()
+
+    def run():
+        with cancellation_scope(token):
+            return fn(*args)
+
+    return await asyncio.get_running_loop().run_in_executor(None, run)
+
+
+def checkpoint():
+    """Abort the current crew run if its job was cancelled or ran out of budget."""
+    token = current_token()
+    if token is not None:
+        token.check()
+
+
+def estimate_tokens(text: Any) -> int:
+    # About four characters per token, as in the document context budget
+    return len(str(text)) // 4 + 1
+
+
+def llm_call_tokens(event: Any) -> int:
+    """Prompt plus completion tokens of a finished LLM call, estimated when not reported."""
+    usage = getattr(event, "usage", None) or {}
+    total = usage.get("total_tokens") or (
+        (usage.get("prompt_tokens") or usage.get("input_tokens") or 0)
+        + (usage.get("completion_tokens") or usage.get("output_tokens") or 0)
+    )
+    if total:
+        return int(total)
+    return estimate_tokens(getattr(event, "messages", None) or "") + estimate_tokens(getattr(event, "response", None) or "")
+
+
+def step_checkpoint(step: Any):
+    """Crew ``step_callback``: check the job's token after each agent step.
+
+    LLM calls are charged to the token budget as they complete (see
+    ``CancellationRegistry.start``); without that listener the step's output is
+    charged here instead.
+    """
+    token = current_token()
+    if token is not None:
+        if not cancellation.charges_llm_usage:
+            token.add_tokens(estimate_tokens(getattr(step, "text", None) or getattr(step, "output", None) or step))
+        token.check()
+
+
+def request_timeout(default: float) -> float:
+    """HTTP timeout for a tool call: ``default``, capped by the job's remaining time."""
+    token = current_token()
+    remaining = token.remaining() if token is not None else None
+    if remaining is None:
+        return default
+    return max(1.0, min(default, remaining))
+
+
+cancellation = CancellationRegistry()
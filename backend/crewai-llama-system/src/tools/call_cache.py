@@ -0,0 +1,207 @@
+import asyncio
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+import httpx
+import requests
+
+from src.runtime import JobCancelled, checkpoint, current_token
+
+logger = logging.getLogger(__name__)
+
+
+class ToolRequestFailed(Exception):
+    """A tool's upstream request failed; the message is returned to the agent and not cached."""
+
+
+_TIMEOUTS = (TimeoutError, requests.exceptions.Timeout, httpx.TimeoutException)
+
+
+def _leader_only(error: BaseException) -> bool:
+    """Whether ``error`` says more about the calling job than about the call.
+
+    A cancelled job aborts its tool calls at a checkpoint, and
+    ``request_timeout`` shortens HTTP timeouts to the job's remaining time,
+    so a timeout right at the job's deadline is its budget running out.
+    """
+    if isinstance(error, (JobCancelled, asyncio.CancelledError)):
+        return True
+    timed_out = False
+    while error is not None and not timed_out:
+        timed_out = isinstance(error, _TIMEOUTS)
+        error = error.__cause__ or error.__context__
+    token = current_token()
+    remaining = token.remaining() if token is not None else None
+    # request_timeout never goes below one second
+    return timed_out and remaining is not None and remaining <= 1.0
+
+
+class _Flight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        # The leader failed for reasons of its own; followers should try again
+        self.retry = False
+        self._waiters: List[Tuple[asyncio.AbstractEventLoop, asyncio.Future]] = []
+        self._lock = threading.Lock()
+
+    def waiter(self) -> asyncio.Future:
+        """Future on the running loop, resolved once the flight is done."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        with self._lock:
+            if self.done.is_set():
+                future.set_result(None)
+            else:
+                self._waiters.append((loop, future))
+        return future
+
+    def finish(self):
+        with self._lock:
+            self.done.set()
+            waiters, self._waiters = self._waiters, []
+        for loop, future in waiters:
+            loop.call_soon_threadsafe(lambda f=future: f.done() or f.set_result(None))
+
+    def outcome(self) -> Any:
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+
+class ToolCallCache:
+    """Share the results of identical tool calls across concurrently running crews.
+
+    While a call is in flight, other threads asking for the same ``(tool, key)``
+    wait for it instead of issuing their own request; successful results are
+    then kept for ``ttl_seconds`` (bounded LRU). Jobs of a research batch about
+    neighbouring addresses often search and fetch the same things. Async
+    callers (``acall``) join the same flights without tying up a thread.
+
+    Followers do not inherit the leader's cancellation, or a timeout caused by
+    the leader's own job budget: they start over and one of them leads the
+    next attempt.
+    """
+
+    def __init__(self):
+        self.enabled = os.getenv("TOOL_CALL_CACHE_ENABLED", "true").lower() == "true"
+        self.ttl_seconds = float(os.getenv("TOOL_CALL_CACHE_TTL_SECONDS", "900"))
+        self.max_entries = int(os.getenv("TOOL_CALL_CACHE_MAX_ENTRIES", "2048"))
+        self._lock = threading.Lock()
+        self._results: "OrderedDict[Tuple[str, str], Tuple[float, Any]]" = OrderedDict()
+        self._inflight: Dict[Tuple[str, str], _Flight] = {}
+        self._calls = 0
+        self._hits = 0
+        self._shared = 0
+        self._retried = 0
+
+    def _join(self, cache_key: Tuple[str, str]) -> Tuple[Optional[_Flight], bool, Any]:
+        """``(flight, leader, cached)``; no flight means ``cached`` is a fresh result."""
+        with self._lock:
+            self._calls += 1
+            entry = self._results.get(cache_key)
+            if entry is not None and entry[0] > time.monotonic():
+                self._results.move_to_end(cache_key)
+                self._hits += 1
+                return None, False, entry[1]
+            flight = self._inflight.get(cache_key)
+            if flight is not None:
+                self._shared += 1
+                return flight, False, None
+            flight = self._inflight[cache_key] = _Flight()
+            return flight, True, None
+
+    def _fail(self, flight: _Flight, error: BaseException):
+        flight.error = error
+        flight.retry = _leader_only(error)
+
+    def _rejoin(self, flight: _Flight) -> bool:
+        """Whether a follower should start over rather than take ``flight``'s outcome."""
+        if flight.retry:
+            with self._lock:
+                self._retried += 1
+        return flight.retry
+
+    def _land(self, cache_key: Tuple[str, str], flight: _Flight):
+        with self._lock:
+            if flight.error is None:
+                self._results[cache_key] = (time.monotonic() + self.ttl_seconds, flight.result)
+                while len(self._results) > self.max_entries:
+                    self._results.popitem(last=False)
+            self._inflight.pop(cache_key, None)
+        flight.finish()
+
+    def call(self, tool: str, key: str, fn: Callable[[], Any]) -> Any:
+        """Return ``fn()``, or the result of an identical call that is running or recent."""
+        if not self.enabled:
+            return fn()
+        cache_key = (tool, key)
+        while True:
+            flight, leader, cached = self._join(cache_key)
+            if flight is None:
+                return cached
+            if leader:
+                break
+            # Keep checking for cancellation while another job's request runs
+            while not flight.done.wait(1.0):
+                checkpoint()
+            if not self._rejoin(flight):
+                return flight.outcome()
+
+        try:
+            flight.result = fn()
+        except BaseException as e:
+            self._fail(flight, e)
+            raise
+        finally:
+            self._land(cache_key, flight)
+        return flight.result
+
+    async def acall(self, tool: str, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Async ``call``: awaits ``fn()``, sharing flights with sync and async callers alike."""
+        if not self.enabled:
+            return await fn()
+        cache_key = (tool, key)
+        while True:
+            flight, leader, cached = self._join(cache_key)
+            if flight is None:
+                return cached
+            if leader:
+                break
+            waiter = flight.waiter()
+            while True:
+                done, _ = await asyncio.wait({waiter}, timeout=1.0)
+                if done:
+                    break
+                checkpoint()
+            if not self._rejoin(flight):
+                return flight.outcome()
+
+        try:
+            flight.result = await fn()
+        except BaseException as e:
+            self._fail(flight, e)
+            raise
+        finally:
+            self._land(cache_key, flight)
+        return flight.result
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "entries": len(self._results),
+                "in_flight": len(self._inflight),
+                "calls": self._calls,
+                "hits": self._hits,
+                "shared_in_flight": self._shared,
+                "follower_retries": self._retried,
+            }
+
+
+tool_call_cache = ToolCallCache()
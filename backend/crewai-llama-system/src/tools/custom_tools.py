@@ -1,14 +1,33 @@
 from crewai_tools import FileReadTool, DirectoryReadTool, TavilySearchTool
+import json
+import logging
 import os
-import requests
-from typing import Type, List
+import threading
+from typing import Any, Dict, List, Optional, Tuple, Type
 from pydantic import BaseModel, Field
 from crewai.tools import BaseTool
 from dotenv import load_dotenv
+from config.http_client import async_http_client, http_client
+from src.runtime import checkpoint, request_timeout, run_in_thread
+from src.tools.call_cache import ToolRequestFailed, tool_call_cache
+from src.tools.file_index import file_index, matches_directories
+from src.tools.html_text import StreamingTextReader, charset, is_text
+from src.tools.page_cache import page_cache
+from src.tools.search_cache import normalize_search_query, search_cache
+from src.tools.search_providers import search_providers
 import pathlib
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
+PERPLEXITY_MODEL = os.getenv("PERPLEXITY_MODEL", "llama-3.1-sonar-small-128k-online")
+PAGE_FETCH_MAX_BYTES = int(os.getenv("PAGE_FETCH_MAX_BYTES", str(2 * 1024 * 1024)))
+PAGE_FETCH_MAX_CHARS = int(os.getenv("PAGE_FETCH_MAX_CHARS", "20000"))
+PAGE_FETCH_CHUNK_BYTES = int(os.getenv("PAGE_FETCH_CHUNK_BYTES", "16384"))
+FILE_GLOB_PAGE_SIZE = int(os.getenv("FILE_GLOB_PAGE_SIZE", "100"))
+FILE_GLOB_MAX_RESULTS = int(os.getenv("FILE_GLOB_MAX_RESULTS", "500"))
+
 
 class PerplexitySearchInput(BaseModel):
     """Input schema for Perplexity search."""
@@ -19,24 +38,83 @@ class PerplexitySearchTool(BaseTool):
     name: str = "perplexity_search"
     description: str = "Search using Perplexity AI for comprehensive research with sources and citations"
     args_schema: Type[BaseModel] = PerplexitySearchInput
+    # Tavily tool to hedge slow searches with and fail over to, when configured
+    fallback: Optional[Any] = Field(default=None, exclude=True)
 
     def _run(self, query: str) -> str:
         """Execute the Perplexity search."""
+        checkpoint()
         api_key = os.getenv("PERPLEXITY_API_KEY")
         
         if not api_key:
             return "Perplexity API key not configured"
             
         try:
-            url = "https://api.perplexity.ai/chat/completions"
-            
-            headers = {
+            if self.fallback is None:
+                return self._format("perplexity", self.search(query, api_key))
+            return self._format(*search_providers.hedge(
+                "perplexity", lambda: self.search(query, api_key),
+                "tavily", lambda: self.fallback.search(query),
+            ))
+        except ToolRequestFailed as e:
+            return str(e)
+        except Exception as e:
+            return f"Perplexity search error: {str(e)}"
+
+    async def _arun(self, query: str) -> str:
+        """Execute the Perplexity search without blocking the event loop."""
+        checkpoint()
+        api_key = os.getenv("PERPLEXITY_API_KEY")
+
+        if not api_key:
+            return "Perplexity API key not configured"
+
+        try:
+            if self.fallback is None:
+                return self._format("perplexity", await self.asearch(query, api_key))
+            return self._format(*await search_providers.ahedge(
+                "perplexity", lambda: self.asearch(query, api_key),
+                "tavily", lambda: run_in_thread(self.fallback.search, query),
+            ))
+        except ToolRequestFailed as e:
+            return str(e)
+        except Exception as e:
+            return f"Perplexity search error: {str(e)}"
+
+    def search(self, query: str, api_key: str) -> str:
+        """Search result text; raises instead of returning an error message."""
+        # Identical queries from concurrently running jobs share one request, and
+        # repeated ones are answered from the persistent search cache
+        return tool_call_cache.call(
+            self.name,
+            normalize_search_query(query),
+            lambda: search_cache.cached("perplexity", PERPLEXITY_MODEL, query, lambda: self._search(api_key, query)),
+        )
+
+    async def asearch(self, query: str, api_key: str) -> str:
+        """Async ``search``, sharing in-flight calls and the cache with sync callers."""
+        return await tool_call_cache.acall(
+            self.name,
+            normalize_search_query(query),
+            lambda: search_cache.acached("perplexity", PERPLEXITY_MODEL, query, lambda: self._asearch(api_key, query)),
+        )
+
+    @staticmethod
+    def _format(provider: str, text: str) -> str:
+        if provider == "tavily":
+            return f"Web Search Results (Perplexity was slow or unavailable):\n\n{summarize_tavily(text)[0]}"
+        return f"Perplexity Research Results:\n\n{text}"
+
+    @staticmethod
+    def _request(api_key: str, query: str) -> Dict[str, Any]:
+        return {
+            "url": "https://api.perplexity.ai/chat/completions",
+            "headers": {
                 "Authorization": f"Bearer {api_key}",
                 "Content-Type": "application/json"
-            }
-            
-            data = {
-                "model": "llama-3.1-sonar-small-128k-online",
+            },
+            "json": {
+                "model": PERPLEXITY_MODEL,
                 "messages": [
                     {
                         "role": "system", 
@@ -50,21 +128,77 @@ class PerplexitySearchTool(BaseTool):
                 "max_tokens": 1500,
                 "temperature": 0.2,
                 "stream": False
-            }
-            
-            response = requests.post(url, headers=headers, json=data, timeout=30)
-            
-            if response.status_code == 200:
-                result = response.json()
-                content = result.get("choices", [{}])[0].get("message", {}).get("content", "No results found")
-                return f"Perplexity Research Results:\n\n{content}"
-            else:
-                return f"Perplexity search failed with status: {response.status_code}"
-                
-        except Exception as e:
-            return f"Perplexity search error: {str(e)}"
+            },
+        }
+
+    @staticmethod
+    def _result(response: Any) -> str:
+        # requests and httpx responses share status_code and json()
+        if response.status_code != 200:
+            raise ToolRequestFailed(f"Perplexity search failed with status: {response.status_code}")
+        result = response.json()
+        return result.get("choices", [{}])[0].get("message", {}).get("content", "No results found")
+
+    def _search(self, api_key: str, query: str) -> str:
+        def search() -> str:
+            response = http_client.post(**self._request(api_key, query), timeout=request_timeout(30))
+            return self._result(response)
+
+        return search_providers.call("perplexity", search)
+
+    async def _asearch(self, api_key: str, query: str) -> str:
+        async def search() -> str:
+            response = await async_http_client.post(**self._request(api_key, query), timeout=request_timeout(30))
+            return self._result(response)
+
+        return await search_providers.acall("perplexity", search)
+
+
+def summarize_tavily(text: str) -> Tuple[str, List[str]]:
+    """Readable lines and result URLs of a Tavily JSON response."""
+    try:
+        results = json.loads(text)["results"]
+    except (ValueError, KeyError, TypeError):
+        # The tool reports failures as plain text
+        raise ToolRequestFailed(str(text)[:200])
+    lines = [f"- {r.get('title', '')} ({r.get('url', '')}): {r.get('content', '')}" for r in results]
+    return "\n".join(lines), [r["url"] for r in results if r.get("url")]
+
+
+class CachedTavilySearchTool(TavilySearchTool):
+    """Tavily search sharing concurrent calls and caching results like Perplexity."""
+
+    def _run(self, query: str, **kwargs: Any) -> str:
+        checkpoint()
+        try:
+            return self.search(query, **kwargs)
+        except ToolRequestFailed as e:
+            return str(e)
+
+    async def _arun(self, query: str, **kwargs: Any) -> str:
+        # The Tavily client call is blocking; keep it on the executor so the
+        # result still goes through the shared caches
+        return await run_in_thread(lambda: self._run(query, **kwargs))
+
+    def search(self, query: str, **kwargs: Any) -> str:
+        """Tavily's JSON response; raises instead of returning an error message."""
+        run = super()._run
 
+        def request() -> str:
+            text = run(query=query, **kwargs)
+            try:
+                json.loads(text)["results"]
+            except (ValueError, KeyError, TypeError):
+                # The tool reports failures as plain text; those are not cached
+                raise ToolRequestFailed(str(text))
+            return text
 
+        model = f"{getattr(self, 'search_depth', 'basic')}:{json.dumps(kwargs, sort_keys=True, default=str)}"
+        return tool_call_cache.call(
+            "tavily_search",
+            f"{model}|{normalize_search_query(query)}",
+            lambda: search_cache.cached("tavily", model, query, lambda: search_providers.call("tavily", request)),
+        )
 
 
 class WebPageFetchInput(BaseModel):
@@ -81,56 +215,166 @@ class WebPageFetchTool(BaseTool):
     args_schema: Type[BaseModel] = WebPageFetchInput
 
     def _run(self, url: str, max_chars: int = 4000) -> str:
+        checkpoint()
         try:
-            headers = {"User-Agent": "Mozilla/5.0"}
-            resp = requests.get(url, headers=headers, timeout=20)
-            if resp.status_code != 200:
-                return f"Failed to fetch page. Status: {resp.status_code}"
-
-            text = resp.text
-            # Strip basic HTML tags for readability
-            import re
-            text_only = re.sub(r"<script[\s\S]*?</script>", " ", text, flags=re.IGNORECASE)
-            text_only = re.sub(r"<style[\s\S]*?</style>", " ", text_only, flags=re.IGNORECASE)
-            text_only = re.sub(r"<[^>]+>", " ", text_only)
-            text_only = re.sub(r"\s+", " ", text_only).strip()
+            text_only = self.fetch_text(url)
+            if not text_only:
+                return "No readable content found"
+            return text_only[:max_chars]
+        except ToolRequestFailed as e:
+            return str(e)
+        except Exception as e:
+            return f"Error fetching page: {str(e)}"
+
+    async def _arun(self, url: str, max_chars: int = 4000) -> str:
+        checkpoint()
+        try:
+            text_only = await self.afetch_text(url)
             if not text_only:
                 return "No readable content found"
             return text_only[:max_chars]
+        except ToolRequestFailed as e:
+            return str(e)
         except Exception as e:
             return f"Error fetching page: {str(e)}"
 
+    def fetch_text(self, url: str) -> str:
+        """Readable text of the page (untruncated); raises on failure."""
+        return tool_call_cache.call(self.name, url, lambda: self._fetch(url))
+
+    async def afetch_text(self, url: str) -> str:
+        """Async ``fetch_text``, sharing in-flight fetches and the page cache with sync callers."""
+        return await tool_call_cache.acall(self.name, url, lambda: self._afetch(url))
+
+    def _fetch(self, url: str) -> str:
+        cached = page_cache.get(url)
+        if cached is not None and cached.fresh:
+            return cached.text
+
+        # Revalidate a stale copy instead of downloading it again when unchanged
+        headers = cached.validators() if cached is not None else {}
+        with http_client.get(url, headers=headers, timeout=request_timeout(20), stream=True) as resp:
+            if resp.status_code == 304 and cached is not None:
+                page_cache.renew(url)
+                return cached.text
+            if resp.status_code != 200:
+                raise ToolRequestFailed(f"Failed to fetch page. Status: {resp.status_code}")
+            reader = self._reader(url, resp.headers)
+            for chunk in resp.iter_content(chunk_size=PAGE_FETCH_CHUNK_BYTES):
+                if reader.feed(chunk):
+                    break
+        return self._store(url, resp.headers, reader)
+
+    async def _afetch(self, url: str) -> str:
+        cached = page_cache.get(url)
+        if cached is not None and cached.fresh:
+            return cached.text
+
+        headers = cached.validators() if cached is not None else {}
+        async with async_http_client.stream("GET", url, headers=headers, timeout=request_timeout(20)) as resp:
+            if resp.status_code == 304 and cached is not None:
+                page_cache.renew(url)
+                return cached.text
+            if resp.status_code != 200:
+                raise ToolRequestFailed(f"Failed to fetch page. Status: {resp.status_code}")
+            reader = self._reader(url, resp.headers)
+            async for chunk in resp.aiter_bytes(PAGE_FETCH_CHUNK_BYTES):
+                if reader.feed(chunk):
+                    break
+        return self._store(url, resp.headers, reader)
+
+    @staticmethod
+    def _reader(url: str, headers: Any) -> StreamingTextReader:
+        """Incremental HTML-to-text reader for the response body.
+
+        Reading stops after PAGE_FETCH_MAX_CHARS of text or PAGE_FETCH_MAX_BYTES
+        of body, so memory and parse time stay bounded on very large pages.
+        """
+        content_type = headers.get("Content-Type", "")
+        if not is_text(content_type):
+            raise ToolRequestFailed(f"Unsupported content type: {content_type.split(';')[0]}")
+        return StreamingTextReader(charset(content_type), PAGE_FETCH_MAX_CHARS, PAGE_FETCH_MAX_BYTES)
+
+    @staticmethod
+    def _store(url: str, headers: Any, reader: StreamingTextReader) -> str:
+        text_only = reader.text()
+        if reader.truncated:
+            logger.debug(f"Page fetch stopped early | URL: {url} | Bytes read: {reader.bytes_read} | Chars: {len(text_only)}")
+        page_cache.put(url, text_only, headers.get("ETag"), headers.get("Last-Modified"))
+        return text_only
+
 
 class FileGlobInput(BaseModel):
     """Input schema for file globbing."""
     directory: str = Field(..., description="Base directory to search")
     pattern: str = Field("**/*", description="Glob pattern (supports ** for recursive)")
+    offset: int = Field(0, description="Number of matches to skip, for fetching the next page")
+    limit: int = Field(FILE_GLOB_PAGE_SIZE, description=f"Maximum matches to return (at most {FILE_GLOB_MAX_RESULTS})")
 
 
 class FileGlobTool(BaseTool):
     name: str = "glob_files"
     description: str = (
-        "List files in a directory using a glob pattern (e.g., **/*.md)."
+        "List files in a directory using a glob pattern (e.g., **/*.md). "
+        "Results are paged; use offset to fetch more."
     )
     args_schema: Type[BaseModel] = FileGlobInput
 
-    def _run(self, directory: str, pattern: str = "**/*") -> str:
+    def _run(self, directory: str, pattern: str = "**/*", offset: int = 0, limit: int = FILE_GLOB_PAGE_SIZE) -> str:
+        checkpoint()
         try:
             base = pathlib.Path(directory)
             if not base.exists() or not base.is_dir():
                 return f"Directory not found: {directory}"
-            matched = [str(p) for p in base.glob(pattern)]
-            files = [m for m in matched if pathlib.Path(m).is_file()]
+            if pattern.startswith("/"):
+                return "Pattern must be relative to the directory"
+            offset = max(0, offset)
+            files, more = file_index.glob(str(base), pattern, offset, max(1, min(limit, FILE_GLOB_MAX_RESULTS)))
+            # A trailing ** matches directories, as with pathlib
+            kind = "directories" if matches_directories(pattern) else "files"
             if not files:
-                return "No files matched the pattern"
-            return "Matched files:\n" + "\n".join(files)
+                return f"No {kind} matched the pattern" if offset == 0 else f"No more {kind} matched the pattern"
+            header = f"Matched {kind} ({offset + 1}-{offset + len(files)}"
+            if more:
+                header += f"; more available, call again with offset={offset + len(files)}"
+            return f"{header}):\n" + "\n".join(files)
         except Exception as e:
             return f"Error globbing files: {str(e)}"
 
+    async def _arun(
+        self, directory: str, pattern: str = "**/*", offset: int = 0, limit: int = FILE_GLOB_PAGE_SIZE
+    ) -> str:
+        # Filesystem walks block; run them on the default executor
+        return await run_in_thread(self._run, directory, pattern, offset, limit)
+
 
 class CustomTools:
+    """Tool sets shared by every crew in the process.
+
+    Tools keep no per-call state, so each set is built once and reused; callers
+    get a fresh list to assign to an agent.
+    """
+
+    _cache: Dict[str, List[BaseTool]] = {}
+    _lock = threading.Lock()
+
+    @classmethod
+    def _shared(cls, name: str, build) -> List[BaseTool]:
+        with cls._lock:
+            if name not in cls._cache:
+                cls._cache[name] = build()
+            return list(cls._cache[name])
+
     @staticmethod
     def get_file_tools():
+        return CustomTools._shared("file", CustomTools._build_file_tools)
+
+    @staticmethod
+    def get_web_tools():
+        return CustomTools._shared("web", CustomTools._build_web_tools)
+
+    @staticmethod
+    def _build_file_tools():
         return [
             FileReadTool(),
             DirectoryReadTool(),
@@ -138,18 +382,20 @@ class CustomTools:
         ]
     
     @staticmethod
-    def get_web_tools():
+    def _build_web_tools():
         tools = []
         
-        # Add Perplexity search (comprehensive research with sources)
-        perplexity_key = os.getenv("PERPLEXITY_API_KEY")
-        if perplexity_key:
-            tools.append(PerplexitySearchTool())
-        
         # Add Tavily search (fast web search)
         tavily_key = os.getenv("TAVILY_API_KEY")
-        if tavily_key:
-            tools.append(TavilySearchTool(api_key=tavily_key))
+        tavily = CachedTavilySearchTool(api_key=tavily_key) if tavily_key else None
+
+        # Add Perplexity search (comprehensive research with sources), hedged with Tavily
+        perplexity_key = os.getenv("PERPLEXITY_API_KEY")
+        if perplexity_key:
+            tools.append(PerplexitySearchTool(fallback=tavily))
+
+        if tavily is not None:
+            tools.append(tavily)
 
         # Include simple web page fetcher for reading content
         tools.append(WebPageFetchTool())
@@ -0,0 +1,198 @@
+import logging
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterator, List, Optional, Pattern, Tuple
+
+from src.runtime import checkpoint
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_IGNORED_DIRS = ".git,.hg,.svn,node_modules,__pycache__,.venv,venv,.mypy_cache,.pytest_cache,.tox"
+
+_WILDCARD = re.compile(r"[*?\[]")
+
+
+def matches_directories(pattern: str) -> bool:
+    """Whether ``pattern`` ends in ``**``, which (as with ``pathlib``) matches directories, not files."""
+    return pattern.strip("/").split("/")[-1] == "**"
+
+
+def glob_regex(pattern: str) -> Pattern[str]:
+    """Compile a pathlib-style glob (``*``, ``?``, ``[...]``, ``**``) to match relative POSIX paths.
+
+    For a pattern ending in ``**`` the regex matches directory paths with a
+    trailing slash ("" for the base directory itself).
+    """
+    parts = []
+    for segment in pattern.strip("/").split("/"):
+        if segment == "**":
+            parts.append("(?:[^/]+/)*")
+            continue
+        regex = ""
+        i = 0
+        while i < len(segment):
+            char = segment[i]
+            if char == "*":
+                regex += "[^/]*"
+            elif char == "?":
+                regex += "[^/]"
+            elif char == "[":
+                end = segment.find("]", i + 2)
+                if end == -1:
+                    regex += re.escape(char)
+                else:
+                    body = segment[i + 1:end]
+                    if body.startswith("!"):
+                        body = "^" + body[1:]
+                    regex += f"[{body.replace(chr(92), chr(92) * 2)}]"
+                    i = end
+            else:
+                regex += re.escape(char)
+            i += 1
+        parts.append(regex + "/")
+    # Every segment but a trailing ** ends in "/"; a file name must not
+    joined = "".join(parts)
+    if joined.endswith("/"):
+        joined = joined[:-1]
+    return re.compile(joined + r"\Z")
+
+
+def split_pattern(pattern: str) -> Tuple[List[str], Optional[int]]:
+    """Literal leading directories of ``pattern`` and the walk depth below them (None: unbounded)."""
+    segments = [s for s in pattern.strip("/").split("/") if s and s != "."]
+    prefix = []
+    while len(segments) > 1 and not _WILDCARD.search(segments[0]) and segments[0] != "**":
+        prefix.append(segments.pop(0))
+    depth = None if "**" in segments else len(segments) - 1
+    return prefix, depth
+
+
+class FileIndex:
+    """Bounded, optionally cached directory walks for ``glob_files``.
+
+    Matches are produced lazily in sorted order, so a page of results stops
+    the walk early and paging is stable. Ignored directories (VCS metadata,
+    dependency trees, caches) are pruned, the walk does not descend deeper than
+    the pattern can match, and at most ``max_scanned`` entries are examined.
+
+    When enabled, each directory's listing is cached and reused while the
+    directory's mtime is unchanged (adding, removing or renaming an entry
+    updates it), so repeated globs over a large shared drive cost one ``stat``
+    per directory instead of a full listing. Listings less than
+    ``racy_seconds`` old are not cached, since a change within the same mtime
+    tick would go unnoticed.
+    """
+
+    def __init__(self):
+        self.enabled = os.getenv("FILE_INDEX_ENABLED", "true").lower() == "true"
+        self.max_dirs = int(os.getenv("FILE_INDEX_MAX_DIRS", "50000"))
+        self.max_scanned = int(os.getenv("FILE_GLOB_MAX_SCANNED", "200000"))
+        self.ignored_dirs = {
+            name.strip() for name in os.getenv("FILE_GLOB_IGNORED_DIRS", DEFAULT_IGNORED_DIRS).split(",") if name.strip()
+        }
+        self.racy_seconds = 2.0
+        self._listings: "OrderedDict[str, Tuple[int, Tuple[str, ...], Tuple[str, ...]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._scans = 0
+
+    def _listing(self, path: str) -> Tuple[Tuple[str, ...], Tuple[str, ...]]:
+        """Sorted ``(directories, files)`` directly inside ``path``."""
+        mtime_ns = os.stat(path).st_mtime_ns
+        if self.enabled:
+            with self._lock:
+                cached = self._listings.get(path)
+                if cached is not None and cached[0] == mtime_ns:
+                    self._listings.move_to_end(path)
+                    self._hits += 1
+                    return cached[1], cached[2]
+
+        dirs, files = [], []
+        with os.scandir(path) as entries:
+            for entry in entries:
+                try:
+                    # Directory symlinks are not followed, which also avoids cycles
+                    if entry.is_dir(follow_symlinks=False):
+                        dirs.append(entry.name)
+                    elif entry.is_file():
+                        files.append(entry.name)
+                except OSError:
+                    continue
+        listing = (tuple(sorted(dirs)), tuple(sorted(files)))
+        self._scans += 1
+
+        if self.enabled and time.time() - mtime_ns / 1e9 > self.racy_seconds:
+            with self._lock:
+                self._listings[path] = (mtime_ns, *listing)
+                self._listings.move_to_end(path)
+                while len(self._listings) > self.max_dirs:
+                    self._listings.popitem(last=False)
+        return listing
+
+    def iter_matches(self, base: str, pattern: str) -> Iterator[str]:
+        """Files under ``base`` matching ``pattern``, lazily and in sorted order.
+
+        A pattern ending in ``**`` yields directories instead, like ``pathlib``:
+        ``src/**`` is ``src`` and every directory below it.
+        """
+        prefix, depth = split_pattern(pattern)
+        regex = glob_regex(pattern)
+        directories = matches_directories(pattern)
+        root = os.path.join(base, *prefix)
+        if not os.path.isdir(root):
+            return
+        scanned = 0
+        # Depth-first, visiting a directory's files before its subdirectories
+        stack: List[Tuple[str, str, int]] = [(root, "/".join(prefix), 0)]
+        while stack:
+            path, relative, level = stack.pop()
+            try:
+                dirs, files = self._listing(path)
+            except OSError as e:
+                logger.debug(f"Glob skipped directory | Path: {path} | Error: {str(e)}")
+                continue
+            scanned += len(dirs) + len(files)
+            if scanned > self.max_scanned:
+                logger.warning(f"Glob scan limit reached | Base: {base} | Pattern: {pattern} | Limit: {self.max_scanned}")
+                return
+            checkpoint()
+            if directories:
+                if regex.match(f"{relative}/" if relative else ""):
+                    yield path
+                files = ()
+            for name in files:
+                candidate = f"{relative}/{name}" if relative else name
+                if regex.match(candidate):
+                    yield os.path.join(path, name)
+            if depth is not None and level >= depth:
+                continue
+            for name in reversed(dirs):
+                if name not in self.ignored_dirs:
+                    stack.append((os.path.join(path, name), f"{relative}/{name}" if relative else name, level + 1))
+
+    def glob(self, base: str, pattern: str, offset: int, limit: int) -> Tuple[List[str], bool]:
+        """One page of matches and whether more follow it."""
+        page: List[str] = []
+        for index, path in enumerate(self.iter_matches(base, pattern)):
+            if index < offset:
+                continue
+            if len(page) == limit:
+                return page, True
+            page.append(path)
+        return page, False
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "cached_directories": len(self._listings),
+                "listing_hits": self._hits,
+                "directory_scans": self._scans,
+                "ignored_dirs": sorted(self.ignored_dirs),
+            }
+
+
+file_index = FileIndex()
@@ -0,0 +1,107 @@
+import codecs
+import re
+from html.parser import HTMLParser
+from typing import List, Optional
+
+# Elements whose content is never readable text
+SKIPPED_TAGS = {"script", "style", "noscript", "template", "svg", "canvas", "iframe", "object"}
+
+
+class HTMLTextExtractor(HTMLParser):
+    """Incremental HTML-to-text tokenizer that stops collecting at ``max_chars``.
+
+    Text is whitespace-collapsed as it arrives and character references are
+    decoded, so ``text()`` matches what the old full-document regex passes
+    produced without ever holding the whole page.
+    """
+
+    def __init__(self, max_chars: int):
+        super().__init__(convert_charrefs=True)
+        self.max_chars = max_chars
+        self._parts: List[str] = []
+        self._chars = 0
+        self._skip_depth = 0
+        self._space = False
+
+    @property
+    def done(self) -> bool:
+        return self._chars >= self.max_chars
+
+    def handle_starttag(self, tag: str, attrs):
+        # Tags separate words, as the regex replacement with " " did
+        self._space = True
+        if tag in SKIPPED_TAGS:
+            self._skip_depth += 1
+
+    def handle_endtag(self, tag: str):
+        self._space = True
+        if tag in SKIPPED_TAGS and self._skip_depth:
+            self._skip_depth -= 1
+
+    def handle_startendtag(self, tag: str, attrs):
+        # Self-closing tags (<svg/>, <br/>) never open a skipped section
+        self._space = True
+
+    def handle_data(self, data: str):
+        if self._skip_depth or self.done:
+            return
+        # Text may arrive split across feeds, so whitespace at the edges is kept as a flag
+        words = " ".join(data.split())
+        if not words:
+            self._space = self._space or bool(data)
+            return
+        if self._parts and (self._space or data[0].isspace()):
+            words = " " + words
+        self._parts.append(words)
+        self._chars += len(words)
+        self._space = data[-1].isspace()
+
+    def text(self) -> str:
+        return "".join(self._parts)[:self.max_chars].rstrip()
+
+
+def charset(content_type: str) -> Optional[str]:
+    """Charset declared in a Content-Type header, if any.
+
+    Pages without one are decoded as UTF-8 (``requests`` would assume
+    ISO-8859-1 for text/*, which is rarely right for HTML).
+    """
+    match = re.search(r"charset=[\"']?([\w.:-]+)", content_type, flags=re.IGNORECASE)
+    return match.group(1) if match else None
+
+
+def is_text(content_type: str) -> bool:
+    content_type = content_type.lower()
+    return not content_type or any(kind in content_type for kind in ("text/", "html", "xml", "json"))
+
+
+class StreamingTextReader:
+    """Feed a response body chunk by chunk; ``feed`` returns True once reading should stop.
+
+    Reading stops when ``max_chars`` of text are collected or ``max_bytes``
+    have been read.
+    """
+
+    def __init__(self, encoding: Optional[str], max_chars: int, max_bytes: int):
+        try:
+            self._decoder = codecs.getincrementaldecoder(encoding or "utf-8")(errors="replace")
+        except LookupError:
+            self._decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        self._parser = HTMLTextExtractor(max_chars)
+        self.max_bytes = max_bytes
+        self.bytes_read = 0
+        self.truncated = False
+
+    def feed(self, chunk: bytes) -> bool:
+        self.bytes_read += len(chunk)
+        self._parser.feed(self._decoder.decode(chunk))
+        if self._parser.done or self.bytes_read >= self.max_bytes:
+            self.truncated = True
+        return self.truncated
+
+    def text(self) -> str:
+        if not self.truncated:
+            self._parser.feed(self._decoder.decode(b"", final=True))
+        self._parser.close()
+        return self._parser.text()
+
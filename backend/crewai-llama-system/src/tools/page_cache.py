@@ -0,0 +1,145 @@
+import logging
+import os
+import sqlite3
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+from src.tools.sqlite_cache import DATA_DIR, SQLiteCache
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class CachedPage:
+    text: str
+    etag: Optional[str]
+    last_modified: Optional[str]
+    fresh: bool
+
+    def validators(self) -> Dict[str, str]:
+        """Conditional request headers for revalidating this page."""
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class PageCache(SQLiteCache):
+    """On-disk cache of extracted page text for ``fetch_web_page``, keyed by URL.
+
+    A page is served without a request for ``ttl_seconds``. After that it is
+    revalidated with a conditional GET using its ETag / Last-Modified; a
+    ``304 Not Modified`` renews it without downloading or re-extracting the
+    page. The stored text is bounded by ``max_bytes``; least recently used
+    pages are evicted first.
+    """
+
+    schema = (
+        "CREATE TABLE IF NOT EXISTS pages ("
+        "url TEXT PRIMARY KEY, text TEXT, etag TEXT, last_modified TEXT, "
+        "size INTEGER, fresh_until REAL, last_used REAL)",
+        "CREATE INDEX IF NOT EXISTS pages_last_used ON pages (last_used)",
+    )
+
+    def __init__(self):
+        super().__init__(os.getenv("PAGE_CACHE_PATH", str(DATA_DIR / "page_cache.sqlite3")))
+        self.enabled = os.getenv("PAGE_CACHE_ENABLED", "true").lower() == "true"
+        self.ttl_seconds = float(os.getenv("PAGE_CACHE_TTL_SECONDS", "3600"))
+        self.max_bytes = int(os.getenv("PAGE_CACHE_MAX_BYTES", str(100 * 1024 * 1024)))
+        self.evict_every = int(os.getenv("PAGE_CACHE_EVICT_EVERY", "100"))
+        self._hits = 0
+        self._revalidated = 0
+        self._misses = 0
+        self._writes = 0
+
+    def get(self, url: str) -> Optional[CachedPage]:
+        if not self.enabled:
+            return None
+        now = time.time()
+        try:
+            connection = self._connection()
+            row = connection.execute(
+                "SELECT text, etag, last_modified, fresh_until FROM pages WHERE url = ?", (url,)
+            ).fetchone()
+            if row is not None:
+                connection.execute("UPDATE pages SET last_used = ? WHERE url = ?", (now, url))
+                connection.commit()
+        except sqlite3.Error as e:
+            self._errors += 1
+            logger.warning(f"Page cache read failed | Error: {str(e)}")
+            return None
+        if row is None:
+            self._misses += 1
+            return None
+        page = CachedPage(text=row[0], etag=row[1], last_modified=row[2], fresh=row[3] > now)
+        if page.fresh:
+            self._hits += 1
+        return page
+
+    def put(self, url: str, text: str, etag: Optional[str], last_modified: Optional[str]):
+        if not self.enabled:
+            return
+        now = time.time()
+        try:
+            connection = self._connection()
+            connection.execute(
+                "INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (url, text, etag, last_modified, len(text.encode("utf-8")), now + self.ttl_seconds, now),
+            )
+            connection.commit()
+        except sqlite3.Error as e:
+            self._errors += 1
+            logger.warning(f"Page cache write failed | Error: {str(e)}")
+            return
+        self._writes += 1
+        if self._writes % self.evict_every == 0:
+            self.evict()
+
+    def renew(self, url: str):
+        """Mark a revalidated page (``304``) fresh for another ``ttl_seconds``."""
+        self._revalidated += 1
+        try:
+            connection = self._connection()
+            connection.execute("UPDATE pages SET fresh_until = ? WHERE url = ?", (time.time() + self.ttl_seconds, url))
+            connection.commit()
+        except sqlite3.Error as e:
+            self._errors += 1
+            logger.warning(f"Page cache write failed | Error: {str(e)}")
+
+    def evict(self):
+        """Drop least recently used pages until the stored text fits ``max_bytes``."""
+        try:
+            connection = self._connection()
+            total = connection.execute("SELECT COALESCE(SUM(size), 0) FROM pages").fetchone()[0]
+            if total <= self.max_bytes:
+                return
+            # Keep the most recently used pages whose sizes add up to max_bytes
+            connection.execute(
+                "DELETE FROM pages WHERE url IN ("
+                "SELECT url FROM (SELECT url, SUM(size) OVER (ORDER BY last_used DESC) AS kept FROM pages) "
+                "WHERE kept > ?)",
+                (self.max_bytes,),
+            )
+            connection.commit()
+            logger.info(f"Page cache evicted | Size before: {total} bytes | Limit: {self.max_bytes} bytes")
+        except sqlite3.Error as e:
+            self._errors += 1
+            logger.warning(f"Page cache eviction failed | Error: {str(e)}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "ttl_seconds": self.ttl_seconds,
+            "max_bytes": self.max_bytes,
+            "hits": self._hits,
+            "revalidated": self._revalidated,
+            "misses": self._misses,
+            "writes": self._writes,
+            "errors": self._errors,
+        }
+
+
+page_cache = PageCache()
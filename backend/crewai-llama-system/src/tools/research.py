@@ -0,0 +1,175 @@
+import asyncio
+import logging
+import os
+import re
+import threading
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit, urlunsplit
+
+from config.http_client import async_http_client
+from src.runtime import checkpoint, run_in_thread
+from src.tools.custom_tools import (
+    CachedTavilySearchTool,
+    CustomTools,
+    PerplexitySearchTool,
+    WebPageFetchTool,
+    summarize_tavily,
+)
+
+logger = logging.getLogger(__name__)
+
+_URL_RE = re.compile(r"https?://[^\s)\]>\"']+")
+
+# Angles researched for every property topic; mirrors the insights task checklist
+RESEARCH_ANGLES = [
+    "{topic} home value and price history",
+    "{topic} recent comparable sales",
+    "{topic} neighborhood housing market trends",
+    "{topic} schools amenities and local economy",
+    "{topic} rental yield and investment outlook",
+]
+
+
+def normalize_url(url: str) -> str:
+    parts = urlsplit(url.rstrip(".,;"))
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path.rstrip("/") or "/", parts.query, ""))
+
+
+class ParallelResearcher:
+    """Fan out a topic's searches and page fetches concurrently, before the agent runs.
+
+    Every research angle is searched on each configured engine at once; the
+    top ``top_k_pages`` distinct result URLs are then fetched concurrently, at
+    most ``per_host_limit`` at a time per host (across all jobs in the
+    process). The results are de-duplicated and returned as one evidence block
+    for the insights task. Calls use the tools' async implementations on one
+    event loop, at most ``max_workers`` in flight, so a gather costs one thread
+    rather than a pool; the tool call cache and the job's cancellation token
+    apply as they do to agent tool calls.
+    """
+
+    def __init__(self):
+        self.enabled = os.getenv("PARALLEL_RESEARCH_ENABLED", "true").lower() == "true"
+        self.max_workers = int(os.getenv("PARALLEL_RESEARCH_MAX_WORKERS", "8"))
+        self.top_k_pages = int(os.getenv("PARALLEL_RESEARCH_TOP_K_PAGES", "5"))
+        self.per_host_limit = int(os.getenv("PARALLEL_RESEARCH_PER_HOST_LIMIT", "2"))
+        self.search_chars = int(os.getenv("PARALLEL_RESEARCH_SEARCH_CHARS", "2500"))
+        self.page_chars = int(os.getenv("PARALLEL_RESEARCH_PAGE_CHARS", "2000"))
+        self._host_slots: Dict[str, threading.BoundedSemaphore] = {}
+        self._lock = threading.Lock()
+
+    @asynccontextmanager
+    async def _host_slot(self, url: str) -> AsyncIterator[None]:
+        host = urlsplit(url).netloc.lower()
+        with self._lock:
+            slot = self._host_slots.get(host)
+            if slot is None:
+                slot = self._host_slots[host] = threading.BoundedSemaphore(self.per_host_limit)
+        # Slots are shared with gathers running on other jobs' loops, so poll
+        while not slot.acquire(blocking=False):
+            checkpoint()
+            await asyncio.sleep(0.05)
+        try:
+            yield
+        finally:
+            slot.release()
+
+    async def _fetch(self, tool: WebPageFetchTool, url: str) -> str:
+        async with self._host_slot(url):
+            return (await tool.afetch_text(url))[:self.page_chars]
+
+    @staticmethod
+    async def _tavily(tool: CachedTavilySearchTool, query: str) -> Tuple[str, List[str]]:
+        # The Tavily client blocks, so its call runs on the executor
+        return summarize_tavily(await run_in_thread(tool.search, query))
+
+    @staticmethod
+    async def _perplexity(tool: PerplexitySearchTool, query: str) -> Tuple[str, List[str]]:
+        # Only configured when PERPLEXITY_API_KEY is set
+        text = await tool.asearch(query, os.environ["PERPLEXITY_API_KEY"])
+        return text, _URL_RE.findall(text)
+
+    def gather(self, topic: str) -> str:
+        """Evidence for ``topic`` (empty when disabled or no web tools are configured).
+
+        Runs its own event loop; called from the crew's worker thread.
+        """
+        if not self.enabled:
+            return ""
+        return asyncio.run(self._gather(topic))
+
+    async def _gather(self, topic: str) -> str:
+        try:
+            return await self._research(topic)
+        finally:
+            # The loop ends with this gather; so do its pooled connections
+            await async_http_client.aclose()
+
+    async def _research(self, topic: str) -> str:
+        tools = CustomTools.get_web_tools()
+        engines: List[Tuple[str, Callable[..., Awaitable[Tuple[str, List[str]]]], Any]] = []
+        fetcher: Optional[WebPageFetchTool] = None
+        for tool in tools:
+            if isinstance(tool, PerplexitySearchTool):
+                engines.append(("perplexity", self._perplexity, tool))
+            elif isinstance(tool, CachedTavilySearchTool):
+                engines.append(("tavily", self._tavily, tool))
+            elif isinstance(tool, WebPageFetchTool):
+                fetcher = tool
+        if not engines:
+            return ""
+
+        start_time = time.perf_counter()
+        limit = asyncio.Semaphore(self.max_workers)
+
+        async def bounded(fn: Callable[..., Awaitable[Any]], *args: Any) -> Any:
+            async with limit:
+                checkpoint()
+                return await fn(*args)
+
+        # With-files topics carry the document context after the first line
+        subject = topic.strip().split("\n", 1)[0][:200]
+        queries = [angle.format(topic=subject) for angle in RESEARCH_ANGLES]
+        searches = [(query, engine, search, tool) for query in queries for engine, search, tool in engines]
+        results = await asyncio.gather(
+            *(bounded(search, tool, query) for query, engine, search, tool in searches), return_exceptions=True
+        )
+
+        sections: List[str] = []
+        seen_text = set()
+        urls: Dict[str, str] = {}
+        for (query, engine, _, _), result in zip(searches, results):
+            if isinstance(result, BaseException):
+                logger.warning(f"Research search failed | Engine: {engine} | Query: {query} | Error: {str(result)}")
+                continue
+            text, found = result
+            key = " ".join(text.split())
+            if key and key not in seen_text:
+                seen_text.add(key)
+                sections.append(f"### Search ({engine}): {query}\n{text[:self.search_chars]}")
+            for url in found:
+                urls.setdefault(normalize_url(url), url)
+
+        pages: List[str] = []
+        if fetcher is not None:
+            pages = list(urls.values())[:self.top_k_pages]
+        fetched = await asyncio.gather(*(bounded(self._fetch, fetcher, url) for url in pages), return_exceptions=True)
+        for url, text in zip(pages, fetched):
+            if isinstance(text, BaseException):
+                logger.warning(f"Research fetch failed | URL: {url} | Error: {str(text)}")
+                continue
+            key = " ".join(text.split())
+            if key and key not in seen_text:
+                seen_text.add(key)
+                sections.append(f"### Page: {url}\n{text}")
+
+        logger.info(
+            f"Parallel research finished | Searches: {len(searches)} | Pages: {len(pages)} | "
+            f"Sections: {len(sections)} | Duration: {time.perf_counter() - start_time:.2f}s"
+        )
+        return "\n\n".join(sections)
+
+
+parallel_researcher = ParallelResearcher()
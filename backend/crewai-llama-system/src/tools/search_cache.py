@@ -0,0 +1,133 @@
+import hashlib
+import logging
+import os
+import sqlite3
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from src.tools.sqlite_cache import DATA_DIR, SQLiteCache
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_search_query(query: str) -> str:
+    return " ".join(query.lower().split())
+
+
+class SearchCache(SQLiteCache):
+    """On-disk cache of web search results keyed by engine, model and normalized query.
+
+    Backed by a SQLite file (WAL mode) so results survive restarts and are shared
+    by every process on the host, including process-pool children and standalone
+    workers. Entries expire after ``ttl_seconds`` (market data moves daily, so
+    the default is six hours); the table is pruned to ``max_entries`` every
+    ``prune_every`` writes.
+    """
+
+    schema = (
+        "CREATE TABLE IF NOT EXISTS search_results ("
+        "key TEXT PRIMARY KEY, engine TEXT, model TEXT, query TEXT, "
+        "result TEXT, created_at REAL, expires_at REAL)",
+        "CREATE INDEX IF NOT EXISTS search_results_expires ON search_results (expires_at)",
+    )
+
+    def __init__(self):
+        super().__init__(os.getenv("SEARCH_CACHE_PATH", str(DATA_DIR / "search_cache.sqlite3")))
+        self.enabled = os.getenv("SEARCH_CACHE_ENABLED", "true").lower() == "true"
+        self.ttl_seconds = float(os.getenv("SEARCH_CACHE_TTL_SECONDS", "21600"))
+        self.max_entries = int(os.getenv("SEARCH_CACHE_MAX_ENTRIES", "50000"))
+        self.prune_every = int(os.getenv("SEARCH_CACHE_PRUNE_EVERY", "500"))
+        self._hits = 0
+        self._misses = 0
+        self._writes = 0
+
+    @staticmethod
+    def _key(engine: str, model: str, query: str) -> str:
+        return hashlib.sha256(f"{engine}\0{model}\0{query}".encode("utf-8")).hexdigest()
+
+    def get(self, engine: str, model: str, query: str) -> Optional[str]:
+        key = self._key(engine, model, normalize_search_query(query))
+        try:
+            row = self._connection().execute(
+                "SELECT result FROM search_results WHERE key = ? AND expires_at > ?", (key, time.time())
+            ).fetchone()
+        except sqlite3.Error as e:
+            self._errors += 1
+            logger.warning(f"Search cache read failed | Error: {str(e)}")
+            return None
+        if row is None:
+            self._misses += 1
+            return None
+        self._hits += 1
+        return row[0]
+
+    def put(self, engine: str, model: str, query: str, result: str):
+        normalized = normalize_search_query(query)
+        now = time.time()
+        try:
+            connection = self._connection()
+            connection.execute(
+                "INSERT OR REPLACE INTO search_results VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (self._key(engine, model, normalized), engine, model, normalized, result, now, now + self.ttl_seconds),
+            )
+            connection.commit()
+        except sqlite3.Error as e:
+            self._errors += 1
+            logger.warning(f"Search cache write failed | Error: {str(e)}")
+            return
+        self._writes += 1
+        if self._writes % self.prune_every == 0:
+            self.prune()
+
+    def prune(self):
+        """Drop expired entries, then the oldest ones beyond ``max_entries``."""
+        try:
+            connection = self._connection()
+            connection.execute("DELETE FROM search_results WHERE expires_at <= ?", (time.time(),))
+            connection.execute(
+                "DELETE FROM search_results WHERE key IN ("
+                "SELECT key FROM search_results ORDER BY created_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+            connection.commit()
+        except sqlite3.Error as e:
+            self._errors += 1
+            logger.warning(f"Search cache prune failed | Error: {str(e)}")
+
+    def cached(self, engine: str, model: str, query: str, search: Callable[[], str]) -> str:
+        """Return the stored result for the query, or run ``search`` and store it.
+
+        Only results returned normally are stored; ``search`` raises on failure.
+        """
+        if not self.enabled:
+            return search()
+        result = self.get(engine, model, query)
+        if result is None:
+            result = search()
+            self.put(engine, model, query, result)
+        return result
+
+    async def acached(self, engine: str, model: str, query: str, search: Callable[[], Awaitable[str]]) -> str:
+        """Async ``cached``; lookups are local SQLite reads and stay inline."""
+        if not self.enabled:
+            return await search()
+        result = self.get(engine, model, query)
+        if result is None:
+            result = await search()
+            self.put(engine, model, query, result)
+        return result
+
+    def get_stats(self) -> Dict[str, Any]:
+        lookups = self._hits + self._misses
+        return {
+            "enabled": self.enabled,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self._hits,
+            "misses": self._misses,
+            "hit_rate": round(self._hits / lookups, 3) if lookups else 0.0,
+            "writes": self._writes,
+            "errors": self._errors,
+        }
+
+
+search_cache = SearchCache()
@@ -0,0 +1,327 @@
+import asyncio
+import bisect
+import logging
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Tuple
+
+from src.runtime import JobCancelled, cancellation_scope, checkpoint, current_token
+from src.tools.call_cache import ToolRequestFailed
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds (seconds) of the latency histogram buckets; the last is +Inf
+LATENCY_BUCKETS = [0.25, 0.5, 1.0, 2.0, 4.0, 8.0, 15.0, 30.0]
+
+
+class ProviderUnavailable(ToolRequestFailed):
+    """The provider's circuit is open; the call was not attempted."""
+
+
+class LatencyHistogram:
+    """Bucketed latencies of successful calls, plus a window of recent ones for quantiles."""
+
+    def __init__(self, window: int):
+        self._counts = [0] * (len(LATENCY_BUCKETS) + 1)
+        self._sum = 0.0
+        self._recent: Deque[float] = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float):
+        with self._lock:
+            self._counts[bisect.bisect_left(LATENCY_BUCKETS, seconds)] += 1
+            self._sum += seconds
+            self._recent.append(seconds)
+
+    def quantile(self, q: float) -> Optional[float]:
+        with self._lock:
+            recent = sorted(self._recent)
+        if not recent:
+            return None
+        return recent[min(len(recent) - 1, int(q * len(recent)))]
+
+    @property
+    def samples(self) -> int:
+        return len(self._recent)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            counts = list(self._counts)
+            total = self._sum
+        buckets: Dict[str, int] = {}
+        cumulative = 0
+        for bound, count in zip(LATENCY_BUCKETS + [float("inf")], counts):
+            cumulative += count
+            buckets["+Inf" if bound == float("inf") else str(bound)] = cumulative
+        quantiles = {}
+        for q in (0.5, 0.9, 0.99):
+            value = self.quantile(q)
+            quantiles[f"p{int(q * 100)}"] = round(value, 3) if value is not None else None
+        return {"count": cumulative, "sum": round(total, 3), "buckets": buckets, **quantiles}
+
+
+class CircuitBreaker:
+    """Consecutive-failure breaker: open for ``cooldown_seconds``, then one trial call."""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name: str, failure_threshold: int, cooldown_seconds: float):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.cooldown_seconds = cooldown_seconds
+        self.state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial = False
+        self._times_opened = 0
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and time.monotonic() - self._opened_at >= self.cooldown_seconds:
+                self.state = self.HALF_OPEN
+                self._trial = False
+            if self.state == self.HALF_OPEN and not self._trial:
+                self._trial = True
+                return True
+            return False
+
+    def is_open(self) -> bool:
+        with self._lock:
+            return self.state == self.OPEN and time.monotonic() - self._opened_at < self.cooldown_seconds
+
+    def record_success(self):
+        with self._lock:
+            if self.state != self.CLOSED:
+                logger.info(f"Circuit closed | Provider: {self.name}")
+            self.state = self.CLOSED
+            self._failures = 0
+
+    def abandon(self):
+        """The call ended without telling us anything; let another one be the trial."""
+        with self._lock:
+            if self.state == self.HALF_OPEN:
+                self._trial = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self.state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    self._times_opened += 1
+                    logger.warning(
+                        f"Circuit opened | Provider: {self.name} | Failures: {self._failures} | "
+                        f"Cooldown: {self.cooldown_seconds}s"
+                    )
+                self.state = self.OPEN
+                self._opened_at = time.monotonic()
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"state": self.state, "consecutive_failures": self._failures, "times_opened": self._times_opened}
+
+
+class SearchProviders:
+    """Circuit breakers, latency histograms and hedging for the web search providers.
+
+    Every upstream search call goes through ``call``/``acall``: a provider
+    whose last ``SEARCH_BREAKER_FAILURES`` calls failed is skipped for
+    ``SEARCH_BREAKER_COOLDOWN_SECONDS`` (``ProviderUnavailable``), then tried
+    again once. ``hedge``/``ahedge`` run a primary search and, if it has not
+    answered within its recent p90 latency, start the secondary and return
+    whichever succeeds first; a failed or open primary fails over at once.
+    """
+
+    def __init__(self):
+        self.failure_threshold = int(os.getenv("SEARCH_BREAKER_FAILURES", "5"))
+        self.cooldown_seconds = float(os.getenv("SEARCH_BREAKER_COOLDOWN_SECONDS", "30"))
+        self.hedging_enabled = os.getenv("SEARCH_HEDGING_ENABLED", "true").lower() == "true"
+        self.hedge_quantile = float(os.getenv("SEARCH_HEDGE_QUANTILE", "0.9"))
+        self.hedge_min_samples = int(os.getenv("SEARCH_HEDGE_MIN_SAMPLES", "20"))
+        self.hedge_default_delay = float(os.getenv("SEARCH_HEDGE_DEFAULT_DELAY_SECONDS", "8"))
+        self.hedge_min_delay = float(os.getenv("SEARCH_HEDGE_MIN_DELAY_SECONDS", "1"))
+        self.latency_window = int(os.getenv("SEARCH_LATENCY_WINDOW", "200"))
+        self._pool = ThreadPoolExecutor(
+            max_workers=int(os.getenv("SEARCH_HEDGE_MAX_WORKERS", "16")), thread_name_prefix="search-hedge"
+        )
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._latency: Dict[str, LatencyHistogram] = {}
+        self._counters: Dict[str, Dict[str, int]] = {}
+        self._lock = threading.Lock()
+        self._hedges = 0
+        self._hedge_wins = 0
+        self._failovers = 0
+
+    def _provider(self, name: str) -> Tuple[CircuitBreaker, LatencyHistogram, Dict[str, int]]:
+        with self._lock:
+            if name not in self._breakers:
+                self._breakers[name] = CircuitBreaker(name, self.failure_threshold, self.cooldown_seconds)
+                self._latency[name] = LatencyHistogram(self.latency_window)
+                self._counters[name] = {"calls": 0, "failures": 0, "rejected": 0}
+            return self._breakers[name], self._latency[name], self._counters[name]
+
+    def _admit(self, name: str):
+        breaker, _, counters = self._provider(name)
+        if not breaker.allow():
+            counters["rejected"] += 1
+            raise ProviderUnavailable(f"{name} is temporarily unavailable (circuit open)")
+        counters["calls"] += 1
+
+    def _record(self, name: str, started: float, error: Optional[BaseException]):
+        breaker, latency, counters = self._provider(name)
+        if error is None:
+            latency.observe(time.perf_counter() - started)
+            breaker.record_success()
+        elif isinstance(error, (JobCancelled, asyncio.CancelledError)):
+            # A cancelled job says nothing about the provider
+            breaker.abandon()
+        else:
+            counters["failures"] += 1
+            breaker.record_failure()
+
+    def call(self, name: str, fn: Callable[[], Any]) -> Any:
+        """Run one upstream call to provider ``name`` behind its breaker."""
+        self._admit(name)
+        started = time.perf_counter()
+        try:
+            result = fn()
+        except BaseException as e:
+            self._record(name, started, e)
+            raise
+        self._record(name, started, None)
+        return result
+
+    async def acall(self, name: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        self._admit(name)
+        started = time.perf_counter()
+        try:
+            result = await fn()
+        except BaseException as e:
+            self._record(name, started, e)
+            raise
+        self._record(name, started, None)
+        return result
+
+    def hedge_delay(self, name: str) -> float:
+        _, latency, _ = self._provider(name)
+        if latency.samples < self.hedge_min_samples:
+            return self.hedge_default_delay
+        return max(self.hedge_min_delay, latency.quantile(self.hedge_quantile))
+
+    def _should_fail_over(self, primary: str) -> bool:
+        breaker, _, _ = self._provider(primary)
+        return breaker.is_open()
+
+    def _submit(self, fn: Callable[[], Any]) -> Future:
+        # Hedge threads run under the calling job's cancellation token
+        token = current_token()
+
+        def run():
+            with cancellation_scope(token):
+                checkpoint()
+                return fn()
+
+        return self._pool.submit(run)
+
+    def hedge(
+        self, primary: str, run_primary: Callable[[], Any], secondary: str, run_secondary: Callable[[], Any]
+    ) -> Tuple[str, Any]:
+        """``(provider, result)`` of the first of the two searches to succeed."""
+        if not self.hedging_enabled:
+            return primary, run_primary()
+        if self._should_fail_over(primary):
+            self._failovers += 1
+            return secondary, run_secondary()
+
+        first = self._submit(run_primary)
+        done, _ = wait([first], timeout=self.hedge_delay(primary))
+        if done and first.exception() is None:
+            return primary, first.result()
+        if done:
+            self._failovers += 1
+            logger.warning(f"Search failed over | From: {primary} | To: {secondary} | Error: {str(first.exception())}")
+            return secondary, run_secondary()
+
+        self._hedges += 1
+        futures: Dict[Future, str] = {first: primary, self._submit(run_secondary): secondary}
+        pending = set(futures)
+        errors: List[BaseException] = []
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    if futures[future] == secondary:
+                        self._hedge_wins += 1
+                    return futures[future], future.result()
+                errors.append(future.exception())
+        raise errors[0]
+
+    async def ahedge(
+        self,
+        primary: str,
+        run_primary: Callable[[], Awaitable[Any]],
+        secondary: str,
+        run_secondary: Callable[[], Awaitable[Any]],
+    ) -> Tuple[str, Any]:
+        """Async ``hedge``; the losing search is left to finish and fill the caches."""
+        if not self.hedging_enabled:
+            return primary, await run_primary()
+        if self._should_fail_over(primary):
+            self._failovers += 1
+            return secondary, await run_secondary()
+
+        first = asyncio.ensure_future(run_primary())
+        done, _ = await asyncio.wait({first}, timeout=self.hedge_delay(primary))
+        if done and first.exception() is None:
+            return primary, first.result()
+        if done:
+            self._failovers += 1
+            logger.warning(f"Search failed over | From: {primary} | To: {secondary} | Error: {str(first.exception())}")
+            return secondary, await run_secondary()
+
+        self._hedges += 1
+        tasks: Dict[asyncio.Future, str] = {first: primary, asyncio.ensure_future(run_secondary()): secondary}
+        for task in tasks:
+            # The loser's error is not interesting once the other one answered
+            task.add_done_callback(lambda t: t.cancelled() or t.exception())
+        pending = set(tasks)
+        errors: List[BaseException] = []
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    if tasks[task] == secondary:
+                        self._hedge_wins += 1
+                    return tasks[task], task.result()
+                errors.append(task.exception())
+        raise errors[0]
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            names = list(self._breakers)
+        providers = {}
+        for name in names:
+            breaker, latency, counters = self._provider(name)
+            providers[name] = {
+                **breaker.get_stats(),
+                **counters,
+                "hedge_delay_seconds": round(self.hedge_delay(name), 3),
+                "latency_seconds": latency.snapshot(),
+            }
+        return {
+            "hedging_enabled": self.hedging_enabled,
+            "hedges": self._hedges,
+            "hedge_wins": self._hedge_wins,
+            "failovers": self._failovers,
+            "providers": providers,
+        }
+
+
+search_providers = SearchProviders()
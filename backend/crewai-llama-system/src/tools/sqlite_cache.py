@@ -0,0 +1,40 @@
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Tuple
+
+DATA_DIR = Path(__file__).resolve().parents[2] / "data"
+
+
+class SQLiteCache:
+    """Base for on-disk tool caches shared by every process on the host.
+
+    Subclasses list their ``CREATE`` statements in ``schema``. The file is opened
+    in WAL mode so readers do not block the writer; each thread keeps its own
+    connection, as sqlite3 connections may not be shared between threads.
+    """
+
+    schema: Tuple[str, ...] = ()
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._initialized = False
+        self._errors = 0
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+            connection = sqlite3.connect(self.path, timeout=5)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            with self._lock:
+                if not self._initialized:
+                    for statement in self.schema:
+                        connection.execute(statement)
+                    connection.commit()
+                    self._initialized = True
+            self._local.connection = connection
+        return connection
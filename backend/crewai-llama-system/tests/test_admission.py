@@ -0,0 +1,117 @@
+import pytest
+
+from config.models import JobType
+from src.jobs.admission import AdmissionController, AdmissionRejected
+
+
+def make_controller(monkeypatch, rate="60", burst="3", **env):
+    monkeypatch.setenv("RATE_LIMIT_PER_MINUTE", rate)
+    monkeypatch.setenv("RATE_LIMIT_BURST", burst)
+    for name, value in env.items():
+        monkeypatch.setenv(name, value)
+    return AdmissionController()
+
+
+def test_burst_is_admitted_then_rejected(monkeypatch, clock):
+    controller = make_controller(monkeypatch)
+    for _ in range(3):
+        controller.check_rate("client")
+    with pytest.raises(AdmissionRejected) as rejected:
+        controller.check_rate("client")
+    assert rejected.value.retry_after == pytest.approx(1.0)
+
+
+def test_bucket_refills_at_the_configured_rate(monkeypatch, clock):
+    controller = make_controller(monkeypatch)
+    for _ in range(3):
+        controller.check_rate("client")
+    clock.now += 0.5
+    with pytest.raises(AdmissionRejected) as rejected:
+        controller.check_rate("client")
+    assert rejected.value.retry_after == pytest.approx(0.5)
+    clock.now += 0.5
+    controller.check_rate("client")
+
+
+def test_refill_is_capped_at_burst(monkeypatch, clock):
+    controller = make_controller(monkeypatch)
+    controller.check_rate("client")
+    clock.now += 3600
+    for _ in range(3):
+        controller.check_rate("client")
+    with pytest.raises(AdmissionRejected):
+        controller.check_rate("client")
+
+
+def test_clients_have_separate_buckets(monkeypatch, clock):
+    controller = make_controller(monkeypatch, burst="1")
+    controller.check_rate("a")
+    controller.check_rate("b")
+    with pytest.raises(AdmissionRejected):
+        controller.check_rate("a")
+
+
+def test_least_recently_used_clients_are_evicted(monkeypatch, clock):
+    controller = make_controller(monkeypatch, burst="1", RATE_LIMIT_MAX_CLIENTS="2")
+    controller.check_rate("a")
+    controller.check_rate("b")
+    controller.check_rate("c")
+    # "a" was forgotten, so it starts from a full bucket again
+    controller.check_rate("a")
+    assert controller.get_stats()["tracked_clients"] == 2
+
+
+def test_zero_rate_disables_limiting(monkeypatch, clock):
+    controller = make_controller(monkeypatch, rate="0", burst="1")
+    for _ in range(10):
+        controller.check_rate("client")
+
+
+def test_batch_lane_backs_off_first(monkeypatch):
+    controller = make_controller(monkeypatch, ADMISSION_MAX_QUEUE_DEPTH="10", ADMISSION_BATCH_QUEUE_SHARE="0.5")
+    controller.check_depth(JobType.RESPONSE, 9)
+    with pytest.raises(AdmissionRejected):
+        controller.check_depth(JobType.REPORT_GENERATION, 5)
+
+
+def test_batch_cost_above_burst_overdraws_a_full_bucket(monkeypatch, clock):
+    controller = make_controller(monkeypatch)
+    controller.check_rate("client", cost=9)
+    # Six tokens in debt, plus one for the next request, at one token per second
+    with pytest.raises(AdmissionRejected) as rejected:
+        controller.check_rate("client")
+    assert rejected.value.retry_after == pytest.approx(7.0)
+    clock.now += 7
+    controller.check_rate("client")
+
+
+def test_batch_cost_needs_a_full_bucket(monkeypatch, clock):
+    controller = make_controller(monkeypatch)
+    controller.check_rate("client")
+    with pytest.raises(AdmissionRejected):
+        controller.check_rate("client", cost=9)
+
+
+def test_pending_batch_jobs_are_capped_per_client_and_in_total(monkeypatch):
+    controller = make_controller(
+        monkeypatch, ADMISSION_MAX_PENDING_BATCH_JOBS="100", ADMISSION_MAX_PENDING_BATCH_JOBS_PER_CLIENT="40"
+    )
+    controller.check_batch(10, pending=80, pending_for_client=30)
+    with pytest.raises(AdmissionRejected, match="this client"):
+        controller.check_batch(11, pending=80, pending_for_client=30)
+    with pytest.raises(AdmissionRejected, match="Batch queue is full"):
+        controller.check_batch(10, pending=95, pending_for_client=0)
+
+
+def test_only_configured_api_keys_identify_a_client(monkeypatch, clock):
+    controller = make_controller(monkeypatch, burst="1", ADMISSION_API_KEYS="alpha, beta")
+
+    known = controller.client_key("alpha", "10.0.0.1")
+    assert known.startswith("key:") and "alpha" not in known
+    assert controller.client_key("beta", "10.0.0.1") != known
+    assert controller.client_key(None, "10.0.0.1") == "ip:10.0.0.1"
+
+    # Made-up keys share the sender's address bucket instead of getting a fresh one each
+    controller.check_rate(controller.client_key("made-up-1", "10.0.0.2"))
+    with pytest.raises(AdmissionRejected):
+        controller.check_rate(controller.client_key("made-up-2", "10.0.0.2"))
@@ -0,0 +1,38 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from src.jobs.batch import ResearchBatches
+
+
+class FakeQueue:
+    def __init__(self, failing_topic):
+        self.failing_topic = failing_topic
+        self.enqueued = []
+        self.cancelled = []
+
+    async def enqueue(self, job_type, topic, payload, fingerprint=None, batch_id=None, subscriber=None, client_key=None):
+        await asyncio.sleep(0)
+        if topic == self.failing_topic:
+            raise ConnectionError("Mongo unavailable")
+        job_id = f"job_{topic}"
+        self.enqueued.append((job_id, subscriber))
+        return SimpleNamespace(job_id=job_id)
+
+    async def cancel(self, job_id, subscriber=None):
+        self.cancelled.append((job_id, subscriber))
+        return 0
+
+
+def test_failed_submission_withdraws_from_the_jobs_it_enqueued():
+    queue = FakeQueue(failing_topic="b")
+    batches = ResearchBatches(queue)
+    items = [{"topic": topic} for topic in ("a", "b", "c", "a")]
+
+    with pytest.raises(ConnectionError):
+        asyncio.run(batches.submit(items, client_key="ip:10.0.0.1"))
+
+    subscriber = queue.enqueued[0][1]
+    assert subscriber.startswith("batch:")
+    assert queue.cancelled == [("job_a", subscriber), ("job_c", subscriber)]
@@ -0,0 +1,125 @@
+import asyncio
+import threading
+
+import pytest
+import requests
+
+from src.runtime import JobCancelled, cancellation_scope
+from src.runtime.cancellation import CancellationToken
+from src.tools.call_cache import ToolCallCache, ToolRequestFailed
+
+
+def make_cache(monkeypatch):
+    monkeypatch.setenv("TOOL_CALL_CACHE_ENABLED", "true")
+    return ToolCallCache()
+
+
+def run_with_follower(cache, leader_fn, follower_fn, token=None):
+    """Start a leader call, join it with a follower, then let the leader finish."""
+    started, release = threading.Event(), threading.Event()
+    outcome = {}
+
+    def leader():
+        def fn():
+            started.set()
+            release.wait(5)
+            return leader_fn()
+
+        with cancellation_scope(token):
+            try:
+                outcome["leader"] = cache.call("tool", "key", fn)
+            except BaseException as e:
+                outcome["leader"] = e
+
+    def follower():
+        try:
+            outcome["follower"] = cache.call("tool", "key", follower_fn)
+        except BaseException as e:
+            outcome["follower"] = e
+
+    leader_thread = threading.Thread(target=leader)
+    leader_thread.start()
+    started.wait(5)
+    follower_thread = threading.Thread(target=follower)
+    follower_thread.start()
+    while cache.get_stats()["shared_in_flight"] == 0:
+        pass
+    release.set()
+    leader_thread.join(5)
+    follower_thread.join(5)
+    return outcome
+
+
+def test_follower_shares_the_leader_result(monkeypatch):
+    cache = make_cache(monkeypatch)
+    outcome = run_with_follower(cache, lambda: "result", lambda: "follower ran")
+    assert outcome == {"leader": "result", "follower": "result"}
+    assert cache.call("tool", "key", lambda: "again") == "result"
+
+
+def test_follower_shares_an_upstream_failure(monkeypatch):
+    cache = make_cache(monkeypatch)
+
+    def fail():
+        raise ToolRequestFailed("upstream returned 500")
+
+    outcome = run_with_follower(cache, fail, lambda: "follower ran")
+    assert isinstance(outcome["follower"], ToolRequestFailed)
+
+
+def test_follower_retries_when_the_leader_job_is_cancelled(monkeypatch):
+    cache = make_cache(monkeypatch)
+
+    def cancelled():
+        raise JobCancelled("cancelled")
+
+    outcome = run_with_follower(cache, cancelled, lambda: "follower ran")
+    assert isinstance(outcome["leader"], JobCancelled)
+    assert outcome["follower"] == "follower ran"
+    assert cache.get_stats()["follower_retries"] == 1
+
+
+def test_follower_retries_a_timeout_at_the_leader_deadline(monkeypatch):
+    cache = make_cache(monkeypatch)
+    token = CancellationToken("job", timeout_seconds=0.5)
+
+    def timed_out():
+        raise requests.exceptions.ReadTimeout("read timed out")
+
+    outcome = run_with_follower(cache, timed_out, lambda: "follower ran", token=token)
+    assert outcome["follower"] == "follower ran"
+
+
+def test_follower_shares_a_timeout_without_a_leader_budget(monkeypatch):
+    cache = make_cache(monkeypatch)
+
+    def timed_out():
+        raise requests.exceptions.ReadTimeout("read timed out")
+
+    outcome = run_with_follower(cache, timed_out, lambda: "follower ran")
+    assert isinstance(outcome["follower"], requests.exceptions.ReadTimeout)
+
+
+def test_async_follower_retries_when_the_leader_job_is_cancelled(monkeypatch):
+    cache = make_cache(monkeypatch)
+
+    async def main():
+        release = asyncio.Event()
+
+        async def leader_fn():
+            await release.wait()
+            raise JobCancelled("cancelled")
+
+        async def follower_fn():
+            return "follower ran"
+
+        leader = asyncio.ensure_future(cache.acall("tool", "key", leader_fn))
+        await asyncio.sleep(0)
+        follower = asyncio.ensure_future(cache.acall("tool", "key", follower_fn))
+        await asyncio.sleep(0)
+        release.set()
+        with pytest.raises(JobCancelled):
+            await leader
+        return await follower
+
+    assert asyncio.run(main()) == "follower ran"
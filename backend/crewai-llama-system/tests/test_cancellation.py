@@ -0,0 +1,37 @@
+from crewai.events import LLMCallCompletedEvent, crewai_event_bus
+from crewai.events.types.llm_events import LLMCallType
+
+from src.runtime import CancellationRegistry, cancellation_scope
+from src.runtime.cancellation import TOKEN_BUDGET, CancellationToken, llm_call_tokens
+
+
+def completed(usage=None, messages="", response=""):
+    return LLMCallCompletedEvent(
+        call_id="call-1", call_type=LLMCallType.LLM_CALL, messages=messages, response=response, usage=usage
+    )
+
+
+def test_llm_call_tokens_prefers_reported_usage():
+    assert llm_call_tokens(completed({"prompt_tokens": 900, "completion_tokens": 100, "total_tokens": 1000})) == 1000
+    assert llm_call_tokens(completed({"input_tokens": 30, "output_tokens": 12})) == 42
+    assert llm_call_tokens(completed(None, messages="x" * 400, response="y" * 40)) == 101 + 11
+
+
+def test_completed_llm_calls_are_charged_to_the_running_job():
+    registry = CancellationRegistry()
+    token = CancellationToken("job-1", max_tokens=1500)
+
+    with crewai_event_bus.scoped_handlers():
+        registry.start()
+        registry.start()
+        assert registry.charges_llm_usage
+        with cancellation_scope(token):
+            for _ in range(2):
+                future = crewai_event_bus.emit(None, completed({"prompt_tokens": 700, "completion_tokens": 100}))
+                future.result(timeout=5)
+        # Outside any job's scope: charged to nobody
+        crewai_event_bus.emit(None, completed({"total_tokens": 5000})).result(timeout=5)
+
+    assert token.tokens_used == 1600
+    assert token.reason == TOKEN_BUDGET
+    assert registry.get_stats()["llm_tokens_charged"] == 1600
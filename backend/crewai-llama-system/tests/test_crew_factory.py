@@ -0,0 +1,74 @@
+import pytest
+from crewai import Agent, Crew, Task
+from crewai.llms.base_llm import BaseLLM
+
+from src.crews.factory import CrewFactory
+from src.runtime import JobCancelled, cancellation_scope
+from src.runtime.cancellation import CANCELLED, CancellationToken
+
+
+class StubLLM(BaseLLM):
+    calls: int = 0
+
+    def call(self, messages, *args, **kwargs):
+        self.calls += 1
+        return "Thought: I know the answer\nFinal Answer: ok"
+
+    def supports_function_calling(self):
+        return False
+
+
+# Newer CrewAI defaults to an executor that skips the step callback on a plain-text
+# final answer; pin the crew executor the locked version uses
+AGENT_OPTIONS = {"executor_class": "CrewAgentExecutor"} if "executor_class" in Agent.model_fields else {}
+
+
+def build_crew():
+    agent = Agent(role="Tester", goal="Answer", backstory="Answers questions", llm=StubLLM(model="stub"), **AGENT_OPTIONS)
+    task = Task(description="Answer {question}", expected_output="A word", agent=agent)
+    return Crew(agents=[agent], tasks=[task])
+
+
+def make_factory(monkeypatch):
+    monkeypatch.setenv("CREW_REUSE_ENABLED", "true")
+    return CrewFactory()
+
+
+def test_reused_crew_only_calls_the_current_jobs_task_callback(monkeypatch):
+    factory = make_factory(monkeypatch)
+    seen = []
+
+    crew = factory.get("stub", build_crew, lambda output: seen.append("first"))
+    crew.kickoff(inputs={"question": "one"})
+    reused = factory.get("stub", build_crew, lambda output: seen.append("second"))
+    reused.kickoff(inputs={"question": "two"})
+
+    assert reused is crew
+    assert seen == ["first", "second"]
+    assert factory.get_stats()["reuses"] == 1
+
+
+def test_reuse_clears_the_agents_retry_count(monkeypatch):
+    factory = make_factory(monkeypatch)
+    crew = factory.get("stub", build_crew)
+    crew.agents[0]._times_executed = crew.agents[0].max_retry_limit
+
+    factory.get("stub", build_crew)
+
+    assert crew.agents[0]._times_executed == 0
+
+
+def test_cancelled_job_is_not_retried_and_the_next_job_is(monkeypatch):
+    factory = make_factory(monkeypatch)
+    crew = factory.get("stub", build_crew)
+    agent = crew.agents[0]
+    retry_limit = agent.max_retry_limit
+    token = CancellationToken("job-1")
+    token.cancel(CANCELLED)
+
+    with cancellation_scope(token), pytest.raises(JobCancelled):
+        crew.kickoff(inputs={"question": "one"})
+
+    assert agent.llm.calls == 1
+    factory.get("stub", build_crew)
+    assert agent.max_retry_limit == retry_limit
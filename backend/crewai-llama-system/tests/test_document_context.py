@@ -0,0 +1,72 @@
+from src.jobs.document_context import DocumentContextBuilder, estimate_tokens
+
+
+def make_builder(monkeypatch, budget=6000, max_files=20):
+    monkeypatch.setenv("DOC_CONTEXT_TOKEN_BUDGET", str(budget))
+    monkeypatch.setenv("DOC_CONTEXT_MAX_FILES", str(max_files))
+    monkeypatch.setenv("DOC_CONTEXT_CHUNK_CHARS", "1600")
+    monkeypatch.setenv("DOC_CONTEXT_MAX_METRICS_CHARS", "1000")
+    return DocumentContextBuilder()
+
+
+def make_file(index, text_chars=4000, metrics_chars=1500):
+    return {
+        "fileName": f"listing_{index:02d}.csv",
+        "content": f"Property {index} in Austin. " + "rent price square feet " * (text_chars // 23),
+        "metrics": {"summary": f"file {index} " + "x" * metrics_chars},
+    }
+
+
+def test_small_input_is_included_whole(monkeypatch):
+    builder = make_builder(monkeypatch)
+    context = builder.build([make_file(1, text_chars=200, metrics_chars=50)], "rent in Austin", "job")
+    assert "--- File: listing_01.csv ---" in context
+    assert "Metrics:" in context
+    assert "Content: Property 1 in Austin." in context
+
+
+def test_forty_files_with_metrics_stay_within_budget(monkeypatch):
+    builder = make_builder(monkeypatch)
+    context = builder.build([make_file(i) for i in range(40)], "rent in Austin", "job")
+    assert estimate_tokens(context) <= 6000
+    assert context.count("--- File:") == 20
+    assert "(20 more file(s) not shown)" in context
+
+
+def test_files_are_capped_by_relevance(monkeypatch):
+    builder = make_builder(monkeypatch, max_files=2)
+    files = [make_file(i, text_chars=100, metrics_chars=10) for i in range(5)]
+    files[3]["content"] = "Zoning variance for the warehouse district"
+    context = builder.build(files, "zoning variance warehouse", "job")
+    assert "listing_03.csv" in context
+    assert context.count("--- File:") == 2
+
+
+def test_metrics_are_dropped_before_chunks(monkeypatch):
+    builder = make_builder(monkeypatch, budget=1200)
+    files = [make_file(i, text_chars=800, metrics_chars=1500) for i in range(3)]
+    context = builder.build(files, "rent in Austin", "job")
+    assert estimate_tokens(context) <= 1200
+    assert context.count("Metrics:") < 3
+    assert context.count("Content:") == 3
+
+
+def test_chunks_are_trimmed_once_all_metrics_are_gone(monkeypatch):
+    builder = make_builder(monkeypatch, budget=600)
+    files = [make_file(i, text_chars=800, metrics_chars=1500) for i in range(3)]
+    context = builder.build(files, "rent in Austin", "job")
+    assert estimate_tokens(context) <= 600
+    assert "Metrics:" not in context
+    assert 0 < context.count("Content:") < 3
+
+
+def test_least_relevant_file_loses_its_metrics_first(monkeypatch):
+    files = [make_file(i, text_chars=100, metrics_chars=800) for i in range(2)]
+    files[1]["content"] = "Flood zone report for the riverside parcel"
+    builder = make_builder(monkeypatch, budget=10000)
+    full = builder.build(files, "flood zone riverside", "job")
+    builder = make_builder(monkeypatch, budget=estimate_tokens(full) - 10)
+    context = builder.build(files, "flood zone riverside", "job")
+    assert "Metrics: {\"summary\":\"file 1 " in context
+    assert "Metrics: {\"summary\":\"file 0 " not in context
+    assert context.count("Content:") == 2
@@ -0,0 +1,117 @@
+import asyncio
+
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+from config.models import DocumentChunk, FileUpload
+from src.jobs.document_index import DocumentIndex
+
+
+def _matches(doc, query):
+    for key, condition in query.items():
+        value = doc.get(key)
+        if isinstance(condition, dict):
+            if "$gte" in condition and not (value is not None and value >= condition["$gte"]):
+                return False
+        elif value != condition:
+            return False
+    return True
+
+
+class FakeCollection:
+    """An async collection with unique keys; yields between lookups and writes like a real server round trip."""
+
+    def __init__(self, unique):
+        self.unique = unique
+        self.docs = []
+
+    def _conflict(self, doc):
+        key = tuple(doc.get(field) for field in self.unique)
+        return any(tuple(other.get(field) for field in self.unique) == key for other in self.docs)
+
+    def _insert(self, doc):
+        if self._conflict(doc):
+            raise DuplicateKeyError("duplicate key")
+        self.docs.append(dict(doc))
+
+    async def find_one(self, query):
+        await asyncio.sleep(0)
+        return next((dict(doc) for doc in self.docs if _matches(doc, query)), None)
+
+    async def find_one_and_update(self, query, update, upsert=False, return_document=ReturnDocument.BEFORE):
+        found = await self.find_one(query)
+        await asyncio.sleep(0)
+        if found is None and upsert:
+            self._insert({**query, **update.get("$setOnInsert", {})})
+        return found
+
+    async def update_one(self, query, update):
+        await asyncio.sleep(0)
+        for doc in self.docs:
+            if _matches(doc, query):
+                doc.update(update["$set"])
+                return
+
+    async def bulk_write(self, requests, ordered=True):
+        for request in requests:
+            await asyncio.sleep(0)
+            existing = next((doc for doc in self.docs if _matches(doc, request._filter)), None)
+            if existing is not None:
+                existing.clear()
+                existing.update(request._doc)
+            elif request._upsert:
+                self._insert(request._doc)
+
+    async def delete_many(self, query):
+        await asyncio.sleep(0)
+        self.docs = [doc for doc in self.docs if not _matches(doc, query)]
+
+
+def use_collections(monkeypatch):
+    uploads = FakeCollection(unique=("content_hash",))
+    chunks = FakeCollection(unique=("file_id", "position"))
+    for model, collection in ((FileUpload, uploads), (DocumentChunk, chunks)):
+        getter = classmethod(lambda cls, collection=collection: collection)
+        monkeypatch.setattr(model, "get_motor_collection", getter, raising=False)
+        monkeypatch.setattr(model, "get_pymongo_collection", getter, raising=False)
+    return uploads, chunks
+
+
+FILE = {
+    "fileName": "lease.txt",
+    "fileType": "text/plain",
+    "content": "Tenant pays rent on the first of each month. " * 200,
+    "extractedText": None,
+    "metrics": None,
+    "clauses": None,
+}
+
+
+def test_concurrent_registrations_store_one_upload_and_one_set_of_chunks(monkeypatch):
+    uploads, chunks = use_collections(monkeypatch)
+    index = DocumentIndex()
+
+    async def register_twice():
+        return await asyncio.gather(index.register(dict(FILE)), index.register(dict(FILE)))
+
+    first, second = asyncio.run(register_twice())
+
+    assert first.file_id == second.file_id
+    assert len(uploads.docs) == 1
+    assert uploads.docs[0]["processing_status"] == "processed"
+    positions = sorted(doc["position"] for doc in chunks.docs)
+    assert positions == list(range(first.chunk_count))
+    assert first.chunk_count > 1
+
+
+def test_registering_a_stored_document_again_returns_it_without_rewriting_chunks(monkeypatch):
+    uploads, chunks = use_collections(monkeypatch)
+    index = DocumentIndex()
+    first = asyncio.run(index.register(dict(FILE)))
+    chunks.docs.clear()
+
+    again = asyncio.run(index.register(dict(FILE)))
+
+    assert again.file_id == first.file_id
+    assert again.processing_status == "processed"
+    assert chunks.docs == []
@@ -0,0 +1,103 @@
+import os
+import pathlib
+
+import pytest
+
+from src.tools.file_index import FileIndex, glob_regex, split_pattern
+
+TREE = [
+    "README.md",
+    "setup.py",
+    "src/app.py",
+    "src/util.py",
+    "src/pkg/__init__.py",
+    "src/pkg/core.py",
+    "src/pkg/data/table.csv",
+    "docs/guide.md",
+    "docs/api/index.md",
+    "notes.txt",
+]
+
+PATTERNS = [
+    "*",
+    "*.py",
+    "**/*.py",
+    "src/*.py",
+    "src/**/*.py",
+    "src/**",
+    "**",
+    "*/**",
+    "docs/**/*.md",
+    "src/p?g/*.py",
+    "[ds]*/*",
+    "*/*/*",
+]
+
+
+@pytest.fixture
+def tree(tmp_path):
+    for relative in TREE:
+        path = tmp_path / relative
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(relative)
+    return tmp_path
+
+
+@pytest.fixture
+def index(monkeypatch):
+    monkeypatch.setenv("FILE_INDEX_ENABLED", "true")
+    return FileIndex()
+
+
+def pathlib_glob(base: pathlib.Path, pattern: str):
+    matches = list(base.glob(pattern))
+    if pattern.rstrip("/").split("/")[-1] != "**":
+        matches = [path for path in matches if path.is_file()]
+    return sorted(str(path) for path in matches)
+
+
+@pytest.mark.parametrize("pattern", PATTERNS)
+def test_matches_pathlib(tree, index, pattern):
+    assert sorted(index.iter_matches(str(tree), pattern)) == pathlib_glob(tree, pattern)
+
+
+def test_trailing_double_star_yields_directories(tree, index):
+    matches = list(index.iter_matches(str(tree), "src/**"))
+    assert matches == [str(tree / "src"), str(tree / "src/pkg"), str(tree / "src/pkg/data")]
+
+
+def test_matches_come_in_sorted_depth_first_order(tree, index):
+    matches = [os.path.relpath(path, tree) for path in index.iter_matches(str(tree), "**/*.py")]
+    assert matches == ["setup.py", "src/app.py", "src/util.py", "src/pkg/__init__.py", "src/pkg/core.py"]
+
+
+def test_pages_are_stable(tree, index):
+    first, more = index.glob(str(tree), "**/*", 0, 4)
+    second, more_after = index.glob(str(tree), "**/*", 4, 100)
+    assert more and not more_after
+    assert first + second == list(index.iter_matches(str(tree), "**/*"))
+    assert len(first + second) == len(TREE)
+
+
+def test_ignored_directories_are_pruned(tree, index):
+    (tree / "node_modules/lib").mkdir(parents=True)
+    (tree / "node_modules/lib/index.py").write_text("")
+    assert not any("node_modules" in path for path in index.iter_matches(str(tree), "**/*.py"))
+
+
+def test_scan_limit_stops_the_walk(tree, index):
+    index.max_scanned = 3
+    assert list(index.iter_matches(str(tree), "**/*")) == []
+
+
+def test_split_pattern_walks_only_as_deep_as_needed():
+    assert split_pattern("src/pkg/*.py") == (["src", "pkg"], 0)
+    assert split_pattern("*/*.md") == ([], 1)
+    assert split_pattern("src/**/*.py") == (["src"], None)
+
+
+def test_glob_regex_does_not_cross_directories():
+    assert glob_regex("*.py").match("app.py")
+    assert not glob_regex("*.py").match("src/app.py")
+    assert glob_regex("**/*.py").match("src/pkg/app.py")
+    assert glob_regex("[!a]*.md").match("README.md")
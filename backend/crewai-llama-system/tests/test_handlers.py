@@ -0,0 +1,75 @@
+import asyncio
+import importlib
+import json
+from types import SimpleNamespace
+
+import pytest
+
+# src.jobs re-exports names that shadow its submodules
+handlers = importlib.import_module("src.jobs.handlers")
+
+CHAT_ANSWER = json.dumps({"response_type": "chat", "summary": "Hi!"})
+CREW_ANSWER = json.dumps({"response_type": "analytics", "summary": "Prices rose."})
+
+
+class FakeClassifier:
+    def __init__(self, confident=None, guess=None):
+        self.confident = confident
+        self.guess = guess
+        self.observed = []
+
+    def classify(self, query):
+        return self.confident
+
+    def best_guess(self, query):
+        return self.guess
+
+    def observe(self, query, response_type):
+        self.observed.append(response_type)
+
+
+@pytest.fixture
+def crew_calls(monkeypatch):
+    calls = []
+
+    async def run_crew(crew_name, method_name, *args, job_id=None):
+        calls.append(method_name)
+        if method_name == "classify_response_type":
+            return "chat"
+        return CHAT_ANSWER if method_name == "run_chat_response" else CREW_ANSWER
+
+    monkeypatch.setattr(handlers.crew_executor, "run_crew", run_crew)
+    monkeypatch.setattr(handlers.job_store, "update", lambda job_id, fields: None)
+    monkeypatch.setattr(handlers.job_events, "publish", lambda job_id, event_type, data: None)
+    monkeypatch.setattr(handlers, "RESPONSE_PIPELINE", True)
+    return calls
+
+
+def route(monkeypatch, classifier, allow_chat=True):
+    monkeypatch.setattr(handlers, "intent_classifier", classifier)
+    job = SimpleNamespace(job_id="job-1", input_parameters={"user_query": "hello there"})
+    return asyncio.run(handlers._route_response(job, "hello there", allow_chat=allow_chat))
+
+
+def test_confident_classifier_skips_the_classify_call(monkeypatch, crew_calls):
+    route(monkeypatch, FakeClassifier(confident="chat"))
+    assert crew_calls == ["run_chat_response"]
+
+
+def test_unsure_non_chat_guess_goes_straight_to_the_router_crew(monkeypatch, crew_calls):
+    classifier = FakeClassifier(guess="analytics")
+    route(monkeypatch, classifier)
+    assert crew_calls == ["run_response_workflow"]
+    assert classifier.observed == ["analytics"]
+
+
+def test_unsure_chat_guess_is_confirmed_by_one_llm_call(monkeypatch, crew_calls):
+    classifier = FakeClassifier(guess="chat")
+    route(monkeypatch, classifier)
+    assert crew_calls == ["classify_response_type", "run_chat_response"]
+    assert classifier.observed == ["chat"]
+
+
+def test_jobs_that_cannot_answer_chat_skip_the_classify_call(monkeypatch, crew_calls):
+    route(monkeypatch, FakeClassifier(guess="chat"), allow_chat=False)
+    assert crew_calls == ["run_response_workflow"]
@@ -0,0 +1,72 @@
+import asyncio
+
+import httpx
+import pytest
+
+from config.http_client import AsyncHTTPClient, HTTPClient
+
+
+@pytest.fixture
+def settings(monkeypatch):
+    monkeypatch.setenv("HTTP_RETRIES", "2")
+    monkeypatch.setenv("HTTP_RETRY_BACKOFF_SECONDS", "0")
+    monkeypatch.setenv("HTTP_RETRY_JITTER_SECONDS", "0")
+    return HTTPClient()
+
+
+def send(settings, method, handler):
+    """Send one request through an AsyncHTTPClient backed by ``handler``; returns (result, attempts)."""
+    attempts = []
+
+    def counted(request):
+        attempts.append(request)
+        return handler(request)
+
+    client = AsyncHTTPClient(settings)
+    client.client = lambda: httpx.AsyncClient(transport=httpx.MockTransport(counted))
+
+    async def main():
+        try:
+            return await client.request(method, "https://example.test/")
+        except httpx.HTTPError as e:
+            return e
+
+    return asyncio.run(main()), len(attempts)
+
+
+def test_sync_retry_policy_skips_reads_and_post(settings):
+    retry = settings._retry()
+    assert retry.read == 0
+    assert retry.connect == 2
+    assert "POST" not in retry.allowed_methods
+    assert "GET" in retry.allowed_methods
+
+
+def test_unavailable_get_is_retried(settings):
+    response, attempts = send(settings, "GET", lambda request: httpx.Response(503))
+    assert response.status_code == 503
+    assert attempts == 3
+
+
+def test_unavailable_post_is_not_retried(settings):
+    response, attempts = send(settings, "POST", lambda request: httpx.Response(503))
+    assert response.status_code == 503
+    assert attempts == 1
+
+
+def test_connect_errors_are_retried_for_any_method(settings):
+    def refuse(request):
+        raise httpx.ConnectError("connection refused", request=request)
+
+    error, attempts = send(settings, "POST", refuse)
+    assert isinstance(error, httpx.ConnectError)
+    assert attempts == 3
+
+
+def test_read_errors_are_not_retried(settings):
+    def reset(request):
+        raise httpx.ReadError("connection reset", request=request)
+
+    error, attempts = send(settings, "GET", reset)
+    assert isinstance(error, httpx.ReadError)
+    assert attempts == 1
@@ -0,0 +1,88 @@
+import pytest
+
+from src.crews.response_routing_crew import ROUTER_FEW_SHOTS
+from src.jobs.intent import SEED_EXAMPLES, IntentClassifier
+
+HELD_OUT = [
+    ("Show me the price trend for condos in Miami over five years", "analytics"),
+    ("What will home values do next year in Denver?", "analytics"),
+    ("Compare average rents in Chicago and Boston", "analytics"),
+    ("Find me a two bedroom apartment in Seattle under $2,000", "document"),
+    ("List houses for sale with a big backyard", "document"),
+    ("Find office space for lease in Plano", "document"),
+    ("Hello, who am I talking to?", "chat"),
+    ("thanks!", "chat"),
+    ("thank you, bye", "chat"),
+]
+
+
+@pytest.fixture(scope="module")
+def trained():
+    classifier = IntentClassifier()
+    classifier.train()
+    return classifier
+
+
+def make_classifier(monkeypatch, threshold):
+    monkeypatch.setenv("INTENT_CLASSIFIER_ENABLED", "true")
+    monkeypatch.setenv("INTENT_CONFIDENCE_THRESHOLD", threshold)
+    return IntentClassifier()
+
+
+def test_seed_set_is_balanced_and_includes_few_shots(trained):
+    labels = [label for _, label in SEED_EXAMPLES]
+    assert min(labels.count(label) for label in ("analytics", "document", "chat")) >= 15
+    assert trained.get_stats()["seed_examples"] == len(ROUTER_FEW_SHOTS) + len(SEED_EXAMPLES)
+
+
+def test_seeds_classify_held_out_queries(trained):
+    predictions = [trained.predict(query) for query, _ in HELD_OUT]
+    correct = sum(label == expected for (label, _), (_, expected) in zip(predictions, HELD_OUT))
+    assert correct >= len(HELD_OUT) - 1
+
+
+def test_confident_predictions_on_held_out_queries_are_right(trained):
+    confident = 0
+    for query, expected in HELD_OUT:
+        label, confidence = trained.predict(query)
+        if confidence >= 0.8:
+            confident += 1
+            assert label == expected, query
+    # The fast path fires for some queries before any traffic is labelled
+    assert confident >= 3
+
+
+def test_below_threshold_defers_to_the_router(monkeypatch):
+    classifier = make_classifier(monkeypatch, "0.999")
+    assert classifier.classify("Compare average rents in Chicago and Boston") is None
+    assert classifier.get_stats()["router_fallbacks"] == 1
+
+
+def test_above_threshold_is_answered_locally(monkeypatch):
+    classifier = make_classifier(monkeypatch, "0.5")
+    assert classifier.classify("Find me a two bedroom apartment in Seattle under $2,000") == "document"
+    assert classifier.get_stats()["predictions"]["document"] == 1
+
+
+def test_disabled_classifier_never_answers(monkeypatch):
+    monkeypatch.setenv("INTENT_CLASSIFIER_ENABLED", "false")
+    assert IntentClassifier().classify("Hello!") is None
+
+
+def test_observed_traffic_is_trimmed_but_seeds_are_kept(monkeypatch):
+    classifier = make_classifier(monkeypatch, "0.8")
+    seeds = classifier.get_stats()["seed_examples"]
+    classifier.max_examples = seeds + 2
+    classifier.retrain_every = 1000
+    for query in ("first", "second", "third"):
+        classifier.observe(query, "chat")
+    assert classifier.get_stats()["training_examples"] == seeds + 2
+
+
+def test_best_guess_is_given_even_when_unsure(monkeypatch):
+    classifier = make_classifier(monkeypatch, "0.999")
+    assert classifier.classify("thanks!") is None
+    assert classifier.best_guess("thanks!") == "chat"
+
+    monkeypatch.setenv("INTENT_CLASSIFIER_ENABLED", "false")
+    assert IntentClassifier().best_guess("thanks!") is None
@@ -0,0 +1,20 @@
+from crewai.events import LLMStreamChunkEvent, crewai_event_bus
+
+from src.jobs.events import JobEventBus, job_context
+
+
+def test_stream_listener_publishes_chunks_for_the_current_job():
+    published = []
+    bus = JobEventBus()
+    bus.publish = lambda job_id, event_type, data: published.append((job_id, event_type, data))
+
+    with crewai_event_bus.scoped_handlers():
+        bus._register_stream_listener()
+        bus._register_stream_listener()
+        assert bus._stream_listener is not None
+
+        with job_context("job-1"):
+            crewai_event_bus.emit(None, LLMStreamChunkEvent(chunk="Hel", call_id="call-1"))
+        crewai_event_bus.emit(None, LLMStreamChunkEvent(chunk="lo", call_id="call-1"))
+
+    assert published == [("job-1", "token", {"chunk": "Hel"})]
@@ -0,0 +1,39 @@
+import asyncio
+from datetime import datetime
+
+from config.models import AnalysisJob
+from src.jobs.store import JobStateStore
+
+
+class FakeCollection:
+    def __init__(self, doc):
+        self.doc = doc
+
+    async def find_one(self, query, projection):
+        assert query == {"job_id": self.doc["job_id"]}
+        return {field: value for field, value in self.doc.items() if field in projection}
+
+
+def test_cached_and_loaded_snapshots_carry_the_same_fields(monkeypatch):
+    doc = {
+        "job_id": "job-1",
+        "job_type": "response",
+        "status": "running",
+        "created_at": datetime(2026, 1, 1),
+        "attempts": 1,
+        "routed_by": "classifier",
+        "input_parameters": {"user_query": "hi"},
+    }
+    monkeypatch.setattr(AnalysisJob, "get_motor_collection", classmethod(lambda cls: FakeCollection(doc)), raising=False)
+    store = JobStateStore()
+
+    assert asyncio.run(store.get("job-1"))["routed_by"] == "classifier"
+    store.update("job-1", {"routed_by": "llm"})
+    cached = asyncio.run(store.get("job-1"))
+
+    assert cached["routed_by"] == "llm"
+    assert "input_parameters" not in cached
+
+    fresh = JobStateStore()
+    doc["routed_by"] = "llm"
+    assert asyncio.run(fresh.get("job-1")) == cached
@@ -0,0 +1,164 @@
+import asyncio
+import math
+
+import pytest
+from bson import ObjectId
+
+from src.listings import InvalidCursor, ListingPager
+
+
+def _equal(value, expected):
+    if isinstance(value, float) and isinstance(expected, float) and math.isnan(value) and math.isnan(expected):
+        return True
+    return value == expected
+
+
+def _comparable(value, arg):
+    # Range operators only match values of the same type bracket; NaN is below every number
+    if isinstance(arg, ObjectId):
+        return isinstance(value, ObjectId)
+    return isinstance(value, (int, float)) and not (isinstance(value, float) and math.isnan(value))
+
+
+def matches(doc, query):
+    """The subset of Mongo query semantics the pager relies on."""
+    for key, condition in query.items():
+        if key == "$and":
+            if not all(matches(doc, part) for part in condition):
+                return False
+        elif key == "$or":
+            if not any(matches(doc, part) for part in condition):
+                return False
+        elif isinstance(condition, dict):
+            value = doc.get(key)
+            for op, arg in condition.items():
+                if op == "$ne" and _equal(value, arg):
+                    return False
+                if op == "$gt" and not (_comparable(value, arg) and value > arg):
+                    return False
+                if op == "$gte" and not (_comparable(value, arg) and value >= arg):
+                    return False
+        elif not _equal(doc.get(key), condition):
+            return False
+    return True
+
+
+def sort_key(doc):
+    # Mongo order: null/missing, then NaN, then numbers; ties broken by _id
+    price = doc.get("listing_price")
+    if price is None:
+        rank = (0, 0)
+    elif isinstance(price, float) and math.isnan(price):
+        rank = (1, 0)
+    else:
+        rank = (2, price)
+    return rank, doc["_id"]
+
+
+class FakeCursor:
+    def __init__(self, docs):
+        self.docs = docs
+
+    def sort(self, spec):
+        assert spec == [("listing_price", 1), ("_id", 1)]
+        self.docs = sorted(self.docs, key=sort_key)
+        return self
+
+    def limit(self, count):
+        self.docs = self.docs[:count]
+        return self
+
+    async def to_list(self, length):
+        return self.docs[:length]
+
+
+class FakeCollection:
+    def __init__(self, docs):
+        self.docs = docs
+
+    def find(self, query):
+        return FakeCursor([doc for doc in self.docs if matches(doc, query)])
+
+
+@pytest.fixture
+def listings():
+    prices = [None, None, float("nan"), 1500, 1500, 1500, 900, 2500, float("nan"), 1500, 0, 2500]
+    docs = []
+    for index, price in enumerate(prices):
+        doc = {"_id": ObjectId(), "city": "Austin" if index % 3 else "Dallas"}
+        if price is not None or index == 0:
+            doc["listing_price"] = price
+        docs.append(doc)
+    return docs
+
+
+def walk(pager, collection, filters, limit):
+    async def main():
+        pages, cursor = [], None
+        while True:
+            docs, cursor = await pager.page(collection, filters, limit, cursor)
+            pages.append(docs)
+            if cursor is None:
+                return pages
+
+    return asyncio.run(main())
+
+
+@pytest.mark.parametrize("limit", [1, 2, 3, 5, 12, 50])
+def test_pages_cover_every_listing_once_in_order(listings, limit):
+    pages = walk(ListingPager(), FakeCollection(listings), {}, limit)
+    seen = [doc["_id"] for page in pages for doc in page]
+    assert seen == [doc["_id"] for doc in sorted(listings, key=sort_key)]
+    assert all(len(page) <= limit for page in pages)
+
+
+def test_pages_respect_filters(listings):
+    pages = walk(ListingPager(), FakeCollection(listings), {"city": "Austin"}, 2)
+    seen = [doc["_id"] for page in pages for doc in page]
+    expected = [doc["_id"] for doc in sorted(listings, key=sort_key) if doc["city"] == "Austin"]
+    assert seen == expected
+
+
+def test_ties_on_price_are_broken_by_id():
+    ids = sorted(ObjectId() for _ in range(4))
+    docs = [{"_id": listing_id, "listing_price": 1000} for listing_id in reversed(ids)]
+    pages = walk(ListingPager(), FakeCollection(docs), {}, 1)
+    assert [page[0]["_id"] for page in pages] == ids
+
+
+@pytest.mark.parametrize("price", [1500, 1499.99, 0, None, float("nan")])
+def test_cursor_round_trip(price):
+    listing_id = ObjectId()
+    cursor = ListingPager.encode_cursor({"city": "Austin"}, price, listing_id)
+    decoded_price, decoded_id = ListingPager.decode_cursor({"city": "Austin"}, cursor)
+    assert decoded_id == listing_id
+    if isinstance(price, float) and math.isnan(price):
+        assert math.isnan(decoded_price)
+    else:
+        assert decoded_price == price
+    assert "=" not in cursor
+
+
+def test_cursor_is_bound_to_its_filters():
+    cursor = ListingPager.encode_cursor({"city": "Austin"}, 1500, ObjectId())
+    with pytest.raises(InvalidCursor, match="different filters"):
+        ListingPager.decode_cursor({"city": "Dallas"}, cursor)
+
+
+@pytest.mark.parametrize("cursor", ["not a cursor", "e30", "eyJwIjoiYSIsImkiOiJ4IiwiZiI6IiJ9"])
+def test_malformed_cursors_are_rejected(cursor):
+    with pytest.raises(InvalidCursor):
+        ListingPager.decode_cursor({}, cursor)
+
+
+def test_page_size_is_capped(listings, monkeypatch):
+    monkeypatch.setenv("LISTINGS_MAX_PAGE_SIZE", "4")
+    docs, cursor = asyncio.run(ListingPager().page(FakeCollection(listings), {}, 100, None))
+    assert len(docs) == 4
+    assert cursor is not None
+
+
+def test_page_size_reports_the_limit_page_uses(monkeypatch):
+    monkeypatch.setenv("LISTINGS_MAX_PAGE_SIZE", "4")
+    pager = ListingPager()
+    assert [pager.page_size(limit) for limit in (100, 4, 3, 0, -5)] == [4, 4, 3, 1, 1]
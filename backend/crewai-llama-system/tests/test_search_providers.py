@@ -0,0 +1,118 @@
+import pytest
+
+from src.runtime import JobCancelled
+from src.tools.call_cache import ToolRequestFailed
+from src.tools.search_providers import CircuitBreaker, LatencyHistogram, ProviderUnavailable, SearchProviders
+
+
+def test_breaker_opens_after_consecutive_failures(clock):
+    breaker = CircuitBreaker("perplexity", failure_threshold=3, cooldown_seconds=30)
+    for _ in range(2):
+        assert breaker.allow()
+        breaker.record_failure()
+    assert breaker.state == CircuitBreaker.CLOSED
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert breaker.is_open()
+    assert not breaker.allow()
+
+
+def test_success_resets_the_failure_count(clock):
+    breaker = CircuitBreaker("perplexity", failure_threshold=2, cooldown_seconds=30)
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_cooldown_allows_a_single_trial(clock):
+    breaker = CircuitBreaker("perplexity", failure_threshold=1, cooldown_seconds=30)
+    breaker.record_failure()
+    clock.now += 29
+    assert not breaker.allow()
+    clock.now += 1
+    assert not breaker.is_open()
+    assert breaker.allow()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert not breaker.allow()
+
+
+def test_successful_trial_closes_the_circuit(clock):
+    breaker = CircuitBreaker("perplexity", failure_threshold=1, cooldown_seconds=30)
+    breaker.record_failure()
+    clock.now += 30
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.allow() and breaker.allow()
+
+
+def test_failed_trial_reopens_for_another_cooldown(clock):
+    breaker = CircuitBreaker("perplexity", failure_threshold=3, cooldown_seconds=30)
+    for _ in range(3):
+        breaker.record_failure()
+    clock.now += 30
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    clock.now += 29
+    assert not breaker.allow()
+    assert breaker.get_stats()["times_opened"] == 2
+
+
+def test_abandoned_trial_lets_another_call_be_the_trial(clock):
+    breaker = CircuitBreaker("perplexity", failure_threshold=1, cooldown_seconds=30)
+    breaker.record_failure()
+    clock.now += 30
+    assert breaker.allow()
+    breaker.abandon()
+    assert breaker.allow()
+
+
+def test_providers_reject_calls_while_open(monkeypatch, clock):
+    monkeypatch.setenv("SEARCH_BREAKER_FAILURES", "2")
+    providers = SearchProviders()
+
+    def fail():
+        raise ToolRequestFailed("upstream returned 500")
+
+    for _ in range(2):
+        with pytest.raises(ToolRequestFailed):
+            providers.call("tavily", fail)
+    with pytest.raises(ProviderUnavailable):
+        providers.call("tavily", lambda: "ok")
+    assert providers.get_stats()["providers"]["tavily"]["rejected"] == 1
+
+
+def test_cancelled_jobs_do_not_count_as_failures(monkeypatch, clock):
+    monkeypatch.setenv("SEARCH_BREAKER_FAILURES", "1")
+    providers = SearchProviders()
+
+    def cancelled():
+        raise JobCancelled("cancelled")
+
+    with pytest.raises(JobCancelled):
+        providers.call("tavily", cancelled)
+    assert providers.call("tavily", lambda: "ok") == "ok"
+
+
+def test_latency_quantiles_come_from_the_recent_window():
+    histogram = LatencyHistogram(window=10)
+    for seconds in range(1, 21):
+        histogram.observe(seconds / 10)
+    assert histogram.samples == 10
+    assert histogram.quantile(0.0) == pytest.approx(1.1)
+    assert histogram.quantile(0.9) == pytest.approx(2.0)
+    assert histogram.snapshot()["count"] == 20
+
+
+def test_hedge_delay_uses_the_default_until_enough_samples(monkeypatch):
+    monkeypatch.setenv("SEARCH_HEDGE_MIN_SAMPLES", "5")
+    monkeypatch.setenv("SEARCH_HEDGE_DEFAULT_DELAY_SECONDS", "8")
+    monkeypatch.setenv("SEARCH_HEDGE_MIN_DELAY_SECONDS", "1")
+    providers = SearchProviders()
+    assert providers.hedge_delay("perplexity") == 8
+    _, latency, _ = providers._provider("perplexity")
+    for _ in range(5):
+        latency.observe(3.0)
+    assert providers.hedge_delay("perplexity") == 3.0
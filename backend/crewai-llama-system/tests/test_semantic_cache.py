@@ -0,0 +1,67 @@
+from config.models import JobType
+from src.jobs.semantic_cache import SemanticCache, embed_query, query_entities
+
+# Pairs the embedding alone scores above the old 0.9 threshold
+NEAR_MISSES = [
+    ("What is the average rent in Austin?", "What is the average rent in Houston?"),
+    ("Show me apartments under $1,500", "Show me apartments under $2,500"),
+    ("Find 3 bedroom homes for sale", "Find 4 bedroom homes for sale"),
+]
+
+
+def make_cache(monkeypatch, threshold="0.95"):
+    monkeypatch.setenv("SEMANTIC_CACHE_ENABLED", "true")
+    monkeypatch.setenv("SEMANTIC_CACHE_THRESHOLD", threshold)
+    return SemanticCache()
+
+
+def similarity(a, b):
+    return float(embed_query(a, 512) @ embed_query(b, 512))
+
+
+def test_default_threshold_is_raised(monkeypatch):
+    monkeypatch.delenv("SEMANTIC_CACHE_THRESHOLD", raising=False)
+    assert SemanticCache().threshold == 0.95
+
+
+def test_query_entities_normalizes_numbers():
+    assert query_entities("under $1,500") == query_entities("under 1500") == query_entities("under 1.5k")
+    assert query_entities("three bedroom homes") == query_entities("3 bedroom homes")
+
+
+def test_query_entities_finds_places_regardless_of_case():
+    assert "p:austin" in query_entities("Homes in austin")
+    assert "p:austin" in query_entities("What do homes cost in the Austin area?")
+    assert {"p:dallas", "p:tx"} <= query_entities("Show me apartments near Dallas, TX")
+
+
+def test_first_word_of_a_sentence_is_not_a_place():
+    assert query_entities("Show me homes") == query_entities("show me homes") == frozenset()
+
+
+def test_near_miss_pairs_are_not_reused_even_with_a_low_threshold(monkeypatch):
+    cache = make_cache(monkeypatch, threshold="0.5")
+    for cached, asked in NEAR_MISSES:
+        assert similarity(cached, asked) >= 0.5
+        cache.add(JobType.RESPONSE, cached, f"answer to {cached}")
+        assert cache.get(JobType.RESPONSE, asked) is None
+    assert cache.get_stats()["entity_mismatches"] >= len(NEAR_MISSES)
+
+
+def test_rephrased_query_with_same_entities_is_reused(monkeypatch):
+    cache = make_cache(monkeypatch, threshold="0.9")
+    cache.add(JobType.RESPONSE, "What is the average rent in Austin under $1,500?", "cached answer")
+    assert cache.get(JobType.RESPONSE, "what is average rent in Austin under $1,500") == "cached answer"
+
+
+def test_match_with_same_entities_is_found_behind_a_closer_mismatch(monkeypatch):
+    cache = make_cache(monkeypatch, threshold="0.5")
+    cache.add(JobType.RESPONSE, "average rent for 2 bedroom apartments in Austin", "austin answer")
+    cache.add(JobType.RESPONSE, "average rent for 2 bedroom apartments in Houston", "houston answer")
+    assert cache.get(JobType.RESPONSE, "average rent for 2 bedroom apartments in Houston?") == "houston answer"
+
+
+def test_other_job_types_are_not_cached(monkeypatch):
+    cache = make_cache(monkeypatch)
+    cache.add(JobType.RESEARCH_WITH_FILES, "homes in Austin", "answer")
+    assert cache.get(JobType.RESEARCH_WITH_FILES, "homes in Austin") is None
@@ -0,0 +1,48 @@
+import asyncio
+
+from src.jobs.worker import JobWorker
+from src.runtime.cancellation import CancellationToken
+
+
+class FlakyQueue:
+    def __init__(self, lease_seconds, outcomes):
+        self.lease_seconds = lease_seconds
+        self.outcomes = list(outcomes)
+        self.renewals = 0
+
+    async def renew_lease(self, job_id, worker_id):
+        self.renewals += 1
+        outcome = self.outcomes.pop(0) if self.outcomes else True
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+
+def run_heartbeat(queue, seconds):
+    worker = JobWorker(queue=queue, concurrency=1)
+    token = CancellationToken("job-1")
+
+    async def beat():
+        heartbeat = asyncio.create_task(worker._heartbeat("job-1", token))
+        await asyncio.wait({heartbeat}, timeout=seconds)
+        heartbeat.cancel()
+        return heartbeat
+
+    heartbeat = asyncio.run(beat())
+    return token, heartbeat
+
+
+def test_heartbeat_keeps_renewing_after_a_failed_renewal():
+    queue = FlakyQueue(lease_seconds=3, outcomes=[ConnectionError("primary stepped down"), True])
+    token, heartbeat = run_heartbeat(queue, seconds=2.5)
+    assert queue.renewals == 2
+    assert token.reason is None
+    assert heartbeat.cancelled()
+
+
+def test_heartbeat_stops_the_job_once_its_lease_has_expired():
+    queue = FlakyQueue(lease_seconds=1, outcomes=[ConnectionError("no primary")] * 5)
+    token, heartbeat = run_heartbeat(queue, seconds=3)
+    assert queue.renewals == 1
+    assert token.reason is not None
+    assert heartbeat.done() and not heartbeat.cancelled() and heartbeat.exception() is None
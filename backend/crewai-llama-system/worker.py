@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+
+import argparse
+import asyncio
+import logging
+import signal
+import sys
+from pathlib import Path
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='[WORKER] %(asctime)s | %(levelname)s | %(message)s',
+    datefmt='%Y-%m-%d %H:%M:%S'
+)
+logger = logging.getLogger(__name__)
+
+# Add src directory to path
+sys.path.append(str(Path(__file__).parent / "src"))
+
+from config.database import connect_to_mongo, close_mongo_connection
+from src.jobs import JobWorker, crew_executor, job_events, job_store
+from src.runtime import cancellation
+
+
+async def run_worker(concurrency: int = None):
+    await connect_to_mongo()
+    job_store.start()
+    job_events.start()
+    cancellation.start()
+    worker = JobWorker(concurrency=concurrency)
+
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, worker.stop)
+
+    try:
+        await worker.run()
+    finally:
+        crew_executor.shutdown()
+        await job_store.stop()
+        await close_mongo_connection()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Crew job worker - consumes queued analysis jobs")
+    parser.add_argument("--concurrency", type=int, default=None,
+                        help="Jobs to run at once (defaults to CREW_MAX_WORKERS)")
+    args = parser.parse_args()
+
+    print("Starting CrewAI job worker...")
+    print("Press Ctrl+C to stop (in-flight jobs are allowed to finish)")
+    asyncio.run(run_worker(args.concurrency))
+
+
+if __name__ == "__main__":
+    main()
@@ -31,12 +31,20 @@ export interface ProjectPlanningRequest {
 
 export interface ResearchWithFilesRequest {
   topic: string
-  files: FileContext[]
+  files?: FileContext[]
+  file_ids?: string[]
 }
 
 export interface ProjectPlanningWithFilesRequest {
   project_description: string
-  files: FileContext[]
+  files?: FileContext[]
+  file_ids?: string[]
+}
+
+export interface RegisteredFile {
+  file_id: string
+  fileName: string
+  chunks: number
 }
 
 export interface FileContext {
@@ -50,14 +58,49 @@ export interface FileContext {
 
 export interface JobResponse {
   job_id: string
-  status: 'pending' | 'running' | 'completed' | 'failed'
+  status: 'pending' | 'running' | 'completed' | 'failed' | 'cancelled' | 'timed_out'
   created_at: string
   result: string | null
   error: string | null
+  progress?: string | null
+  response_type?: string | null
+  routed_by?: string | null
+}
+
+export interface JobEvent {
+  event: 'status' | 'progress' | 'task_output' | 'token' | 'route'
+  job_id: string
+  data: any
+  timestamp: string
+}
+
+export interface ResearchBatchResponse {
+  batch_id: string
+  created_at: string
+  total: number
+  jobs: number
 }
 
+export interface ResearchBatchProgress {
+  batch_id: string
+  created_at: string
+  total: number
+  counts: Record<string, number>
+  finished: number
+  done: boolean
+  items: { topic: string; listing_id?: string; job_id: string; status: string; progress: string | null; error: string | null }[]
+}
+
+export class JobFailedError extends Error {}
+
+// Statuses a job ends in without a result
+const STOPPED_STATUSES = ['failed', 'cancelled', 'timed_out']
+
 class CrewAIService {
-  private async makeRequest<T>(endpoint: string, options: RequestInit = {}): Promise<T> {
+  // file_id of each document already stored by POST /files, keyed by the browser File
+  private registeredFileIds = new Map<string, string>()
+
+  private async makeRequest<T>(endpoint: string, options: RequestInit = {}, retryOnBusy = true): Promise<T> {
     const url = `${CREWAI_API_BASE}${endpoint}`
     const method = options.method || 'GET'
     const startTime = performance.now()
@@ -82,6 +125,14 @@ class CrewAIService {
         ...options,
       })
       
+      // Rate limited or queue full: wait as instructed and try once more
+      if (response.status === 429 && retryOnBusy) {
+        const retryAfter = Number(response.headers.get('Retry-After') || '1')
+        log.info(`Server busy, retrying in ${retryAfter}s`, { endpoint })
+        await new Promise(resolve => setTimeout(resolve, retryAfter * 1000))
+        return this.makeRequest<T>(endpoint, options, false)
+      }
+      
       const duration = performance.now() - startTime
       const responseData = await response.json()
       
@@ -116,6 +167,24 @@ class CrewAIService {
     })
   }
 
+  // Research many topics and/or market listings as one batch
+  async startResearchBatch(topics: string[], listingIds: string[] = []): Promise<ResearchBatchResponse> {
+    log.info('Starting research batch', { topics: topics.length, listings: listingIds.length })
+    return this.makeRequest<ResearchBatchResponse>('/research/batch', {
+      method: 'POST',
+      body: JSON.stringify({ topics, listing_ids: listingIds }),
+    })
+  }
+
+  async getResearchBatch(batchId: string): Promise<ResearchBatchProgress> {
+    return this.makeRequest<ResearchBatchProgress>(`/research/batch/${batchId}`)
+  }
+
+  // JSON-lines file with every item's result, for a download link
+  getResearchBatchDownloadUrl(batchId: string): string {
+    return `${CREWAI_API_BASE}/research/batch/${batchId}/download`
+  }
+
   async startProjectPlanningJob(projectDescription: string): Promise<JobResponse> {
     log.info('Starting project planning job', { projectDescription: projectDescription.substring(0, 100) + '...' })
     return this.makeRequest<JobResponse>('/project-planning', {
@@ -124,30 +193,56 @@ class CrewAIService {
     })
   }
 
-  async startResearchJobWithFiles(topic: string, files: FileContext[]): Promise<JobResponse> {
+  async startResearchJobWithFiles(topic: string, files: FileContext[], fileIds: string[] = []): Promise<JobResponse> {
     log.info('Starting research job with files', { 
       topic: topic.substring(0, 100) + '...', 
-      fileCount: files.length,
-      fileNames: files.map(f => f.fileName)
+      fileCount: files.length + fileIds.length,
+      fileNames: files.map(f => f.fileName),
+      fileIds
     })
     return this.makeRequest<JobResponse>('/research-with-files', {
       method: 'POST',
-      body: JSON.stringify({ topic, files }),
+      body: JSON.stringify({ topic, files, file_ids: fileIds }),
     })
   }
 
-  async startProjectPlanningJobWithFiles(projectDescription: string, files: FileContext[]): Promise<JobResponse> {
+  async startProjectPlanningJobWithFiles(projectDescription: string, files: FileContext[], fileIds: string[] = []): Promise<JobResponse> {
     log.info('Starting project planning job with files', { 
       projectDescription: projectDescription.substring(0, 100) + '...', 
-      fileCount: files.length,
-      fileNames: files.map(f => f.fileName)
+      fileCount: files.length + fileIds.length,
+      fileNames: files.map(f => f.fileName),
+      fileIds
     })
     return this.makeRequest<JobResponse>('/project-planning-with-files', {
       method: 'POST',
-      body: JSON.stringify({ project_description: projectDescription, files }),
+      body: JSON.stringify({ project_description: projectDescription, files, file_ids: fileIds }),
     })
   }
 
+  async registerFiles(files: FileContext[]): Promise<RegisteredFile[]> {
+    log.info('Registering files', { fileNames: files.map(f => f.fileName) })
+    return this.makeRequest<RegisteredFile[]>('/files', {
+      method: 'POST',
+      body: JSON.stringify({ files }),
+    })
+  }
+
+  private fileKey(file: File): string {
+    return `${file.name}:${file.size}:${file.lastModified}`
+  }
+
+  // Process and register only files not seen before; follow-up questions about the
+  // same documents reuse their file_ids instead of resending the text
+  async getFileIds(uploadedFiles: any[]): Promise<string[]> {
+    const newFiles = uploadedFiles.filter(f => !this.registeredFileIds.has(this.fileKey(f.file)))
+    if (newFiles.length > 0) {
+      const fileContexts = await this.processUploadedFiles(newFiles)
+      const registered = await this.registerFiles(fileContexts)
+      registered.forEach((r, i) => this.registeredFileIds.set(this.fileKey(newFiles[i].file), r.file_id))
+    }
+    return uploadedFiles.map(f => this.registeredFileIds.get(this.fileKey(f.file))!)
+  }
+
   // Helper function to convert uploaded files to file context
   async processUploadedFiles(uploadedFiles: any[]): Promise<FileContext[]> {
     log.info('Starting file processing', { 
@@ -250,17 +345,104 @@ class CrewAIService {
     return this.makeRequest('/jobs')
   }
 
+  // Stop a pending or running job; the crew aborts at its next step
+  async cancelJob(jobId: string) {
+    return this.makeRequest(`/jobs/${jobId}/cancel`, {
+      method: 'POST',
+    })
+  }
+
   async deleteJob(jobId: string) {
     return this.makeRequest(`/jobs/${jobId}`, {
       method: 'DELETE',
     })
   }
 
-  // Helper method to poll job status until completion
+  // Follow a job via server-sent events until it completes; falls back to polling
+  // if the stream cannot be opened or drops before the job finishes
   async pollJobCompletion(
     jobId: string, 
     onStatusUpdate?: (status: JobResponse) => void,
     maxAttempts: number = 60, // 5 minutes with 5-second intervals
+    intervalMs: number = 5000,
+    onEvent?: (event: JobEvent) => void
+  ): Promise<JobResponse> {
+    if (typeof EventSource === 'undefined') {
+      return this.pollJobStatus(jobId, onStatusUpdate, maxAttempts, intervalMs)
+    }
+    try {
+      return await this.streamJobCompletion(jobId, onStatusUpdate, onEvent)
+    } catch (error) {
+      if (error instanceof JobFailedError) {
+        throw error
+      }
+      log.error('Job event stream unavailable, falling back to polling', { jobId, error })
+      return this.pollJobStatus(jobId, onStatusUpdate, maxAttempts, intervalMs)
+    }
+  }
+
+  streamJobCompletion(
+    jobId: string,
+    onStatusUpdate?: (status: JobResponse) => void,
+    onEvent?: (event: JobEvent) => void
+  ): Promise<JobResponse> {
+    const url = `${CREWAI_API_BASE}/jobs/${jobId}/events`
+    log.request('GET', `/jobs/${jobId}/events`)
+
+    return new Promise((resolve, reject) => {
+      const source = new EventSource(url)
+      const job: JobResponse = {
+        job_id: jobId,
+        status: 'pending',
+        created_at: new Date().toISOString(),
+        result: null,
+        error: null,
+      }
+
+      const handle = (message: MessageEvent) => {
+        const event: JobEvent = JSON.parse(message.data)
+        if (onEvent) {
+          onEvent(event)
+        }
+        if (event.event === 'progress') {
+          job.progress = event.data.message
+        } else if (event.event === 'status') {
+          job.status = event.data.status
+          job.result = event.data.result ?? job.result
+          job.error = event.data.error ?? job.error
+        } else if (event.event === 'route') {
+          job.response_type = event.data.response_type
+          job.routed_by = event.data.routed_by
+        } else {
+          return
+        }
+        if (onStatusUpdate) {
+          onStatusUpdate({ ...job })
+        }
+        if (job.status === 'completed') {
+          source.close()
+          resolve({ ...job })
+        } else if (STOPPED_STATUSES.includes(job.status)) {
+          source.close()
+          reject(new JobFailedError(job.error || 'Job failed'))
+        }
+      }
+
+      for (const type of ['status', 'progress', 'route', 'task_output', 'token']) {
+        source.addEventListener(type, handle as EventListener)
+      }
+      source.onerror = () => {
+        source.close()
+        reject(new Error('Job event stream closed before completion'))
+      }
+    })
+  }
+
+  // Poll job status on a timer until completion
+  async pollJobStatus(
+    jobId: string,
+    onStatusUpdate?: (status: JobResponse) => void,
+    maxAttempts: number = 60,
     intervalMs: number = 5000
   ): Promise<JobResponse> {
     let attempts = 0
@@ -276,8 +458,8 @@ class CrewAIService {
 
           if (jobStatus.status === 'completed') {
             resolve(jobStatus)
-          } else if (jobStatus.status === 'failed') {
-            reject(new Error(jobStatus.error || 'Job failed'))
+          } else if (STOPPED_STATUSES.includes(jobStatus.status)) {
+            reject(new JobFailedError(jobStatus.error || 'Job failed'))
           } else {
             // Job is still pending or running
             attempts++
@@ -321,13 +503,13 @@ class CrewAIService {
     })
     
     if (hasFiles) {
-      // Process files first
-      const fileContexts = await this.processUploadedFiles(uploadedFiles!)
+      // Process and index new files first
+      const fileIds = await this.getFileIds(uploadedFiles!)
       
       if (jobType === 'project-planning') {
-        return this.startProjectPlanningJobWithFiles(query, fileContexts)
+        return this.startProjectPlanningJobWithFiles(query, [], fileIds)
       } else {
-        return this.startResearchJobWithFiles(query, fileContexts)
+        return this.startResearchJobWithFiles(query, [], fileIds)
       }
     } else {
       // No files, use regular endpoints